@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.anchored_group`
+================================================================================
+
+A displayio Group of a fixed size that can be placed by an anchor point, the base of
+the flip clock widgets. Offers the sizing and positioning of the DisplayIO Layout
+library's Widget without importing that library.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Optional, Tuple
+except ImportError:
+    pass
+
+from displayio import Group
+
+
+class AnchoredGroup(Group):
+    """
+    A Group with a width and height that positions itself so its `anchor_point` sits at
+    its `anchored_position`, the same way as a DisplayIO Layout Widget: the bounding box
+    offset is taken into account and `resize` records the size layouts give it, so the
+    flip clock widgets can be used with the layouts of that library.
+
+    :param int x: The x position of the Group
+    :param int y: The y position of the Group
+    :param int scale: Integer factor to scale the Group up by
+    :param int width: The width in pixels, already scaled
+    :param int height: The height in pixels, already scaled
+    :param anchor_point: Optional (x, y) point of the Group, 0.0 - 1.0 of its size, that
+      is placed at anchored_position
+    :param anchored_position: Optional (x, y) pixel position to place anchor_point at
+    """
+
+    __slots__ = ("_width", "_height", "_anchor_point", "_anchored_position", "_bounding_box")
+
+    def __init__(
+        self,
+        x: int = 0,
+        y: int = 0,
+        scale: int = 1,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        anchor_point: Optional[Tuple[float, float]] = None,
+        anchored_position: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        super().__init__(x=x, y=y, scale=scale)
+        self._width = width
+        self._height = height
+        self._anchor_point = anchor_point
+        self._anchored_position = anchored_position
+        # [x, y, width, height] of the Group's contents in its own coordinates
+        if width is not None and height is not None:
+            self._bounding_box = [0, 0, width, height]
+        else:
+            self._bounding_box = [0, 0, 0, 0]
+        self._update_position()
+
+    def resize(self, new_width: int, new_height: int) -> None:
+        """
+        Record a new size, as layouts such as GridLayout do for their cells. The flip
+        clock widgets keep drawing their sprites at the same size, only the size used for
+        anchoring changes.
+
+        :param int new_width: The new width in pixels
+        :param int new_height: The new height in pixels
+        """
+        self._width = new_width
+        self._height = new_height
+        self._bounding_box[2] = new_width
+        self._bounding_box[3] = new_height
+
+    def _update_position(self) -> None:
+        """
+        Move the Group so its anchor point is at the anchored position, if both are set.
+        Call after the size or bounding box change.
+        """
+        if self._anchor_point is not None and self._anchored_position is not None:
+            box = self._bounding_box
+            self.x = int(self._anchored_position[0] - int(self._anchor_point[0] * box[2]) - box[0])
+            self.y = int(self._anchored_position[1] - int(self._anchor_point[1] * box[3]) - box[1])
+
+    @property
+    def width(self) -> int:
+        """The width in pixels."""
+        return self._width or 0
+
+    @property
+    def height(self) -> int:
+        """The height in pixels."""
+        return self._height or 0
+
+    @property
+    def bounding_box(self) -> Tuple[int, ...]:
+        """The [x, y, width, height] extent in the Group's own coordinates."""
+        return tuple(self._bounding_box)
+
+    @property
+    def anchor_point(self) -> Optional[Tuple[float, float]]:
+        """
+        The (x, y) point of the Group, 0.0 - 1.0 of its width and height, placed at
+        `anchored_position`. (0.5, 0.5) is the center.
+        """
+        return self._anchor_point
+
+    @anchor_point.setter
+    def anchor_point(self, anchor_point: Tuple[float, float]) -> None:
+        self._anchor_point = anchor_point
+        self._update_position()
+
+    @property
+    def anchored_position(self) -> Optional[Tuple[int, int]]:
+        """
+        The (x, y) pixel position that `anchor_point` is placed at.
+        """
+        return self._anchored_position
+
+    @anchored_position.setter
+    def anchored_position(self, anchored_position: Tuple[int, int]) -> None:
+        self._anchored_position = anchored_position
+        self._update_position()
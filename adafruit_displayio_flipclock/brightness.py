@@ -0,0 +1,280 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.brightness`
+================================================================================
+
+Runtime brightness for flip clock widgets. The palettes for each brightness are worked
+out once and kept, so changing brightness only switches the palettes the TileGrids use.
+Fades work out the palettes of each step a few colors at a time so they never hold up
+an animation.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Optional, Sequence
+except ImportError:
+    pass
+
+from displayio import Palette
+
+# number of colors worked out on each poll of a fade
+COLORS_PER_POLL = 64
+
+
+def scale_color(color: int, level: float) -> int:
+    """
+    Scale the red, green and blue parts of an RGB888 color by a brightness level.
+
+    :param int color: The color to scale
+    :param float level: Brightness level, 0.0 - 1.0
+    """
+    red = int(((color >> 16) & 0xFF) * level)
+    green = int(((color >> 8) & 0xFF) * level)
+    blue = int((color & 0xFF) * level)
+    return (red << 16) | (green << 8) | blue
+
+
+def check_brightness(brightness: float) -> None:
+    """
+    Raise ValueError if a brightness is outside 0.0 - 1.0.
+
+    :param float brightness: The brightness to check
+    """
+    if not 0.0 <= brightness <= 1.0:
+        raise ValueError("brightness must be between 0.0 and 1.0")
+
+
+class PaletteSet:
+    """
+    The palettes a digit's TileGrids show at one brightness.
+
+    :param float brightness: The brightness the palettes are for
+    :param Palette static: Palette of the static TileGrids
+    :param Palette darker_static: Palette of the bottom static TileGrid while the top
+      half flips over it, None without dynamic fading
+    :param Palette top: Palette of the top animation TileGrid
+    :param Palette bottom: Palette of the bottom animation TileGrid
+    """
+
+    def __init__(
+        self,
+        brightness: float,
+        static: Palette,
+        darker_static: Optional[Palette],
+        top: Palette,
+        bottom: Palette,
+    ) -> None:
+        self.brightness = brightness
+        self.static = static
+        self.darker_static = darker_static
+        self.top = top
+        self.bottom = bottom
+
+    @property
+    def palettes(self) -> tuple:
+        """
+        The different palettes of the set.
+        """
+        palettes = []
+        for palette in (self.static, self.darker_static, self.top, self.bottom):
+            if palette is not None and palette not in palettes:
+                palettes.append(palette)
+        return tuple(palettes)
+
+
+class PaletteSetBuilder:
+    """
+    Works out the palettes of a `FlipDigitConfig` at a brightness, a few colors per
+    call to `step`. Source palettes used at the same level are only scaled once.
+
+    :param FlipDigitConfig config: The config to make the palettes for
+    :param float brightness: The brightness, 0.0 - 1.0
+    :param PaletteSet palette_set: Optional set made by an earlier builder for the same
+      config to rewrite in place instead of making new palettes
+    """
+
+    def __init__(self, config, brightness: float, palette_set: Optional[PaletteSet] = None) -> None:
+        self.brightness = brightness
+        self._palette_set = palette_set
+        targets = (None, None, None, None)
+        if palette_set is not None:
+            targets = (
+                palette_set.static,
+                palette_set.darker_static,
+                palette_set.top,
+                palette_set.bottom,
+            )
+        if config.dynamic_fading:
+            parts = (
+                (config.static_spritesheet_palette, config.medium_level),
+                (config.static_spritesheet_palette, config.darker_level),
+                (config.top_anim_palette, config.darker_level),
+                (config.bottom_anim_palette, config.brighter_level),
+            )
+        else:
+            parts = (
+                (config.static_spritesheet_palette, 1.0),
+                None,
+                (config.top_anim_palette, 1.0),
+                (config.bottom_anim_palette, 1.0),
+            )
+
+        # one scaled palette for each source palette and level
+        self._jobs = []
+        self._outputs = []
+        for part, target in zip(parts, targets):
+            if part is None:
+                self._outputs.append(None)
+                continue
+            source, level = part
+            for job_source, job_level, job_output in self._jobs:
+                if job_source is source and job_level == level:
+                    self._outputs.append(job_output)
+                    break
+            else:
+                output = target
+                if output is None:
+                    output = Palette(len(source))
+                self._jobs.append((source, level, output))
+                self._outputs.append(output)
+        self._job = 0
+        self._color = 0
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether every palette has been worked out.
+        """
+        return self._job >= len(self._jobs)
+
+    def step(self, count: int = COLORS_PER_POLL) -> bool:
+        """
+        Work out the next colors. Returns whether every palette is done.
+
+        :param int count: The number of colors to work out
+        """
+        while count > 0 and not self.done:
+            source, level, output = self._jobs[self._job]
+            level *= self.brightness
+            end = min(self._color + count, len(source))
+            for index in range(self._color, end):
+                output[index] = scale_color(source[index], level)
+                if source.is_transparent(index):
+                    output.make_transparent(index)
+            count -= end - self._color
+            self._color = end
+            if end == len(source):
+                self._job += 1
+                self._color = 0
+        return self.done
+
+    def palette_set(self) -> PaletteSet:
+        """
+        The finished palettes, working out any that are left first. A set passed in to
+        rewrite is returned with its brightness updated.
+        """
+        while not self.step():
+            pass
+        if self._palette_set is not None:
+            self._palette_set.brightness = self.brightness
+            return self._palette_set
+        return PaletteSet(self.brightness, *self._outputs)
+
+
+class BrightnessFade:
+    """
+    Fade digits to a new brightness in steps. Each poll works out a few more colors of
+    the next step's palettes, and once they are done the digits switch to them. The steps
+    in between are written into the one ``fade_palette_set`` of each config, made on its
+    first fade and rewritten in place after that, so fading allocates no palettes. Only
+    the last step's palettes are kept in the digits' config, so switching back is quick.
+
+    :param digits: The `FlipDigit` widgets to fade
+    :param float brightness: The brightness to fade to, 0.0 - 1.0
+    :param int steps: The number of brightness steps to fade through
+    :param int colors_per_poll: The number of colors to work out on each poll
+    """
+
+    def __init__(
+        self,
+        digits: Sequence,
+        brightness: float,
+        steps: int = 8,
+        colors_per_poll: int = COLORS_PER_POLL,
+    ) -> None:
+        check_brightness(brightness)
+        self.digits = tuple(digits)
+        self.brightness = brightness
+        self.colors_per_poll = colors_per_poll
+        start = self.digits[0].brightness
+        self._levels = [
+            start + (brightness - start) * step / steps for step in range(1, max(steps, 1) + 1)
+        ]
+        self._builders = None
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether the digits have reached the new brightness.
+        """
+        return not self._levels
+
+    def poll(self) -> bool:
+        """
+        Work out the next colors, switching the digits to the next step when they are
+        done. Cheap enough to call every pass of the main loop. Returns whether the fade
+        is still going.
+        """
+        if not self._levels:
+            return False
+        level = self._levels[0]
+        last_step = len(self._levels) == 1
+        if self._builders is None:
+            # a builder for each config, with the finished steps taken from its cache
+            self._builders = {}
+            for digit in self.digits:
+                config = digit.config
+                if id(config) not in self._builders:
+                    builder = config.cached_palette_set(level)
+                    if builder is None and last_step:
+                        builder = PaletteSetBuilder(config, level)
+                    elif builder is None:
+                        builder = PaletteSetBuilder(config, level, config.fade_palette_set)
+                    self._builders[id(config)] = builder
+        for builder in self._builders.values():
+            if isinstance(builder, PaletteSetBuilder) and not builder.step(self.colors_per_poll):
+                return True
+
+        # every palette of the step is done, switch the digits over
+        palette_sets = {}
+        for digit in self.digits:
+            config = digit.config
+            builder = self._builders[id(config)]
+            if id(config) not in palette_sets:
+                if isinstance(builder, PaletteSetBuilder):
+                    builder = builder.palette_set()
+                    if last_step:
+                        config.cache_palette_set(builder)
+                    else:
+                        config.fade_palette_set = builder
+                palette_sets[id(config)] = builder
+            digit.palette_set = palette_sets[id(config)]
+        self._levels.pop(0)
+        self._builders = None
+        return bool(self._levels)
@@ -0,0 +1,59 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.charset`
+================================================================================
+
+Character sets for flip digits that show letters and punctuation as well as numbers,
+like a split-flap departure board. Each character is looked up in a precomputed
+table, so the cost of setting a value doesn't depend on the size of the set.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+# the characters of the digit spritesheets
+DIGITS = "0123456789"
+
+# blank first, so a board of split-flap digits starts out empty
+SPLIT_FLAP = " ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,:;-+/'&!?#@"
+
+# lookup tables already built, keyed by character set
+_tables = {}
+
+
+def glyph_table(characters: str) -> bytearray:
+    """
+    The lookup table from character code to glyph index for a character set. Entries
+    hold the glyph index plus one, and 0 for characters that are not in the set. Tables
+    are built once per character set and shared.
+
+    :param str characters: The characters of the set in spritesheet order. Only
+      characters with codes below 256 are supported, and at most 255 of them.
+    """
+    if characters not in _tables:
+        if len(characters) > 255:
+            raise ValueError("Character sets can have at most 255 characters")
+        table = bytearray(256)
+        for index, character in enumerate(characters):
+            code = ord(character)
+            if code > 255:
+                raise ValueError(f"Unsupported character: {character}")
+            if table[code]:
+                raise ValueError(f"Character listed twice: {character}")
+            table[code] = index + 1
+        _tables[characters] = table
+    return _tables[characters]
@@ -0,0 +1,299 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.flip_assets`
+================================================================================
+
+Registry of the spritesheets, palettes and PaletteFaders used by flip digits. One
+`FlipAssets` object can be shared by any number of `FlipDigit` and `FlipClock`
+widgets so that everything is loaded and created only once.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Optional, Sequence, Tuple
+
+    from displayio import Bitmap, Palette
+
+    from adafruit_displayio_flipclock.sprite_manifest import SpriteManifest
+except ImportError:
+    pass
+
+from adafruit_displayio_flipclock.flip_digit import FlipDigit
+
+
+class FlipAssets:
+    """
+    The spritesheets and palettes for flip digits, checked once when they are added and
+    shared by every widget created with ``from_assets``. PaletteFaders are created on
+    first use and shared as well. Widgets created with ``from_assets`` count as users of
+    the assets, call `release` for each of them when they are no longer shown and the
+    assets are unloaded after the last one.
+
+    Takes the same spritesheet, palette and index arguments as `FlipDigit`.
+
+    :param int scale: Integer factor the widgets scale the sprites up by. Default 1.
+    :param str charset: Optional characters of the spritesheets in order, see `FlipDigit`.
+    :param Bitmap separator_spritesheet: Optional spritesheet of separator sprites, see
+      `FlipClock`.
+    :param dict separator_indexes: Optional separator sprite indexes, see `FlipClock`.
+    :param blank_indexes: Optional blank sprite indexes, see `FlipClock`.
+    """
+
+    # assets loaded with FlipAssets.load, keyed by manifest filename
+    _registry = {}
+
+    def __init__(
+        self,
+        static_spritesheet: Bitmap,
+        static_spritesheet_palette: Palette,
+        top_anim_spritesheet: Bitmap,
+        top_anim_palette: Palette,
+        bottom_anim_spritesheet: Bitmap,
+        bottom_anim_palette: Palette,
+        tile_width: int,
+        tile_height: int,
+        anim_frame_count: int = 10,
+        top_anim_frame_map: Optional[Sequence[int]] = None,
+        bottom_anim_frame_map: Optional[Sequence[int]] = None,
+        top_static_indexes: Optional[Sequence[int]] = None,
+        bottom_static_indexes: Optional[Sequence[int]] = None,
+        scale: int = 1,
+        charset: Optional[str] = None,
+        separator_spritesheet: Optional[Bitmap] = None,
+        separator_indexes: Optional[dict] = None,
+        blank_indexes: Optional[Sequence[int]] = None,
+    ) -> None:
+        if top_static_indexes is None:
+            top_static_indexes = FlipDigit.TOP_HALF_SPRITE_INDEXES
+        if bottom_static_indexes is None:
+            bottom_static_indexes = FlipDigit.BOTTOM_HALF_SPRITE_INDEXES
+
+        self.static_spritesheet = static_spritesheet
+        self.static_spritesheet_palette = static_spritesheet_palette
+        self.top_anim_spritesheet = top_anim_spritesheet
+        self.top_anim_palette = top_anim_palette
+        self.bottom_anim_spritesheet = bottom_anim_spritesheet
+        self.bottom_anim_palette = bottom_anim_palette
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.anim_frame_count = anim_frame_count
+        self.top_anim_frame_map = top_anim_frame_map
+        self.bottom_anim_frame_map = bottom_anim_frame_map
+        self.top_static_indexes = top_static_indexes
+        self.bottom_static_indexes = bottom_static_indexes
+        self.scale = scale
+        self.charset = charset
+        self.separator_spritesheet = separator_spritesheet
+        self.separator_indexes = separator_indexes
+        self.blank_indexes = blank_indexes
+
+        # PaletteFaders and digit configs shared by every widget using these assets
+        self.fader_cache = {}
+        self.config_cache = {}
+
+        # number of widgets using the assets
+        self.users = 0
+        self._filename = None
+
+        self.validate()
+
+    @classmethod
+    def load(cls, filename: str, **manifest_options) -> "FlipAssets":
+        """
+        Load the assets described by a manifest written by the spritesheet generator.
+        Loading the same manifest again returns the already loaded assets until they
+        are unloaded.
+
+        :param str filename: The name of the manifest JSON file.
+        :param manifest_options: Other `SpriteManifest` arguments, such as
+          on_disk_cache_size, synthesize_frames or lazy.
+        """
+        if filename not in cls._registry:
+            from adafruit_displayio_flipclock.sprite_manifest import SpriteManifest
+
+            assets = cls.from_manifest(SpriteManifest.load(filename, **manifest_options))
+            assets._filename = filename
+            cls._registry[filename] = assets
+        return cls._registry[filename]
+
+    @classmethod
+    def from_manifest(cls, manifest: SpriteManifest) -> "FlipAssets":
+        """
+        Create assets from the spritesheets described by a `SpriteManifest`.
+
+        :param SpriteManifest manifest: The manifest to load the spritesheets of.
+        """
+        args, kwargs = manifest.widget_arguments()
+        return cls(
+            *args,
+            separator_spritesheet=manifest.load_separator_sheet(),
+            separator_indexes=manifest.separator_indexes,
+            blank_indexes=manifest.blank_indexes,
+            **kwargs,
+        )
+
+    @staticmethod
+    def _tile_count(spritesheet: Bitmap, tile_width: int, tile_height: int) -> int:
+        """
+        The number of whole tiles in a spritesheet.
+
+        :param Bitmap spritesheet: The spritesheet Bitmap
+        :param int tile_width: Width in pixels of the tiles
+        :param int tile_height: Height in pixels of the tiles
+        """
+        return (spritesheet.width // tile_width) * (spritesheet.height // tile_height)
+
+    def validate(self) -> None:
+        """
+        Check that the spritesheets hold every tile the index tables and animation frame
+        count refer to. Raises ValueError for the first problem found. Frame sources are
+        not checked.
+        """
+        glyphs = 10 if self.charset is None else len(self.charset)
+        if len(self.top_static_indexes) < glyphs or len(self.bottom_static_indexes) < glyphs:
+            raise ValueError("Static indexes must have an entry for each value")
+
+        static_tiles = FlipAssets._tile_count(
+            self.static_spritesheet, self.tile_width, self.tile_height
+        )
+        if max(*self.top_static_indexes, *self.bottom_static_indexes) >= static_tiles:
+            raise ValueError(
+                f"Static spritesheet holds {static_tiles} tiles of "
+                f"{self.tile_width}x{self.tile_height}, fewer than the static indexes need"
+            )
+
+        if self.separator_spritesheet is not None:
+            from adafruit_displayio_flipclock.flip_clock import colon_space
+
+            separator_width = colon_space(self.scale)
+            separator_indexes = list(self.blank_indexes or ())
+            for indexes in self.separator_indexes.values():
+                separator_indexes.extend(indexes)
+            separator_tiles = FlipAssets._tile_count(
+                self.separator_spritesheet, separator_width, self.tile_height
+            )
+            if max(separator_indexes) >= separator_tiles:
+                raise ValueError(
+                    f"Separator spritesheet holds {separator_tiles} tiles of "
+                    f"{separator_width}x{self.tile_height}, fewer than the separator indexes need"
+                )
+
+        frames = self.anim_frame_count * glyphs
+        for name, spritesheet, frame_map in (
+            ("top", self.top_anim_spritesheet, self.top_anim_frame_map),
+            ("bottom", self.bottom_anim_spritesheet, self.bottom_anim_frame_map),
+        ):
+            if hasattr(spritesheet, "draw_frame"):
+                # frame sources are not tiled spritesheets
+                continue
+            needed = frames if frame_map is None else max(frame_map) + 1
+            if FlipAssets._tile_count(spritesheet, self.tile_width, self.tile_height) < needed:
+                raise ValueError(
+                    f"The {name} animation spritesheet holds fewer than the {needed} tiles needed"
+                )
+
+        for palette in (
+            self.static_spritesheet_palette,
+            self.top_anim_palette,
+            self.bottom_anim_palette,
+        ):
+            if len(palette) == 0:
+                raise ValueError("Palettes must have at least one color")
+
+    def widget_arguments(self) -> Tuple[tuple, dict]:
+        """
+        The arguments shared by `FlipDigit` and `FlipClock` created from these assets.
+        Returns a tuple of positional arguments and a dictionary of keyword arguments.
+        """
+        args = (
+            self.static_spritesheet,
+            self.static_spritesheet_palette,
+            self.top_anim_spritesheet,
+            self.top_anim_palette,
+            self.bottom_anim_spritesheet,
+            self.bottom_anim_palette,
+            self.tile_width,
+            self.tile_height,
+        )
+        kwargs = {
+            "anim_frame_count": self.anim_frame_count,
+            "fader_cache": self.fader_cache,
+            "config_cache": self.config_cache,
+            "top_anim_frame_map": self.top_anim_frame_map,
+            "bottom_anim_frame_map": self.bottom_anim_frame_map,
+            "top_static_indexes": self.top_static_indexes,
+            "bottom_static_indexes": self.bottom_static_indexes,
+            "scale": self.scale,
+            "charset": self.charset,
+        }
+        return args, kwargs
+
+    def poll(self) -> bool:
+        """
+        Let `LazySpriteSheet` animation spritesheets load once their prefetch time has
+        passed and `OnDiskSpriteSheet` ones read ahead a queued frame. Call from the main
+        loop while nothing else is happening. Returns whether the animation spritesheets
+        are loaded and done reading ahead.
+        """
+        loaded = True
+        for spritesheet in (self.top_anim_spritesheet, self.bottom_anim_spritesheet):
+            if hasattr(spritesheet, "poll"):
+                loaded = spritesheet.poll() and loaded
+        return loaded
+
+    def acquire(self) -> "FlipAssets":
+        """
+        Count one more widget as using the assets. Called by ``from_assets``.
+        """
+        if self.static_spritesheet is None:
+            raise RuntimeError("Assets have been unloaded")
+        self.users += 1
+        return self
+
+    def release(self) -> None:
+        """
+        Count one less widget as using the assets, unloading them when none are left.
+        """
+        self.users -= 1
+        if self.users <= 0:
+            self.unload()
+
+    def unload(self) -> None:
+        """
+        Drop the spritesheets, palettes, faders and digit configs so their memory can be
+        freed. Frame sources that have a ``deinit`` method, such as `OnDiskSpriteSheet`, are
+        deinitialized. Like any loaded spritesheet, those a `LazySpriteSheet` loaded and
+        digits switched to stay in memory for as long as widgets created from the assets
+        are kept, drop the widgets as well to free them.
+        """
+        for spritesheet in (self.top_anim_spritesheet, self.bottom_anim_spritesheet):
+            if hasattr(spritesheet, "deinit"):
+                spritesheet.deinit()
+        self.static_spritesheet = None
+        self.static_spritesheet_palette = None
+        self.separator_spritesheet = None
+        self.top_anim_spritesheet = None
+        self.top_anim_palette = None
+        self.bottom_anim_spritesheet = None
+        self.bottom_anim_palette = None
+        self.fader_cache.clear()
+        self.config_cache.clear()
+        self.users = 0
+        if FlipAssets._registry.get(self._filename) is self:
+            del FlipAssets._registry[self._filename]
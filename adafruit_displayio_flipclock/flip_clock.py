@@ -25,23 +25,44 @@ Implementation Notes
 """
 
 try:
-    from typing import Optional
+    from typing import Dict, Optional, Sequence, Union
 
     from displayio import Bitmap
 except ImportError:
     pass
 
-from adafruit_displayio_layout.widgets.widget import Widget
+import time
+
 from displayio import Palette
-from vectorio import Circle
 
+from adafruit_displayio_flipclock.anchored_group import AnchoredGroup
+from adafruit_displayio_flipclock.brightness import (
+    COLORS_PER_POLL,
+    BrightnessFade,
+    check_brightness,
+    scale_color,
+)
 from adafruit_displayio_flipclock.flip_digit import FlipDigit
 
 # Gap in pixels that the colon will be shown in between the two pairs
 COLON_SPACE = 12
 
+# radius in pixels of the circles drawn for the colon without separator sprites
+COLON_RADIUS = 4
+
+
+def colon_space(scale: int) -> int:
+    """
+    The gap between the pairs of a clock in sprite pixels, before the clock is scaled
+    up. Scaled clocks keep a gap close to COLON_SPACE display pixels, like a clock drawn
+    from full size sprites, and separator sprites for them are this wide.
+
+    :param int scale: The integer scale of the clock
+    """
+    return max((COLON_SPACE + scale // 2) // scale, 1)
+
 
-class FlipClock(Widget):
+class FlipClock(AnchoredGroup):
     """A FlipClock displayio widget that shows two pairs of digits and uses
     flip clock style animations to change between them.
 
@@ -49,9 +70,13 @@ class FlipClock(Widget):
     :param Palette static_spritesheet_palette: Palette to use with the static sprite sheet.
       set all desired transparent or opaque indexes before initializing.
     :param Bitmap top_anim_spritesheet: Spritesheet image of top half animation sprites.
+      Can also be a frame source such as a `SpriteAtlas` or `SynthesizedSpriteSheet`,
+      see `FlipDigit`.
     :param Palette top_anim_palette: Palette to use with the top half animation sprites.
       set all desired transparent or opaque indexes before initializing.
     :param Bitmap bottom_anim_spritesheet: Spritesheet image of bottom half animation sprites.
+      Can also be a frame source such as a `SpriteAtlas` or `SynthesizedSpriteSheet`,
+      see `FlipDigit`.
     :param Palette bottom_anim_palette: Palette to use with the bottom half animation sprites.
       set all desired transparent or opaque indexes before initializing.
 
@@ -64,7 +89,8 @@ class FlipClock(Widget):
     :param float anim_delay: Time in seconds to wait between animation frames.
       Default value is 0.02 seconds
     :param int colon_color: Hex color value to draw the colon between pairs of digits.
-      Default is white 0xffffff.
+      Default is white 0xffffff. Not used by sprite separators, which are drawn in the
+      static spritesheet's colors.
     :param bool dynamic_fading: Whether to use PaleteFadder to dynamically adjust brightness.
     :param float brighter_level: Brightness modifier value to use for the brightest portion
       of the animations. Valid range is 0.0 - 1.0.
@@ -72,6 +98,45 @@ class FlipClock(Widget):
       portion of the animations. Valid range is 0.0 - 1.0.
     :param float darker_level: Brightness modifier value to use for the darkest "shadow" portion
       of the animations. Valid range is 0.0 - 1.0.
+    :param top_anim_frame_map: Optional sequence mapping animation frames to tile indexes
+      in the top animation spritesheet. See `FlipDigit`.
+    :param bottom_anim_frame_map: Optional sequence mapping animation frames to tile indexes
+      in the bottom animation spritesheet. See `FlipDigit`.
+    :param top_static_indexes: Optional sequence of the static spritesheet tile index for the
+      top half of each value. See `FlipDigit`.
+    :param bottom_static_indexes: Optional sequence of the static spritesheet tile index for
+      the bottom half of each value. See `FlipDigit`.
+    :param int scale: Integer factor to scale the whole clock up by on the display. See
+      `FlipDigit`. The colon gap and circles are scaled down first, so they stay about
+      the size they have on a clock drawn from full size sprites. Default 1.
+    :param dict fader_cache: Optional dictionary of PaletteFaders to share with other widgets,
+      see `FlipDigit`. `FlipAssets` passes its own.
+    :param str charset: Optional characters of the spritesheets in order, see `FlipDigit`.
+      The pairs are then shown character by character instead of as numbers.
+    :param dict config_cache: Optional dictionary of `FlipDigitConfig` objects to share with
+      other widgets, see `FlipDigit`. `FlipAssets` passes its own.
+    :param Bitmap separator_spritesheet: Optional spritesheet of separator sprites
+      ``colon_space(scale)`` pixels wide, its pixels indexes into the static spritesheet palette.
+      With it the colon is shown as a sprite filling the gap between the pairs instead of
+      drawn as two circles. ``from_manifest`` and ``from_assets`` pass it for spritesheets
+      generated with separators.
+    :param dict separator_indexes: The top and bottom tile indexes of the separator
+      sprites keyed by character, see `Separator`.
+    :param blank_indexes: Optional top and bottom tile indexes of the blank sprite shown
+      while a sprite colon blinks off.
+    :param str separator: The separator sprite to show between the pairs. Default ":".
+
+    All four digits share their PaletteFader objects, use `FlipAssets` to share them and the
+    spritesheets between several clocks. Passing the same palette for all three
+    spritesheets, as output by the spritesheet generator's shared palette mode, results in a
+    single fader per brightness level for the whole clock.
+
+    Setting ``stats`` to a `FlipStats` or ``trace`` to a `FlipTrace` attaches it to all
+    four digits, see `FlipDigit`.
+
+    ``brightness`` dims the whole clock at once, switching between palettes worked out
+    for each brightness, and `fade_brightness` changes it gradually from the main loop.
+    Setting ``colon_blink`` blinks the colon as `poll` is called.
     """
 
     def __init__(
@@ -91,11 +156,28 @@ class FlipClock(Widget):
         brighter_level: float = 0.85,
         darker_level: float = 0.6,
         medium_level: float = 0.8,
+        top_anim_frame_map: Optional[Sequence[int]] = None,
+        bottom_anim_frame_map: Optional[Sequence[int]] = None,
+        top_static_indexes: Optional[Sequence[int]] = None,
+        bottom_static_indexes: Optional[Sequence[int]] = None,
+        scale: int = 1,
+        fader_cache: Optional[dict] = None,
+        charset: Optional[str] = None,
+        config_cache: Optional[dict] = None,
+        separator_spritesheet: Optional[Bitmap] = None,
+        separator_indexes: Optional[Dict[str, Sequence[int]]] = None,
+        blank_indexes: Optional[Sequence[int]] = None,
+        separator: str = ":",
     ) -> None:
-        # initialize parent Widget object
+        # gap between the pairs in sprite pixels, scaled up with the rest of the clock
+        gap = colon_space(scale)
+
+        # initialize parent AnchoredGroup object, the digits and colon inside it are not scaled
+        # on their own
         super().__init__(
-            width=tile_width * 4 + COLON_SPACE,
-            height=tile_height * 2,
+            scale=scale,
+            width=(tile_width * 4 + gap) * scale,
+            height=tile_height * 2 * scale,
         )
 
         # store assets and configuration values on self variables to access in other class functions
@@ -109,10 +191,20 @@ class FlipClock(Widget):
         self.tile_height = tile_height
         self.anim_frame_count = anim_frame_count
         self.anim_delay = anim_delay
+        self.charset = charset
         self.brighter_level = brighter_level
         self.darker_level = darker_level
         self.medium_level = medium_level
 
+        # PaletteFaders shared by all of the digits
+        if fader_cache is None:
+            fader_cache = {}
+        self._fader_cache = fader_cache
+
+        # configuration shared by all of the digits, only their TileGrids and values differ
+        if config_cache is None:
+            config_cache = {}
+
         # Create first digit of first pair
         self.digit_0 = FlipDigit(
             self.static_spritesheet,
@@ -123,11 +215,19 @@ class FlipClock(Widget):
             self.bottom_anim_palette,
             self.tile_width,
             self.tile_height,
+            anim_frame_count=self.anim_frame_count,
             anim_delay=self.anim_delay,
             dynamic_fading=dynamic_fading,
             brighter_level=self.brighter_level,
             darker_level=self.darker_level,
             medium_level=self.medium_level,
+            fader_cache=self._fader_cache,
+            top_anim_frame_map=top_anim_frame_map,
+            bottom_anim_frame_map=bottom_anim_frame_map,
+            top_static_indexes=top_static_indexes,
+            bottom_static_indexes=bottom_static_indexes,
+            charset=charset,
+            config_cache=config_cache,
         )
         self.digit_0.x = 0
         # append it to parent Group
@@ -143,11 +243,19 @@ class FlipClock(Widget):
             self.bottom_anim_palette,
             self.tile_width,
             self.tile_height,
+            anim_frame_count=self.anim_frame_count,
             anim_delay=self.anim_delay,
             dynamic_fading=dynamic_fading,
             brighter_level=self.brighter_level,
             darker_level=self.darker_level,
             medium_level=self.medium_level,
+            fader_cache=self._fader_cache,
+            top_anim_frame_map=top_anim_frame_map,
+            bottom_anim_frame_map=bottom_anim_frame_map,
+            top_static_indexes=top_static_indexes,
+            bottom_static_indexes=bottom_static_indexes,
+            charset=charset,
+            config_cache=config_cache,
         )
         self.digit_1.x = self.tile_width
         # append it to parent Group
@@ -163,14 +271,22 @@ class FlipClock(Widget):
             self.bottom_anim_palette,
             self.tile_width,
             self.tile_height,
+            anim_frame_count=self.anim_frame_count,
             anim_delay=self.anim_delay,
             dynamic_fading=dynamic_fading,
             brighter_level=self.brighter_level,
             darker_level=self.darker_level,
             medium_level=self.medium_level,
+            fader_cache=self._fader_cache,
+            top_anim_frame_map=top_anim_frame_map,
+            bottom_anim_frame_map=bottom_anim_frame_map,
+            top_static_indexes=top_static_indexes,
+            bottom_static_indexes=bottom_static_indexes,
+            charset=charset,
+            config_cache=config_cache,
         )
 
-        self.digit_2.x = (self.tile_width) * 2 + COLON_SPACE
+        self.digit_2.x = (self.tile_width) * 2 + gap
         # append it to parent Group
         self.append(self.digit_2)
 
@@ -184,33 +300,118 @@ class FlipClock(Widget):
             self.bottom_anim_palette,
             self.tile_width,
             self.tile_height,
+            anim_frame_count=self.anim_frame_count,
             anim_delay=self.anim_delay,
             dynamic_fading=dynamic_fading,
             brighter_level=self.brighter_level,
             darker_level=self.darker_level,
             medium_level=self.medium_level,
+            fader_cache=self._fader_cache,
+            top_anim_frame_map=top_anim_frame_map,
+            bottom_anim_frame_map=bottom_anim_frame_map,
+            top_static_indexes=top_static_indexes,
+            bottom_static_indexes=bottom_static_indexes,
+            charset=charset,
+            config_cache=config_cache,
         )
 
         self.digit_3.x = self.digit_2.x + self.tile_width
         # append it to parent Group
         self.append(self.digit_3)
 
-        # set colon color
-        colon_palette = Palette(1)
-        colon_palette[0] = colon_color
-
-        # calculate colon position
-        colon_x = self.digit_1.x + self.tile_width + 6
-        top_dot_y = self.tile_height * 2 // 3
-        bottom_dot_y = (self.tile_height * 2 // 3) * 2
+        # brightness fade in progress, see fade_brightness()
+        self._fade = None
+
+        # colon blink interval in nanoseconds and time of the next blink, see colon_blink
+        self._blink_ns = 0
+        self._next_blink_ns = 0
+
+        self.colon_color = colon_color
+        self._colon_palette = None
+        self._colon_circles = ()
+        self.colon = None
+        if separator_spritesheet is not None:
+            from adafruit_displayio_flipclock.separator import Separator
+
+            # colon sprite filling the gap between the pairs
+            self.colon = Separator(
+                separator_spritesheet,
+                self.digit_0.palette_set.static,
+                gap,
+                self.tile_height,
+                separator_indexes,
+                blank_indexes,
+                character=separator,
+                x=self.digit_1.x + self.tile_width,
+            )
+            for tilegrid in self.colon.tilegrids:
+                self.append(tilegrid)
+        else:
+            from vectorio import Circle
+
+            # set colon color
+            colon_palette = Palette(1)
+            colon_palette[0] = colon_color
+            self._colon_palette = colon_palette
+
+            # calculate colon position
+            colon_x = self.digit_1.x + self.tile_width + gap // 2
+            top_dot_y = self.tile_height * 2 // 3
+            bottom_dot_y = (self.tile_height * 2 // 3) * 2
+            radius = max((COLON_RADIUS + scale // 2) // scale, 1)
+
+            # create circles for colon
+            top_circle = Circle(pixel_shader=colon_palette, radius=radius, x=colon_x, y=top_dot_y)
+            bottom_circle = Circle(
+                pixel_shader=colon_palette, radius=radius, x=colon_x, y=bottom_dot_y
+            )
+            self._colon_circles = (top_circle, bottom_circle)
+
+            # add the colon circles to parent Group
+            self.append(top_circle)
+            self.append(bottom_circle)
+
+    @classmethod
+    def from_manifest(cls, manifest, **kwargs) -> "FlipClock":
+        """
+        Create a FlipClock from the manifest written by the spritesheet generator. The
+        spritesheets it lists are loaded, their transparent indexes set and the tile size,
+        frame count and index tables are taken from it.
 
-        # create circles for colon
-        top_circle = Circle(pixel_shader=colon_palette, radius=4, x=colon_x, y=top_dot_y)
-        bottom_circle = Circle(pixel_shader=colon_palette, radius=4, x=colon_x, y=bottom_dot_y)
+        :param manifest: A `SpriteManifest`, or the filename of a manifest to load.
+        :param kwargs: Any other FlipClock arguments, such as anim_delay or colon_color.
+        """
+        from adafruit_displayio_flipclock.sprite_manifest import SpriteManifest
+
+        if isinstance(manifest, str):
+            manifest = SpriteManifest.load(manifest)
+        args, manifest_kwargs = manifest.widget_arguments()
+        if manifest.separator_indexes is not None:
+            manifest_kwargs["separator_spritesheet"] = manifest.load_separator_sheet()
+            manifest_kwargs["separator_indexes"] = manifest.separator_indexes
+            manifest_kwargs["blank_indexes"] = manifest.blank_indexes
+        manifest_kwargs.update(kwargs)
+        return cls(*args, **manifest_kwargs)
+
+    @classmethod
+    def from_assets(cls, assets, **kwargs) -> "FlipClock":
+        """
+        Create a FlipClock from a `FlipAssets` registry. The spritesheets, palettes and
+        PaletteFaders are shared with every other widget created from the same assets,
+        and the widget is counted as one of their users.
 
-        # add the colon circles to parent Group
-        self.append(top_circle)
-        self.append(bottom_circle)
+        :param FlipAssets assets: The loaded assets to use.
+        :param kwargs: Any other FlipClock arguments, such as anim_delay or dynamic_fading.
+        """
+        args, asset_kwargs = assets.widget_arguments()
+        if assets.separator_spritesheet is not None:
+            asset_kwargs["separator_spritesheet"] = assets.separator_spritesheet
+            asset_kwargs["separator_indexes"] = assets.separator_indexes
+            asset_kwargs["blank_indexes"] = assets.blank_indexes
+        asset_kwargs.update(kwargs)
+        widget = cls(*args, **asset_kwargs)
+        assets.acquire()
+        return widget
 
     @staticmethod
     def _validate_new_pair(new_pair: str) -> Optional[str]:
@@ -235,6 +436,162 @@ class FlipClock(Widget):
 
         return new_pair
 
+    def _digit_value(self, character: str) -> Union[int, str]:
+        """
+        The value to give a digit for a character of a pair, an int unless the clock
+        has a charset.
+
+        :param str character: A single character of a pair
+        """
+        if self.charset is None:
+            return int(character)
+        return character
+
+    def memory_report(self, digit_count: Optional[int] = None) -> dict:
+        """
+        Estimate the RAM used by this clock, in bytes, split into memory shared by its
+        digits and memory owned by each of them and the colon. See
+        `FlipDigit.memory_report`.
+
+        :param int digit_count: Optional number of digits to estimate the total for,
+          returned as ``estimated_total``. Clocks own their colon, so estimates assume
+          one clock for every four digits.
+        """
+        from adafruit_displayio_flipclock.memory_report import clock_report
+
+        return clock_report(self, digit_count)
+
+    @property
+    def stats(self):
+        """
+        The `FlipStats` shared by the four digits, or None when flips aren't measured.
+        """
+        return self.digit_0.stats
+
+    @stats.setter
+    def stats(self, stats) -> None:
+        for digit in (self.digit_0, self.digit_1, self.digit_2, self.digit_3):
+            digit.stats = stats
+
+    @property
+    def trace(self):
+        """
+        The `FlipTrace` shared by the four digits, or None when flips aren't traced.
+        """
+        return self.digit_0.trace
+
+    @trace.setter
+    def trace(self, trace) -> None:
+        for digit in (self.digit_0, self.digit_1, self.digit_2, self.digit_3):
+            digit.trace = trace
+
+    @property
+    def brightness(self) -> float:
+        """
+        The brightness of the clock, 0.0 - 1.0, relative to the palettes it was created
+        with. Setting it stops any fade in progress, see `FlipDigit.brightness`.
+        """
+        return self.digit_0.brightness
+
+    @brightness.setter
+    def brightness(self, brightness: float) -> None:
+        check_brightness(brightness)
+        self._fade = None
+        for digit in (self.digit_0, self.digit_1, self.digit_2, self.digit_3):
+            digit.brightness = brightness
+        self._colon_brightness()
+
+    def fade_brightness(
+        self, brightness: float, steps: int = 8, colors_per_poll: int = COLORS_PER_POLL
+    ) -> None:
+        """
+        Start fading the clock to a new brightness. The fade goes on as `poll` is called
+        from the main loop, each call working out a few palette colors so flips keep
+        running smoothly.
+
+        :param float brightness: The brightness to fade to, 0.0 - 1.0
+        :param int steps: The number of brightness steps to fade through
+        :param int colors_per_poll: The number of palette colors to work out each poll
+        """
+        self._fade = BrightnessFade(
+            (self.digit_0, self.digit_1, self.digit_2, self.digit_3),
+            brightness,
+            steps=steps,
+            colors_per_poll=colors_per_poll,
+        )
+
+    def poll(self) -> bool:
+        """
+        Blink the colon when it is due, move a brightness fade started with
+        `fade_brightness` along and let animation frame sources read ahead, see
+        `FlipDigit.poll`. Cheap to call every pass of the main loop. Returns whether a
+        fade is still going.
+        """
+        # the digits share their config and so their frame sources
+        self.digit_0.poll()
+        if self._blink_ns:
+            now = time.monotonic_ns()
+            if now >= self._next_blink_ns:
+                self.colon_visible = not self.colon_visible
+                self._next_blink_ns += self._blink_ns
+                if self._next_blink_ns <= now:
+                    # fell behind, blink on time from now on
+                    self._next_blink_ns = now + self._blink_ns
+        fade = self._fade
+        if fade is None:
+            return False
+        fading = fade.poll()
+        self._colon_brightness()
+        if not fading:
+            self._fade = None
+        return fading
+
+    def _colon_brightness(self) -> None:
+        """
+        Show the colon at the brightness of the digits.
+        """
+        if self.colon is not None:
+            self.colon.pixel_shader = self.digit_0.palette_set.static
+        else:
+            self._colon_palette[0] = scale_color(self.colon_color, self.digit_0.brightness)
+
+    @property
+    def colon_visible(self) -> bool:
+        """
+        Whether the colon is showing. A sprite colon switches to the blank sprite while
+        it is off, or hides its TileGrids if there is none, circles are hidden.
+        """
+        if self.colon is not None:
+            return self.colon.visible
+        return not self._colon_circles[0].hidden
+
+    @colon_visible.setter
+    def colon_visible(self, visible: bool) -> None:
+        if self.colon is not None:
+            self.colon.visible = visible
+        else:
+            for circle in self._colon_circles:
+                circle.hidden = not visible
+
+    @property
+    def colon_blink(self) -> Optional[float]:
+        """
+        Time in seconds between the colon switching on and off as `poll` is called, or
+        None for a steady colon. Setting it shows the colon and starts counting from now.
+        """
+        if not self._blink_ns:
+            return None
+        return self._blink_ns / 1000000000
+
+    @colon_blink.setter
+    def colon_blink(self, interval: Optional[float]) -> None:
+        self.colon_visible = True
+        if not interval:
+            self._blink_ns = 0
+            return
+        self._blink_ns = int(interval * 1000000000)
+        self._next_blink_ns = time.monotonic_ns() + self._blink_ns
+
     @property
     def first_pair(self) -> str:
         """
@@ -248,14 +605,14 @@ class FlipClock(Widget):
         new_pair = self._validate_new_pair(new_pair)
 
         # if first digit is different
-        if self.digit_0.value != int(new_pair[0]):
+        if self.digit_0.value != self._digit_value(new_pair[0]):
             # update first digit
-            self.digit_0.value = int(new_pair[0])
+            self.digit_0.value = self._digit_value(new_pair[0])
 
         # if second digit is different
-        if self.digit_1.value != int(new_pair[1]):
+        if self.digit_1.value != self._digit_value(new_pair[1]):
             # update second digit
-            self.digit_1.value = int(new_pair[1])
+            self.digit_1.value = self._digit_value(new_pair[1])
 
     @property
     def second_pair(self) -> str:
@@ -270,11 +627,11 @@ class FlipClock(Widget):
         new_pair = self._validate_new_pair(new_pair)
 
         # if first digit is different
-        if self.digit_2.value != int(new_pair[0]):
+        if self.digit_2.value != self._digit_value(new_pair[0]):
             # update the first digit
-            self.digit_2.value = int(new_pair[0])
+            self.digit_2.value = self._digit_value(new_pair[0])
 
         # if the second digit is different
-        if self.digit_3.value != int(new_pair[1]):
+        if self.digit_3.value != self._digit_value(new_pair[1]):
             # update second digit
-            self.digit_3.value = int(new_pair[1])
+            self.digit_3.value = self._digit_value(new_pair[1])
@@ -25,18 +25,37 @@ Implementation Notes
 """
 
 try:
-    from typing import Optional
-
-    from displayio import Bitmap
+    from typing import Optional, Sequence, Union
 except ImportError:
     pass
 import time
-
-from adafruit_displayio_layout.widgets.widget import Widget
-from displayio import Palette, TileGrid
-
-
-class FlipDigit(Widget):
+from array import array
+
+from displayio import Bitmap, Palette, TileGrid
+
+from adafruit_displayio_flipclock.anchored_group import AnchoredGroup
+from adafruit_displayio_flipclock.brightness import PaletteSet, check_brightness
+from adafruit_displayio_flipclock.flip_digit_config import (
+    BOTTOM_HALF_SPRITE_INDEXES,
+    TOP_HALF_SPRITE_INDEXES,
+    FlipDigitConfig,
+)
+from adafruit_displayio_flipclock.flip_trace import (
+    BOTTOM_ANIM,
+    BOTTOM_STATIC,
+    DARKER_PALETTE,
+    FLIP_BEGIN,
+    FLIP_END,
+    MEDIUM_PALETTE,
+    PALETTE,
+    TILE,
+    TOP_ANIM,
+    TOP_STATIC,
+    VISIBILITY,
+)
+
+
+class FlipDigit(AnchoredGroup):
     """
     DisplayIO widgets for a single digit that supports "flip clock" style animations
     when changing the value showing. User must load static and animation spritesheets
@@ -46,9 +65,18 @@ class FlipDigit(Widget):
     :param Palette static_spritesheet_palette: Palette to use with the static sprite sheet.
       set all desired transparent or opaque indexes before initializing.
     :param Bitmap top_anim_spritesheet: Spritesheet image of top half animation sprites.
+      Can also be a frame source such as a `SpriteAtlas`, `RLESpriteSheet`,
+      `OnDiskSpriteSheet`, `SynthesizedSpriteSheet` or `LazySpriteSheet`, any object with a
+      ``draw_frame(bitmap, index)`` method. Frames are then drawn into a tile sized
+      Bitmap owned by this digit. Frame sources with a ``prefetch(first_index, count)``
+      method are asked to queue the frames of the next likely flip after each flip, and
+      `poll` lets those with a ``poll()`` method read them.
+      Spritesheets with more tiles than fit in one Bitmap can be passed as `SpritePages`,
+      for the static spritesheet as well.
     :param Palette top_anim_palette: Palette to use with the top half animation sprites.
       set all desired transparent or opaque indexes before initializing.
     :param Bitmap bottom_anim_spritesheet: Spritesheet image of bottom half animation sprites.
+      Can also be a frame source, see top_anim_spritesheet.
     :param Palette bottom_anim_palette: Palette to use with the bottom half animation sprites.
       set all desired transparent or opaque indexes before initializing.
 
@@ -67,37 +95,68 @@ class FlipDigit(Widget):
       portion of the animations. And the static digit sprites. Valid range is 0.0 - 1.0.
     :param float darker_level: Brightness modifier value to use for the
       darkest "shadow" portion of the animations. Valid range is 0.0 - 1.0.
+    :param dict fader_cache: Optional dictionary used to share PaletteFader objects between
+      digits. Faders are created once per source palette and brightness level, so passing the
+      same palette for all three spritesheets and the same dictionary to several digits
+      creates one fader per brightness level in total.
+    :param top_anim_frame_map: Optional sequence mapping each animation frame,
+      ``value * anim_frame_count + frame``, to its tile index in the top animation
+      spritesheet. Used with spritesheets that had duplicate frames removed by the
+      spritesheet generator. Default None uses the frame index directly.
+    :param bottom_anim_frame_map: Optional sequence mapping each animation frame to its
+      tile index in the bottom animation spritesheet. See top_anim_frame_map.
+    :param top_static_indexes: Optional sequence of the static spritesheet tile index for the
+      top half of each value. Default None uses ``TOP_HALF_SPRITE_INDEXES``, which matches
+      the 3 sprite wide static sheets in the examples.
+    :param bottom_static_indexes: Optional sequence of the static spritesheet tile index for
+      the bottom half of each value. Default None uses ``BOTTOM_HALF_SPRITE_INDEXES``.
+    :param int scale: Integer factor to scale the sprites up by on the display, so one set
+      of small spritesheets can serve several digit sizes. The widget's width and height
+      used for anchoring are the scaled size. Default 1.
+    :param str charset: Optional characters of the spritesheets in order, such as
+      `charset.SPLIT_FLAP`. The value is then a single character of the set instead of an
+      int, and the index tables have an entry for each character. Default None shows the
+      int values 0-9.
+    :param dict config_cache: Optional dictionary used to share the `FlipDigitConfig`
+      holding everything but the TileGrids and value of a digit. Digits created with the
+      same spritesheets, palettes, tables and settings and the same dictionary share one
+      config, which keeps the memory used by each digit of a large wall of digits small.
+      The settings digits have always had, such as ``dynamic_fading`` and
+      ``anim_frame_count``, can still be read from the digit, the rest from its ``config``.
+
+    Attach a `FlipStats` to the ``stats`` attribute to count flips and frames and time
+    them. Nothing is measured while it is None, the default. Likewise attach a
+    `FlipTrace` to the ``trace`` attribute to record a timeline of every flip.
     """
 
-    # all characters that are valid
-    VALID_CHARACTERS = (0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 9)
-
-    # map of sprite indexes for top half animation sprite sheet
-    TOP_HALF_SPRITE_INDEX_MAP = {
-        0: 0,
-        1: 1,
-        2: 2,
-        3: 6,
-        4: 7,
-        5: 8,
-        6: 12,
-        7: 13,
-        8: 14,
-        9: 18,
-    }
-    # map of sprite indexes for bottom half animation sprite sheet
-    BOTTOM_HALF_SPRITE_INDEX_MAP = {
-        0: 3,
-        1: 4,
-        2: 5,
-        3: 9,
-        4: 10,
-        5: 11,
-        6: 15,
-        7: 16,
-        8: 17,
-        9: 21,
-    }
+    # all values that are valid without a charset
+    VALID_CHARACTERS = tuple(range(10))
+
+    # static sprite sheet tile index for each value, used for lookups
+    TOP_HALF_SPRITE_INDEXES = TOP_HALF_SPRITE_INDEXES
+    BOTTOM_HALF_SPRITE_INDEXES = BOTTOM_HALF_SPRITE_INDEXES
+
+    # the same indexes keyed by value, as earlier versions had them
+    TOP_HALF_SPRITE_INDEX_MAP = dict(enumerate(TOP_HALF_SPRITE_INDEXES))
+    BOTTOM_HALF_SPRITE_INDEX_MAP = dict(enumerate(BOTTOM_HALF_SPRITE_INDEXES))
+
+    # the state of each digit, everything else is in the shared config. CPython keeps
+    # these out of an instance dict, CircuitPython ignores __slots__.
+    __slots__ = (
+        "config",
+        "anim_delay",
+        "stats",
+        "_trace",
+        "_trace_id",
+        "_palette_set",
+        "_lazy",
+        "_value",
+        "_glyph",
+        "top_static_tilegrid",
+        "bottom_static_tilegrid",
+        "top_anim_tilegrid",
+        "bottom_anim_tilegrid",
+    )
 
     def __init__(
         self,
@@ -115,59 +174,96 @@ class FlipDigit(Widget):
         brighter_level: float = 0.85,
         darker_level: float = 0.6,
         medium_level: float = 0.8,
+        fader_cache: Optional[dict] = None,
+        top_anim_frame_map: Optional[Sequence[int]] = None,
+        bottom_anim_frame_map: Optional[Sequence[int]] = None,
+        top_static_indexes: Optional[Sequence[int]] = None,
+        bottom_static_indexes: Optional[Sequence[int]] = None,
+        scale: int = 1,
+        charset: Optional[str] = None,
+        config_cache: Optional[dict] = None,
     ) -> None:
-        # initialize parent Widget object
-        super().__init__(width=tile_width, height=tile_height * 2)
-
-        # setup for dynamic fading (or not if it's disabled)
-        self.dynamic_fading = dynamic_fading
-        static_palette = None
-        bottom_palette = None
-        top_palette = None
-        if dynamic_fading:
-            from cedargrove_palettefader.palettefader import PaletteFader
-
-            self.static_fader = PaletteFader(static_spritesheet_palette, medium_level, 1.0)
-            self.darker_static_fader = PaletteFader(static_spritesheet_palette, darker_level, 1.0)
-            self.bottom_anim_fader = PaletteFader(bottom_anim_palette, brighter_level, 1.0)
-            self.top_anim_fader = PaletteFader(top_anim_palette, darker_level, 1.0)
-            static_palette = self.static_fader.palette
-            bottom_palette = self.bottom_anim_fader.palette
-            top_palette = self.top_anim_fader.palette
-        else:
-            static_palette = static_spritesheet_palette
-            bottom_palette = bottom_anim_palette
-            top_palette = top_anim_palette
+        # initialize parent AnchoredGroup object
+        super().__init__(scale=scale, width=tile_width * scale, height=tile_height * 2 * scale)
 
-        # store animation variables on self for access in other functions
+        # everything that isn't particular to this digit lives in a shared config
+        config_args = (
+            static_spritesheet,
+            static_spritesheet_palette,
+            top_anim_spritesheet,
+            top_anim_palette,
+            bottom_anim_spritesheet,
+            bottom_anim_palette,
+            tile_width,
+            tile_height,
+        )
+        config_kwargs = {
+            "anim_frame_count": anim_frame_count,
+            "dynamic_fading": dynamic_fading,
+            "brighter_level": brighter_level,
+            "darker_level": darker_level,
+            "medium_level": medium_level,
+            "top_anim_frame_map": top_anim_frame_map,
+            "bottom_anim_frame_map": bottom_anim_frame_map,
+            "top_static_indexes": top_static_indexes,
+            "bottom_static_indexes": bottom_static_indexes,
+            "charset": charset,
+        }
+        if config_cache is None:
+            config_cache = {}
+        config = FlipDigitConfig.cached(
+            config_cache, *config_args, fader_cache=fader_cache, **config_kwargs
+        )
+        self.config = config
+
+        # store animation delay on self, digits sharing a config can flip at their own pace
         self.anim_delay = anim_delay
-        self.anim_frame_count = anim_frame_count
+
+        # optional FlipStats and FlipTrace, flips are only measured while they are set
+        self.stats = None
+        self._trace = None
+        self._trace_id = 0
+
+        # palettes shown at the current brightness, switched as a whole when it changes
+        self._palette_set = config.full_palette_set
+
+        # frame sources draw into a tile sized bitmap of this digit's own
+        top_anim_bitmap = config.top_anim_bitmap
+        if top_anim_bitmap is None:
+            top_anim_bitmap = Bitmap(tile_width, tile_height, len(top_anim_palette))
+        bottom_anim_bitmap = config.bottom_anim_bitmap
+        if bottom_anim_bitmap is None:
+            bottom_anim_bitmap = Bitmap(tile_width, tile_height, len(bottom_anim_palette))
+        # lazy spritesheets that load a Bitmap are switched to by the first flip
+        self._lazy = False
+        self._check_lazy()
 
         # top static tilegrid init
         self.top_static_tilegrid = TileGrid(
-            static_spritesheet,
-            pixel_shader=static_palette,
+            config.static_bitmap,
+            pixel_shader=self._palette_set.static,
             height=1,
             width=1,
             tile_width=tile_width,
             tile_height=tile_height,
         )
+        self._set_static_tile(self.top_static_tilegrid, config.top_static_indexes[0])
 
         # bottom static tilegrid init
         self.bottom_static_tilegrid = TileGrid(
-            static_spritesheet,
-            pixel_shader=static_palette,
+            config.static_bitmap,
+            pixel_shader=self._palette_set.static,
             height=1,
-            default_tile=3,
             width=1,
             tile_width=tile_width,
             tile_height=tile_height,
         )
+        self._set_static_tile(self.bottom_static_tilegrid, config.bottom_static_indexes[0])
 
         # top animation tilegrid init
         self.top_anim_tilegrid = TileGrid(
-            top_anim_spritesheet,
-            pixel_shader=top_palette,
+            top_anim_bitmap,
+            pixel_shader=self._palette_set.top,
             height=1,
             width=1,
             tile_width=tile_width,
@@ -176,8 +272,8 @@ class FlipDigit(Widget):
 
         # bottom animation tilegrid init
         self.bottom_anim_tilegrid = TileGrid(
-            bottom_anim_spritesheet,
-            pixel_shader=bottom_palette,
+            bottom_anim_bitmap,
+            pixel_shader=self._palette_set.bottom,
             height=1,
             width=1,
             tile_width=tile_width,
@@ -202,18 +298,142 @@ class FlipDigit(Widget):
         # set y position of bottom animation tilegrid
         self.bottom_anim_tilegrid.y = tile_height
 
-        # variable to hold current value
-        self._value = 0
+        # variables to hold current value and its glyph index
+        self._value = 0 if charset is None else charset[0]
+        self._glyph = 0
+
+    @classmethod
+    def from_manifest(cls, manifest, **kwargs) -> "FlipDigit":
+        """
+        Create a FlipDigit from the manifest written by the spritesheet generator. The
+        spritesheets it lists are loaded, their transparent indexes set and the tile size,
+        frame count and index tables are taken from it.
+
+        :param manifest: A `SpriteManifest`, or the filename of a manifest to load.
+          Pass the same `SpriteManifest` to several widgets to load the spritesheets once.
+        :param kwargs: Any other FlipDigit arguments, such as anim_delay or dynamic_fading.
+        """
+        from adafruit_displayio_flipclock.sprite_manifest import SpriteManifest
+
+        if isinstance(manifest, str):
+            manifest = SpriteManifest.load(manifest)
+        args, manifest_kwargs = manifest.widget_arguments()
+        manifest_kwargs.update(kwargs)
+        return cls(*args, **manifest_kwargs)
+
+    @classmethod
+    def from_assets(cls, assets, **kwargs) -> "FlipDigit":
+        """
+        Create a FlipDigit from a `FlipAssets` registry. The spritesheets, palettes and
+        PaletteFaders are shared with every other widget created from the same assets,
+        and the widget is counted as one of their users.
+
+        :param FlipAssets assets: The loaded assets to use.
+        :param kwargs: Any other FlipDigit arguments, such as anim_delay or dynamic_fading.
+        """
+        args, asset_kwargs = assets.widget_arguments()
+        asset_kwargs.update(kwargs)
+        widget = cls(*args, **asset_kwargs)
+        assets.acquire()
+        return widget
+
+    @property
+    def anim_frame_count(self) -> int:
+        """
+        The number of frames in each half of a flip animation. Setting it switches the
+        digit to a config with that many frames, shared with other digits of the same
+        config cache.
+        """
+        return self.config.anim_frame_count
+
+    @anim_frame_count.setter
+    def anim_frame_count(self, anim_frame_count: int) -> None:
+        self._change_config(anim_frame_count=anim_frame_count)
+
+    @property
+    def charset(self) -> Optional[str]:
+        """The characters the digit can show, None for the digits 0-9."""
+        return self.config.charset
+
+    @property
+    def dynamic_fading(self) -> bool:
+        """
+        Whether the palettes are faded while flipping. Setting it switches the digit to a
+        config with or without PaletteFaders, like `anim_frame_count`.
+        """
+        return self.config.dynamic_fading
+
+    @dynamic_fading.setter
+    def dynamic_fading(self, dynamic_fading: bool) -> None:
+        self._change_config(dynamic_fading=dynamic_fading)
+
+    @property
+    def static_fader(self):
+        """
+        The PaletteFader of the static sprites, None without dynamic fading. The faders
+        are shared through the config and can't be replaced on a single digit, pass a
+        fader_cache holding the faders to use instead.
+        """
+        return self.config.static_fader
+
+    @property
+    def darker_static_fader(self):
+        """The PaletteFader of the darkened bottom static sprite, None without dynamic fading."""
+        return self.config.darker_static_fader
+
+    @property
+    def top_anim_fader(self):
+        """The PaletteFader of the top animation sprites, None without dynamic fading."""
+        return self.config.top_anim_fader
+
+    @property
+    def bottom_anim_fader(self):
+        """The PaletteFader of the bottom animation sprites, None without dynamic fading."""
+        return self.config.bottom_anim_fader
+
+    def _change_config(self, **settings) -> None:
+        """
+        Switch to the config with some settings changed, keeping the value showing and
+        the brightness.
+
+        :param settings: The FlipDigitConfig keyword arguments to change
+        """
+        brightness = self.brightness
+        self.config = self.config.with_settings(**settings)
+        self.palette_set = self.config.palette_set(brightness)
+        self._check_lazy()
+
+    def _check_lazy(self) -> None:
+        """
+        Note that the next flip has to switch to lazy spritesheets the config has
+        loaded, or load them.
+        """
+        config = self.config
+        if hasattr(config.top_anim_source, "loaded") or hasattr(
+            config.bottom_anim_source, "loaded"
+        ):
+            self._lazy = True
 
-        # variables used during animation frames
-        self.current_animation_frame = 0
-        self.top_animating_value = None
-        self.bottom_animating_value = None
+    def memory_report(self, digit_count: Optional[int] = None) -> dict:
+        """
+        Estimate the RAM used by this digit, in bytes. The report splits it into memory
+        shared with other digits using the same config, the spritesheets, palettes,
+        PaletteFaders, index tables and config itself, and memory the digit owns: its
+        TileGrids, frame bitmaps and Python objects. Each part is broken down by category
+        and totalled. See `memory_report` for how sizes are estimated.
+
+        :param int digit_count: Optional number of digits like this one to estimate the
+          total for, returned as ``estimated_total``. Useful for checking whether a layout
+          will fit a board.
+        """
+        from adafruit_displayio_flipclock.memory_report import digit_report
+
+        return digit_report(self, digit_count)
 
     @property
-    def value(self) -> int:
+    def value(self) -> Union[int, str]:
         """
-        The current value of the digit as an integer.
+        The current value of the digit, an integer or a character of the charset.
         """
         return self._value
 
@@ -226,88 +446,401 @@ class FlipDigit(Widget):
         """
         # ignore new_value if it's the same as current
         if new_value != self.value:
-            # if the new value is valid
-            if (
-                isinstance(new_value, int)
-                and 0 <= new_value <= 9
-                and new_value in FlipDigit.VALID_CHARACTERS
-            ):
-                # store current value to use later
-                _old_value = self.value
+            # find the glyph of the new value, raises ValueError if it is invalid
+            new_glyph = self._glyph_index(new_value)
+            config = self.config
+
+            stats = self.stats
+            if stats is not None:
+                stats.flips_started += 1
+                flip_start = time.monotonic_ns()
+            trace = self._trace
+            if trace is not None:
+                trace.record(FLIP_BEGIN, self._trace_id, 0, new_glyph)
+
+            # store current glyph to use later
+            _old_glyph = self._glyph
+
+            # update the value variables
+            self._value = new_value
+            self._glyph = new_glyph
+
+            if self._lazy:
+                self._adopt_loaded_spritesheets()
+
+            # set the first frame of the animation spritesheet into
+            # top animation tilegrid
+            top_tile = self._set_top_anim_frame(_old_glyph, 0)
+
+            # show the top animation tilegrid
+            self.top_anim_tilegrid.hidden = False
+
+            # set the top static tilegrid to its new value
+            # This is hidden behind the top animation tilegrid initially
+            self._set_static_tile(self.top_static_tilegrid, config.top_static_indexes[new_glyph])
+
+            if trace is not None:
+                trace_id = self._trace_id
+                trace.record(TILE, trace_id, TOP_ANIM, top_tile)
+                trace.record(VISIBILITY, trace_id, TOP_ANIM, 1)
+                trace.record(TILE, trace_id, TOP_STATIC, config.top_static_indexes[new_glyph])
+
+            # if dynamic fading is enabled
+            if config.dynamic_fading:
+                # set the bottom static tilegrid to use the darker color palette
+                self.bottom_static_tilegrid.pixel_shader = self._palette_set.darker_static
+                if trace is not None:
+                    trace.record(PALETTE, self._trace_id, BOTTOM_STATIC, DARKER_PALETTE)
+
+            # Run the top half flip animation
+            self.top_flip_animate(value=_old_glyph)
+
+            # hide the top animation tilegrid
+            self.top_anim_tilegrid.hidden = True
+
+            # set the bottom animation tilegrid to it's new value
+            bottom_tile = self._set_bottom_anim_frame(new_glyph, 0)
+
+            # show the bottom animation tilegrid
+            self.bottom_anim_tilegrid.hidden = False
+
+            if trace is not None:
+                trace_id = self._trace_id
+                trace.record(VISIBILITY, trace_id, TOP_ANIM, 0)
+                trace.record(TILE, trace_id, BOTTOM_ANIM, bottom_tile)
+                trace.record(VISIBILITY, trace_id, BOTTOM_ANIM, 1)
+
+            # run the bottom half flip animation
+            self.bottom_flip_animate(value=new_glyph)
+
+            # set the bottom static tilegrid to new value sprite index
+            self._set_static_tile(
+                self.bottom_static_tilegrid, config.bottom_static_indexes[new_glyph]
+            )
+
+            # hide the bottom animation tilegrid
+            # which reveals the bottom static tilegrid
+            self.bottom_anim_tilegrid.hidden = True
+
+            if trace is not None:
+                trace_id = self._trace_id
+                trace.record(TILE, trace_id, BOTTOM_STATIC, config.bottom_static_indexes[new_glyph])
+                trace.record(VISIBILITY, trace_id, BOTTOM_ANIM, 0)
+
+            # if dynamic faiding is enabled
+            if config.dynamic_fading:
+                # set the bottom static tilegrid back to the medium brightness palette
+                self.bottom_static_tilegrid.pixel_shader = self._palette_set.static
+                if trace is not None:
+                    trace.record(PALETTE, self._trace_id, BOTTOM_STATIC, MEDIUM_PALETTE)
+
+            # read the frames of the next likely flip ahead of time
+            self._prefetch_frames(new_glyph)
+
+            if stats is not None:
+                stats.flips_completed += 1
+                stats.flip_durations.add(time.monotonic_ns() - flip_start)
+            if trace is not None:
+                trace.record(FLIP_END, self._trace_id, 0, new_glyph)
 
-                # update the value variable
-                self._value = new_value
+    @property
+    def trace(self):
+        """
+        The `FlipTrace` recording this digit's flips, or None when they aren't traced.
+        """
+        return self._trace
+
+    @trace.setter
+    def trace(self, trace) -> None:
+        self._trace = trace
+        self._trace_id = 0 if trace is None else trace.register(self)
 
-                # set the first frame of the animation spritesheet into
-                # top animation tilegrid
-                self.top_anim_tilegrid[0] = _old_value * self.anim_frame_count
+    @property
+    def brightness(self) -> float:
+        """
+        The brightness of the digit, 0.0 - 1.0, relative to the palettes it was created
+        with. The palettes for each brightness are worked out the first time it is used
+        and kept in the shared config, so going back to a recent brightness only
+        switches the palettes the TileGrids use. See `FlipClock.fade_brightness` for
+        changing it gradually.
+        """
+        return self._palette_set.brightness
 
-                # show the top animation tilegrid
-                self.top_anim_tilegrid.hidden = False
+    @brightness.setter
+    def brightness(self, brightness: float) -> None:
+        check_brightness(brightness)
+        self.palette_set = self.config.palette_set(brightness)
 
-                # set the top static tilegrid to its new value
-                # This is hidden behind the top animation tilegrid initially
-                self.top_static_tilegrid[0] = FlipDigit.TOP_HALF_SPRITE_INDEX_MAP[new_value]
+    @property
+    def palette_set(self) -> PaletteSet:
+        """
+        The `PaletteSet` the digit's TileGrids currently show.
+        """
+        return self._palette_set
+
+    @palette_set.setter
+    def palette_set(self, palette_set: PaletteSet) -> None:
+        old_set = self._palette_set
+        self._palette_set = palette_set
+        self.top_static_tilegrid.pixel_shader = palette_set.static
+        self.top_anim_tilegrid.pixel_shader = palette_set.top
+        self.bottom_anim_tilegrid.pixel_shader = palette_set.bottom
+        # keep the bottom static tilegrid darker if the top half is flipping over it
+        bottom_static = self.bottom_static_tilegrid
+        if (
+            old_set.darker_static is not None
+            and bottom_static.pixel_shader is old_set.darker_static
+        ):
+            bottom_static.pixel_shader = palette_set.darker_static
+        else:
+            bottom_static.pixel_shader = palette_set.static
 
-                # if dynamic fading is enabled
-                if self.dynamic_fading:
-                    # set the bottom static tilegrid to use the darker color palette
-                    self.bottom_static_tilegrid.pixel_shader = self.darker_static_fader.palette
+    def _glyph_index(self, value: Union[int, str]) -> int:
+        """
+        Find the position of a value in the spritesheets, raising ValueError if
+        it is not valid.
 
-                # Run the top half flip animation
-                self.top_flip_animate(value=_old_value)
+        :param value: The int 0-9, or the character of the charset, to look up
+        """
+        table = self.config.glyph_table
+        if table is None:
+            if isinstance(value, int) and 0 <= value <= 9:
+                return value
+        elif isinstance(value, str) and len(value) == 1 and ord(value) < 256:
+            glyph = table[ord(value)]
+            if glyph:
+                return glyph - 1
+        expected = "int 0-9" if table is None else "a character of the charset"
+        raise ValueError(f"Invalid new value: {type(value)}: {value}. Must be {expected}")
+
+    def _set_static_tile(self, tilegrid: TileGrid, index: int) -> None:
+        """
+        Show a static spritesheet tile in one of the static tilegrids.
 
-                # hide the top animation tilegrid
-                self.top_anim_tilegrid.hidden = True
+        :param TileGrid tilegrid: The top or bottom static tilegrid
+        :param int index: The static spritesheet tile index
+        """
+        static_pages = self.config.static_pages
+        if static_pages is not None:
+            static_pages.show_tile(tilegrid, index)
+        else:
+            tilegrid[0] = index
 
-                # set the bottom animation tilegrid to it's new value
-                self.bottom_anim_tilegrid[0] = new_value * self.anim_frame_count
+    def _adopt_loaded_spritesheets(self) -> None:
+        """
+        Load lazy animation spritesheets and show the tiles of those that loaded a
+        Bitmap instead of drawing their frames into this digit's own bitmaps, which are
+        then released.
+        """
+        config = self.config
+        config.adopt_loaded_spritesheets()
+        if config.top_anim_source is None:
+            self.top_anim_tilegrid = self._replace_anim_tilegrid(
+                self.top_anim_tilegrid, config.top_anim_bitmap
+            )
+        if config.bottom_anim_source is None:
+            self.bottom_anim_tilegrid = self._replace_anim_tilegrid(
+                self.bottom_anim_tilegrid, config.bottom_anim_bitmap
+            )
+        self._lazy = False
+
+    def _replace_anim_tilegrid(self, tilegrid: TileGrid, bitmap: Bitmap) -> TileGrid:
+        """
+        Put a TileGrid showing the tiles of a spritesheet Bitmap in the place of an
+        animation tilegrid. A TileGrid's bitmap can only be switched to one of the same
+        size, so the tile sized one can't be pointed at the spritesheet.
 
-                # show the bottom animation tilegrid
-                self.bottom_anim_tilegrid.hidden = False
+        :param TileGrid tilegrid: The animation tilegrid to replace
+        :param Bitmap bitmap: The animation spritesheet Bitmap to show
+        """
+        config = self.config
+        new_tilegrid = TileGrid(
+            bitmap,
+            pixel_shader=tilegrid.pixel_shader,
+            height=1,
+            width=1,
+            tile_width=config.tile_width,
+            tile_height=config.tile_height,
+            x=tilegrid.x,
+            y=tilegrid.y,
+        )
+        new_tilegrid.hidden = tilegrid.hidden
+        self[self.index(tilegrid)] = new_tilegrid
+        return new_tilegrid
 
-                # run the bottom half flip animation
-                self.bottom_flip_animate(value=new_value)
+    def poll(self) -> bool:
+        """
+        Let the animation frame sources read ahead the frames queued after the last
+        flip, such as `OnDiskSpriteSheet` does one frame per call. Cheap to call every
+        pass of the main loop. Returns whether they are done reading ahead.
+        """
+        config = self.config
+        done = True
+        if hasattr(config.top_anim_source, "poll"):
+            done = config.top_anim_source.poll() and done
+        if hasattr(config.bottom_anim_source, "poll"):
+            done = config.bottom_anim_source.poll() and done
+        return done
+
+    def _prefetch_frames(self, value: int) -> None:
+        """
+        Let frame sources that read from disk queue the frames used to flip from
+        value to the value after it, see `poll`.
 
-                # set the bottom static tilegrid to new value sprite index
-                self.bottom_static_tilegrid[0] = FlipDigit.BOTTOM_HALF_SPRITE_INDEX_MAP[new_value]
+        :param int value: The glyph index of the value currently showing
+        """
+        config = self.config
+        count = config.anim_frame_count
+        if hasattr(config.top_anim_source, "prefetch"):
+            config.top_anim_source.prefetch(value * count, count)
+        if hasattr(config.bottom_anim_source, "prefetch"):
+            config.bottom_anim_source.prefetch(((value + 1) % config.glyph_count) * count, count)
+
+    def _set_top_anim_frame(self, value: int, frame: int) -> int:
+        """
+        Show a frame of the top half flip animation for a value. Returns the index
+        shown: the tile index set in the tilegrid or passed to ``show_tile``, or the
+        frame index passed to the frame source's ``draw_frame``.
 
-                # hide the bottom animation tilegrid
-                # which reveals the bottom static tilegrid
-                self.bottom_anim_tilegrid.hidden = True
+        :param int value: The glyph index of the value being animated
+        :param int frame: The frame of the animation
+        """
+        config = self.config
+        index = value * config.anim_frame_count + frame
+        if config.top_anim_source is not None:
+            config.top_anim_source.draw_frame(self.top_anim_tilegrid.bitmap, index)
+            return index
+        index = config.top_anim_tiles[index]
+        if config.top_anim_pages is not None:
+            config.top_anim_pages.show_tile(self.top_anim_tilegrid, index)
+        else:
+            self.top_anim_tilegrid[0] = index
+        return index
 
-                # if dynamic faiding is enabled
-                if self.dynamic_fading:
-                    # set the bottom static tilegrid back to the medium brightness palette
-                    self.bottom_static_tilegrid.pixel_shader = self.static_fader.palette
+    def _set_bottom_anim_frame(self, value: int, frame: int) -> int:
+        """
+        Show a frame of the bottom half flip animation for a value. Returns the index
+        shown, see `_set_top_anim_frame`.
 
-            else:  # new_value was invalid
-                raise ValueError(
-                    f"Invalid new value: {type(new_value)}: {new_value}. Must be int 0-9"
-                )
+        :param int value: The glyph index of the value being animated
+        :param int frame: The frame of the animation
+        """
+        config = self.config
+        index = value * config.anim_frame_count + frame
+        if config.bottom_anim_source is not None:
+            config.bottom_anim_source.draw_frame(self.bottom_anim_tilegrid.bitmap, index)
+            return index
+        index = config.bottom_anim_tiles[index]
+        if config.bottom_anim_pages is not None:
+            config.bottom_anim_pages.show_tile(self.bottom_anim_tilegrid, index)
+        else:
+            self.bottom_anim_tilegrid[0] = index
+        return index
 
     def top_flip_animate(self, value: int) -> None:
         """
         Blocking function that displays the top animation sprites sequentially
         sleeping for anim_delay between each.
         """
+        if self.stats is not None or self._trace is not None:
+            self._measured_animate(self._set_top_anim_frame, value, "top")
+            return
+
+        # plain spritesheets only need the tile index of each frame
+        config = self.config
+        if config.top_anim_pages is None and config.top_anim_tiles is not None:
+            self._animate_tiles(self.top_anim_tilegrid, config.top_anim_tiles, value)
+            return
+
+        # keep the bound method and delay in locals for the frame loop
+        set_frame = self._set_top_anim_frame
+        sleep = time.sleep
+        delay = self.anim_delay
+
         # loop over frame count
-        for i in range(self.anim_frame_count):
+        for i in range(config.anim_frame_count):
             # set the top animation sprite to current animation frame sprite index
-            self.top_anim_tilegrid[0] = i + (value * self.anim_frame_count)
+            set_frame(value, i)
 
             # sleep for delay
-            time.sleep(self.anim_delay)
+            sleep(delay)
 
     def bottom_flip_animate(self, value: int) -> None:
         """
         Blocking function that displays the bottom animation sprites sequentially
         sleeping for anim_delay between each.
         """
+        if self.stats is not None or self._trace is not None:
+            self._measured_animate(self._set_bottom_anim_frame, value, "bottom")
+            return
+
+        # plain spritesheets only need the tile index of each frame
+        config = self.config
+        if config.bottom_anim_pages is None and config.bottom_anim_tiles is not None:
+            self._animate_tiles(self.bottom_anim_tilegrid, config.bottom_anim_tiles, value)
+            return
+
+        # keep the bound method and delay in locals for the frame loop
+        set_frame = self._set_bottom_anim_frame
+        sleep = time.sleep
+        delay = self.anim_delay
+
         # loop over frame count
-        for i in range(self.anim_frame_count):
+        for i in range(config.anim_frame_count):
             # set the bottom animation sprite to current animation frame sprite index
-            self.bottom_anim_tilegrid[0] = i + (value * self.anim_frame_count)
+            set_frame(value, i)
 
             # sleep for delay
+            sleep(delay)
+
+    def _animate_tiles(self, tilegrid: TileGrid, tiles: array, value: int) -> None:
+        """
+        The animation loop for plain spritesheets. Everything used per frame is held
+        in locals and the tile indexes come from a precomputed table, so no memory is
+        allocated between frames.
+
+        :param TileGrid tilegrid: The animation tilegrid of the half being animated
+        :param array tiles: The tile index of every animation frame
+        :param int value: The glyph index of the value being animated
+        """
+        sleep = time.sleep
+        delay = self.anim_delay
+        frame_count = self.config.anim_frame_count
+        first_frame = value * frame_count
+        for index in range(first_frame, first_frame + frame_count):
+            tilegrid[0] = tiles[index]
+            sleep(delay)
+
+    def _measured_animate(self, set_frame, value: int, half: str) -> None:
+        """
+        The animation loop used while stats or a trace are attached. Records every
+        frame and its overrun in the stats and calls their frame callback, and adds a
+        tile event with the index shown for every frame to the trace.
+
+        :param set_frame: The method that shows a frame of the half being animated
+        :param int value: The glyph index of the value being animated
+        :param str half: "top" or "bottom"
+        """
+        stats = self.stats
+        trace = self._trace
+        layer = TOP_ANIM if half == "top" else BOTTOM_ANIM
+        frame_count = self.config.anim_frame_count
+        delay_ns = int(self.anim_delay * 1000000000)
+        frame_start = time.monotonic_ns()
+        for i in range(frame_count):
+            index = set_frame(value, i)
+            if trace is not None:
+                trace.record(TILE, self._trace_id, layer, index)
             time.sleep(self.anim_delay)
+            if stats is None:
+                continue
+
+            now = time.monotonic_ns()
+            overrun = max(now - frame_start - delay_ns, 0)
+            frame_start = now
+            stats.frames_drawn += 1
+            stats.frame_overruns.add(overrun)
+            if delay_ns and overrun >= delay_ns:
+                stats.frames_dropped += 1
+            if stats.frame_callback is not None:
+                stats.frame_callback(self, half, i, overrun)
@@ -0,0 +1,366 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.flip_digit_config`
+================================================================================
+
+Configuration shared by every `FlipDigit` created with the same spritesheets and
+settings, so that large walls of digits only hold their own TileGrids and value.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Optional, Sequence
+
+    from displayio import Bitmap, Palette
+except ImportError:
+    pass
+
+from array import array
+
+from adafruit_displayio_flipclock.brightness import PaletteSet, PaletteSetBuilder, check_brightness
+from adafruit_displayio_flipclock.charset import glyph_table
+
+# static sprite sheet tile index for each value, used for lookups
+TOP_HALF_SPRITE_INDEXES = (0, 1, 2, 6, 7, 8, 12, 13, 14, 18)
+BOTTOM_HALF_SPRITE_INDEXES = (3, 4, 5, 9, 10, 11, 15, 16, 17, 21)
+
+# number of brightness palette sets kept besides the full brightness one
+PALETTE_SET_CACHE_SIZE = 3
+
+
+class FlipDigitConfig:
+    """
+    Everything about a `FlipDigit` that doesn't change from digit to digit: the
+    spritesheets and the palettes shown with them, PaletteFaders, index tables and
+    charset. Created by `FlipDigit` and shared through its config_cache argument, see
+    `FlipDigit` for the parameters.
+    """
+
+    def __init__(
+        self,
+        static_spritesheet: Bitmap,
+        static_spritesheet_palette: Palette,
+        top_anim_spritesheet: Bitmap,
+        top_anim_palette: Palette,
+        bottom_anim_spritesheet: Bitmap,
+        bottom_anim_palette: Palette,
+        tile_width: int,
+        tile_height: int,
+        anim_frame_count: int = 10,
+        dynamic_fading: bool = True,
+        brighter_level: float = 0.85,
+        darker_level: float = 0.6,
+        medium_level: float = 0.8,
+        fader_cache: Optional[dict] = None,
+        top_anim_frame_map: Optional[Sequence[int]] = None,
+        bottom_anim_frame_map: Optional[Sequence[int]] = None,
+        top_static_indexes: Optional[Sequence[int]] = None,
+        bottom_static_indexes: Optional[Sequence[int]] = None,
+        charset: Optional[str] = None,
+    ) -> None:
+        # the arguments and caches this config was made with, set by cached
+        self._arguments = None
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.anim_frame_count = anim_frame_count
+        self.top_anim_frame_map = top_anim_frame_map
+        self.bottom_anim_frame_map = bottom_anim_frame_map
+        self.static_spritesheet_palette = static_spritesheet_palette
+        self.top_anim_palette = top_anim_palette
+        self.bottom_anim_palette = bottom_anim_palette
+
+        # setup for dynamic fading (or not if it's disabled)
+        self.dynamic_fading = dynamic_fading
+        self.brighter_level = brighter_level
+        self.darker_level = darker_level
+        self.medium_level = medium_level
+        self.static_fader = None
+        self.darker_static_fader = None
+        self.bottom_anim_fader = None
+        self.top_anim_fader = None
+        if dynamic_fading:
+            if fader_cache is None:
+                fader_cache = {}
+            self.static_fader = FlipDigitConfig._get_fader(
+                fader_cache, static_spritesheet_palette, medium_level
+            )
+            self.darker_static_fader = FlipDigitConfig._get_fader(
+                fader_cache, static_spritesheet_palette, darker_level
+            )
+            self.bottom_anim_fader = FlipDigitConfig._get_fader(
+                fader_cache, bottom_anim_palette, brighter_level
+            )
+            self.top_anim_fader = FlipDigitConfig._get_fader(
+                fader_cache, top_anim_palette, darker_level
+            )
+            self.static_palette = self.static_fader.palette
+            self.bottom_palette = self.bottom_anim_fader.palette
+            self.top_palette = self.top_anim_fader.palette
+        else:
+            self.static_palette = static_spritesheet_palette
+            self.bottom_palette = bottom_anim_palette
+            self.top_palette = top_anim_palette
+
+        # palettes for each brightness used, full brightness being the ones above
+        darker_static_palette = None
+        if dynamic_fading:
+            darker_static_palette = self.darker_static_fader.palette
+        self.full_palette_set = PaletteSet(
+            1.0, self.static_palette, darker_static_palette, self.top_palette, self.bottom_palette
+        )
+        self._palette_sets = {}
+        self._recent_palette_sets = []
+        # palettes rewritten for every step a fade passes through, made on the first fade
+        self.fade_palette_set = None
+
+        # static sprite tile indexes for each value
+        if top_static_indexes is None:
+            top_static_indexes = TOP_HALF_SPRITE_INDEXES
+        if bottom_static_indexes is None:
+            bottom_static_indexes = BOTTOM_HALF_SPRITE_INDEXES
+        self.top_static_indexes = top_static_indexes
+        self.bottom_static_indexes = bottom_static_indexes
+
+        # table from character code to glyph index, or None for the int values 0-9
+        self.charset = charset
+        self.glyph_table = None
+        self.glyph_count = 10
+        if charset is not None:
+            self.glyph_table = glyph_table(charset)
+            self.glyph_count = len(charset)
+
+        # static spritesheets split over several Bitmaps show their tiles page by page
+        self.static_pages = None
+        self.static_bitmap = static_spritesheet
+        if hasattr(static_spritesheet, "show_tile"):
+            self.static_pages = static_spritesheet
+            self.static_bitmap = static_spritesheet.pages[0]
+
+        # frame sources draw into a bitmap of each digit's own instead of switching tiles
+        self.top_anim_source = None
+        self.top_anim_pages = None
+        self.top_anim_bitmap = FlipDigitConfig._anim_bitmap(top_anim_spritesheet)
+        if self.top_anim_bitmap is None:
+            self.top_anim_source = top_anim_spritesheet
+        elif hasattr(top_anim_spritesheet, "show_tile"):
+            self.top_anim_pages = top_anim_spritesheet
+        self.bottom_anim_source = None
+        self.bottom_anim_pages = None
+        self.bottom_anim_bitmap = FlipDigitConfig._anim_bitmap(bottom_anim_spritesheet)
+        if self.bottom_anim_bitmap is None:
+            self.bottom_anim_source = bottom_anim_spritesheet
+        elif hasattr(bottom_anim_spritesheet, "show_tile"):
+            self.bottom_anim_pages = bottom_anim_spritesheet
+
+        # tile index of every animation frame, looked up instead of computed while flipping
+        frame_total = self.glyph_count * anim_frame_count
+        self.top_anim_tiles = None
+        if self.top_anim_source is None:
+            self.top_anim_tiles = FlipDigitConfig._frame_table(top_anim_frame_map, frame_total)
+        self.bottom_anim_tiles = None
+        if self.bottom_anim_source is None:
+            self.bottom_anim_tiles = FlipDigitConfig._frame_table(
+                bottom_anim_frame_map, frame_total
+            )
+
+    @staticmethod
+    def cached(config_cache: dict, *args, fader_cache: Optional[dict] = None, **kwargs):
+        """
+        The config for a set of FlipDigitConfig arguments from a config cache, created
+        and stored in it if there isn't one yet. Configs made this way remember their
+        arguments and cache, see `with_settings`.
+
+        :param dict config_cache: The dictionary configs are shared through
+        :param args: The FlipDigitConfig arguments
+        :param dict fader_cache: Optional dictionary of PaletteFaders for new configs
+        :param kwargs: The FlipDigitConfig keyword arguments
+        """
+        key = FlipDigitConfig.cache_key(*args, **kwargs)
+        if key not in config_cache:
+            config = FlipDigitConfig(*args, fader_cache=fader_cache, **kwargs)
+            config._arguments = (args, kwargs, fader_cache, config_cache)
+            config_cache[key] = config
+        return config_cache[key]
+
+    def with_settings(self, **settings) -> "FlipDigitConfig":
+        """
+        The config for the same spritesheets and palettes as this one with some settings
+        changed, such as ``dynamic_fading`` or ``anim_frame_count``. It comes from the
+        config cache this one is in, so digits changing to the same settings share it.
+
+        :param settings: The FlipDigitConfig keyword arguments to change
+        """
+        args, kwargs, fader_cache, config_cache = self._arguments
+        kwargs = dict(kwargs)
+        kwargs.update(settings)
+        return FlipDigitConfig.cached(config_cache, *args, fader_cache=fader_cache, **kwargs)
+
+    def palette_set(self, brightness: float) -> PaletteSet:
+        """
+        The palettes to show at a brightness, working them out if they aren't cached.
+        Brightness 1.0 uses the palettes the config was created with. Only the last few
+        brightness levels used are kept.
+
+        :param float brightness: The brightness, 0.0 - 1.0
+        """
+        palette_set = self.cached_palette_set(brightness)
+        if palette_set is None:
+            check_brightness(brightness)
+            palette_set = PaletteSetBuilder(self, brightness).palette_set()
+            self.cache_palette_set(palette_set)
+        return palette_set
+
+    def cached_palette_set(self, brightness: float) -> Optional[PaletteSet]:
+        """
+        The palettes for a brightness if they are cached, otherwise None.
+
+        :param float brightness: The brightness, 0.0 - 1.0
+        """
+        key = round(brightness, 3)
+        if key == 1.0:
+            return self.full_palette_set
+        recent = self._recent_palette_sets
+        if key in self._palette_sets:
+            if recent[-1] != key:
+                recent.remove(key)
+                recent.append(key)
+            return self._palette_sets[key]
+        return None
+
+    def cache_palette_set(self, palette_set: PaletteSet) -> None:
+        """
+        Keep the palettes of a brightness, dropping the least recently used ones when
+        the cache is full.
+
+        :param PaletteSet palette_set: The palettes to keep
+        """
+        key = round(palette_set.brightness, 3)
+        if key == 1.0 or key in self._palette_sets:
+            return
+        if len(self._recent_palette_sets) >= PALETTE_SET_CACHE_SIZE:
+            del self._palette_sets[self._recent_palette_sets.pop(0)]
+        self._palette_sets[key] = palette_set
+        self._recent_palette_sets.append(key)
+
+    @property
+    def palette_sets(self) -> tuple:
+        """
+        Every palette set kept, full brightness first, and the one fades step through.
+        """
+        palette_sets = (self.full_palette_set,) + tuple(self._palette_sets.values())
+        if self.fade_palette_set is not None:
+            palette_sets += (self.fade_palette_set,)
+        return palette_sets
+
+    @staticmethod
+    def cache_key(*args, **kwargs) -> tuple:
+        """
+        The key a config is stored under in a config cache: the identity of the
+        spritesheets, palettes and tables it was created from and the other values.
+
+        :param args: The FlipDigitConfig arguments
+        :param kwargs: The FlipDigitConfig keyword arguments, except fader_cache
+        """
+        key = []
+        for value in args + tuple(kwargs[name] for name in sorted(kwargs)):
+            if value is None or isinstance(value, (int, float, str)):
+                key.append(value)
+            else:
+                key.append(id(value))
+        return tuple(key)
+
+    @staticmethod
+    def _get_fader(fader_cache: dict, palette: Palette, level: float):
+        """
+        Get the PaletteFader for a palette at a brightness level, creating
+        it and storing it in the cache if it doesn't exist yet.
+
+        :param dict fader_cache: Dictionary of faders keyed by palette and level
+        :param Palette palette: The source palette to fade
+        :param float level: The brightness level of the fader
+        """
+        key = (id(palette), level)
+        if key not in fader_cache:
+            from cedargrove_palettefader.palettefader import PaletteFader
+
+            fader_cache[key] = PaletteFader(palette, level, 1.0)
+        return fader_cache[key]
+
+    def adopt_loaded_spritesheets(self) -> bool:
+        """
+        Load `LazySpriteSheet` animation sources and show the spritesheet Bitmaps or
+        `SpritePages` they loaded by tile index, as if they had been passed in loaded,
+        instead of copying every frame into a bitmap of each digit. Lazy sources that
+        loaded a frame source are kept. Returns whether a source was switched.
+        """
+        frame_total = self.glyph_count * self.anim_frame_count
+        adopted = False
+        source = self.top_anim_source
+        if hasattr(source, "loaded"):
+            source.load()
+            bitmap = FlipDigitConfig._anim_bitmap(source.spritesheet)
+            if bitmap is not None:
+                if hasattr(source.spritesheet, "show_tile"):
+                    self.top_anim_pages = source.spritesheet
+                self.top_anim_bitmap = bitmap
+                self.top_anim_tiles = FlipDigitConfig._frame_table(source.frame_map, frame_total)
+                self.top_anim_source = None
+                adopted = True
+        source = self.bottom_anim_source
+        if hasattr(source, "loaded"):
+            source.load()
+            bitmap = FlipDigitConfig._anim_bitmap(source.spritesheet)
+            if bitmap is not None:
+                if hasattr(source.spritesheet, "show_tile"):
+                    self.bottom_anim_pages = source.spritesheet
+                self.bottom_anim_bitmap = bitmap
+                self.bottom_anim_tiles = FlipDigitConfig._frame_table(source.frame_map, frame_total)
+                self.bottom_anim_source = None
+                adopted = True
+        return adopted
+
+    @staticmethod
+    def _anim_bitmap(spritesheet) -> Optional[Bitmap]:
+        """
+        Find the bitmap animation tilegrids should show, `SpritePages` start on their
+        first page. None for frame sources, whose frames are drawn into a tile sized
+        bitmap of each digit.
+
+        :param spritesheet: The animation spritesheet Bitmap or frame source
+        """
+        if hasattr(spritesheet, "draw_frame"):
+            return None
+        if hasattr(spritesheet, "show_tile"):
+            return spritesheet.pages[0]
+        return spritesheet
+
+    @staticmethod
+    def _frame_table(frame_map: Optional[Sequence[int]], frame_total: int) -> array:
+        """
+        The tile index of every animation frame as an array. Frame maps that already
+        are arrays, such as those of a `SpriteManifest`, are used as they are.
+
+        :param frame_map: The animation frame map, or None if frames are tiles
+        :param int frame_total: The number of animation frames in the spritesheet
+        """
+        if frame_map is None:
+            return array("H", range(frame_total))
+        if isinstance(frame_map, array):
+            return frame_map
+        return array("H", frame_map)
@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.flip_stats`
+================================================================================
+
+Optional counters and timing histograms for flip animations. Digits only measure
+anything while a `FlipStats` object is attached to them.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Callable, Optional, Sequence
+except ImportError:
+    pass
+
+from array import array
+
+# upper bounds in milliseconds of the flip duration histogram buckets
+FLIP_DURATION_BOUNDS_MS = (100, 200, 300, 500, 1000, 2000)
+
+# upper bounds in milliseconds of the frame overrun histogram buckets
+FRAME_OVERRUN_BOUNDS_MS = (1, 2, 5, 10, 20, 50)
+
+
+class Histogram:
+    """
+    Counts of values falling into a few fixed buckets. The last bucket counts every
+    value above the highest bound.
+
+    :param bounds: Increasing upper bounds of the buckets, in milliseconds.
+    """
+
+    def __init__(self, bounds: Sequence[int]) -> None:
+        self.bounds = tuple(bounds)
+        self._bounds_ns = tuple(bound * 1000000 for bound in bounds)
+        self.counts = array("L", [0] * (len(bounds) + 1))
+
+    def add(self, value_ns: int) -> None:
+        """
+        Count a value.
+
+        :param int value_ns: The value in nanoseconds
+        """
+        bucket = 0
+        for bound in self._bounds_ns:
+            if value_ns <= bound:
+                break
+            bucket += 1
+        self.counts[bucket] += 1
+
+    def reset(self) -> None:
+        """
+        Set every count back to zero.
+        """
+        for bucket in range(len(self.counts)):
+            self.counts[bucket] = 0
+
+
+class FlipStats:
+    """
+    Counters and histograms filled in by the digits it is attached to, with the
+    ``stats`` attribute of `FlipDigit` or `FlipClock`. One object can be shared by many
+    digits. Digits without one skip all measuring.
+
+    A frame's overrun is how much longer than anim_delay it took to draw and wait out.
+    Frames that overrun by a whole anim_delay or more count as dropped, since the next
+    frame arrives in the slot after the one it was meant for.
+
+    :param frame_callback: Optional function called after every animation frame with the
+      digit, "top" or "bottom", the frame number and the overrun in nanoseconds.
+    """
+
+    def __init__(self, frame_callback: Optional[Callable] = None) -> None:
+        self.frame_callback = frame_callback
+        self.flips_started = 0
+        self.flips_completed = 0
+        self.frames_drawn = 0
+        self.frames_dropped = 0
+        self.flip_durations = Histogram(FLIP_DURATION_BOUNDS_MS)
+        self.frame_overruns = Histogram(FRAME_OVERRUN_BOUNDS_MS)
+
+    def reset(self) -> None:
+        """
+        Set every counter and histogram back to zero.
+        """
+        self.flips_started = 0
+        self.flips_completed = 0
+        self.frames_drawn = 0
+        self.frames_dropped = 0
+        self.flip_durations.reset()
+        self.frame_overruns.reset()
+
+    def as_dict(self) -> dict:
+        """
+        The counters and histogram counts, for logging or printing.
+        """
+        return {
+            "flips_started": self.flips_started,
+            "flips_completed": self.flips_completed,
+            "frames_drawn": self.frames_drawn,
+            "frames_dropped": self.frames_dropped,
+            "flip_durations_ms": dict(
+                zip(self.flip_durations.bounds + ("more",), self.flip_durations.counts)
+            ),
+            "frame_overruns_ms": dict(
+                zip(self.frame_overruns.bounds + ("more",), self.frame_overruns.counts)
+            ),
+        }
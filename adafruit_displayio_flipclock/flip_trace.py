@@ -0,0 +1,206 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.flip_trace`
+================================================================================
+
+Timeline tracing of flip animations. Digits with a `FlipTrace` attached record a
+timestamped event for every tile write, visibility change and palette swap into a
+fixed size ring buffer, which can be exported as Chrome trace JSON and opened in
+Perfetto or chrome://tracing.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Iterator, Tuple
+except ImportError:
+    pass
+
+import time
+from array import array
+
+# event kinds
+FLIP_BEGIN = 0
+FLIP_END = 1
+TILE = 2
+VISIBILITY = 3
+PALETTE = 4
+REFRESH_BEGIN = 5
+REFRESH_END = 6
+
+# layers of a digit that events happen to
+TOP_STATIC = 0
+BOTTOM_STATIC = 1
+TOP_ANIM = 2
+BOTTOM_ANIM = 3
+LAYER_NAMES = ("top_static", "bottom_static", "top_anim", "bottom_anim")
+
+# palette swap arguments
+MEDIUM_PALETTE = 0
+DARKER_PALETTE = 1
+
+
+class FlipTrace:
+    """
+    Ring buffer of flip animation events. Attach it to the ``trace`` attribute of
+    `FlipDigit` or `FlipClock`, and call `refresh` instead of ``display.refresh()`` to
+    include refreshes. Once full, the oldest events are overwritten. The buffer is
+    allocated up front, so recording doesn't allocate memory.
+
+    :param int capacity: The number of events to keep. Default 512.
+    """
+
+    def __init__(self, capacity: int = 512) -> None:
+        self.capacity = capacity
+        self.overwritten = 0
+        self._times = array("q", [0] * capacity)
+        self._kinds = array("B", [0] * capacity)
+        self._digits = array("H", [0] * capacity)
+        self._layers = array("B", [0] * capacity)
+        self._args = array("l", [0] * capacity)
+        self._next = 0
+        self._count = 0
+        self._registered = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    def register(self, digit) -> int:
+        """
+        The number identifying a digit in the trace, starting from 1. Called when the
+        trace is attached to a digit.
+
+        :param digit: The `FlipDigit` to identify
+        """
+        for number, registered in enumerate(self._registered):
+            if registered is digit:
+                return number + 1
+        self._registered.append(digit)
+        return len(self._registered)
+
+    def record(self, kind: int, digit: int, layer: int, arg: int) -> None:
+        """
+        Add an event at the current time.
+
+        :param int kind: The kind of event, such as `TILE`
+        :param int digit: The number of the digit, 0 for the display
+        :param int layer: The layer of the digit, such as `TOP_ANIM`
+        :param int arg: The tile index, 1 for shown or 0 for hidden, the palette or the
+          glyph index of a flip
+        """
+        position = self._next
+        self._times[position] = time.monotonic_ns()
+        self._kinds[position] = kind
+        self._digits[position] = digit
+        self._layers[position] = layer
+        self._args[position] = arg
+        self._next = (position + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            self.overwritten += 1
+
+    def refresh(self, display, **kwargs) -> bool:
+        """
+        Refresh a display, recording when the refresh started and finished.
+
+        :param display: The display to refresh
+        :param kwargs: Arguments for ``display.refresh()``
+        """
+        self.record(REFRESH_BEGIN, 0, 0, 0)
+        result = display.refresh(**kwargs)
+        self.record(REFRESH_END, 0, 0, 0)
+        return result
+
+    def clear(self) -> None:
+        """
+        Remove every event.
+        """
+        self._next = 0
+        self._count = 0
+        self.overwritten = 0
+
+    def events(self) -> Iterator[Tuple[int, int, int, int, int]]:
+        """
+        The recorded events oldest first, as tuples of time in nanoseconds, kind, digit
+        number, layer and argument.
+        """
+        start = (self._next - self._count) % self.capacity
+        for offset in range(self._count):
+            position = (start + offset) % self.capacity
+            yield (
+                self._times[position],
+                self._kinds[position],
+                self._digits[position],
+                self._layers[position],
+                self._args[position],
+            )
+
+    def chrome_trace(self) -> dict:
+        """
+        The recorded events in the Chrome trace event format, with one thread per digit
+        and one for the display. Times are in microseconds from the first event.
+        """
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": "display"}}
+        ]
+        for number in range(1, len(self._registered) + 1):
+            trace_events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": number,
+                    "args": {"name": f"digit {number}"},
+                }
+            )
+
+        first = None
+        for timestamp, kind, digit, layer, arg in self.events():
+            if first is None:
+                first = timestamp
+            event = {"pid": 1, "tid": digit, "ts": (timestamp - first) / 1000}
+            if kind in {FLIP_BEGIN, FLIP_END}:
+                event.update(name="flip", ph="B" if kind == FLIP_BEGIN else "E")
+                if kind == FLIP_BEGIN:
+                    event["args"] = {"glyph": arg}
+            elif kind in {REFRESH_BEGIN, REFRESH_END}:
+                event.update(name="refresh", ph="B" if kind == REFRESH_BEGIN else "E")
+            else:
+                event.update(ph="i", s="t")
+                if kind == TILE:
+                    event.update(name=f"tile {LAYER_NAMES[layer]}", args={"index": arg})
+                elif kind == VISIBILITY:
+                    action = "show" if arg else "hide"
+                    event["name"] = f"{action} {LAYER_NAMES[layer]}"
+                else:
+                    level = "darker" if arg == DARKER_PALETTE else "medium"
+                    event.update(name=f"palette {LAYER_NAMES[layer]}", args={"level": level})
+            trace_events.append(event)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, filename: str) -> None:
+        """
+        Write the recorded events to a Chrome trace JSON file.
+
+        :param str filename: The file to write
+        """
+        import json
+
+        with open(filename, "w") as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
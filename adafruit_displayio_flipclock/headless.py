@@ -0,0 +1,309 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.headless`
+================================================================================
+
+Headless rendering of flip clock widgets into a NumPy framebuffer, for running them
+on CPython without a display. Useful for comparing animation frames against golden
+images and for measuring rendering cost. Requires NumPy and Blinka displayio, this
+module is not for use on CircuitPython devices.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* None, renders on CPython.
+
+**Software and Dependencies:**
+
+* NumPy: https://numpy.org/
+* Adafruit Blinka displayio:
+  https://github.com/adafruit/Adafruit_Blinka_Displayio
+"""
+
+try:
+    from typing import Optional, Tuple
+
+    from displayio import Bitmap
+except ImportError:
+    pass
+
+import numpy
+from displayio import Group, Palette, TileGrid
+
+# framebuffer formats HeadlessDisplay can produce
+COLOR_MODES = ("rgb565", "rgb888")
+
+
+def bitmap_array(bitmap: Bitmap) -> numpy.ndarray:
+    """
+    The values of every pixel of a Bitmap as a 2D array of shape (height, width), read
+    through ``bitmap[x, y]``. The pixel data of Blinka displayio Bitmaps is unpacked in
+    one go instead, as long as it holds the same values as a sample of pixels read the
+    public way.
+
+    :param Bitmap bitmap: The Bitmap to read.
+    """
+    width = bitmap.width
+    height = bitmap.height
+    values = _unpack_blinka_bitmap(bitmap)
+    if values is not None:
+        samples = ((0, 0), (width - 1, height - 1), (width // 2, height // 2), (width - 1, 0))
+        if all(values[y, x] == bitmap[x, y] for x, y in samples):
+            return values
+
+    values = numpy.fromiter(
+        (bitmap[x, y] for y in range(height) for x in range(width)),
+        dtype=numpy.uint32,
+        count=width * height,
+    )
+    return values.reshape(height, width)
+
+
+def _unpack_blinka_bitmap(bitmap: Bitmap) -> Optional[numpy.ndarray]:
+    """
+    Unpack the pixel data of a Blinka displayio Bitmap, which is private to it. None
+    if the Bitmap doesn't hold its pixels the way Blinka 2.x does.
+
+    :param Bitmap bitmap: The Bitmap to read.
+    """
+    width = bitmap.width
+    height = bitmap.height
+    data = getattr(bitmap, "_data", None)
+    bits = getattr(bitmap, "_bits_per_value", None)
+    if data is None or bits not in {1, 2, 4, 8, 16, 32}:
+        return None
+    try:
+        return _unpack_rows(data, bits, width, height)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _unpack_rows(data, bits: int, width: int, height: int) -> numpy.ndarray:
+    """
+    Unpack rows of pixels packed the way Blinka displayio Bitmaps store them.
+
+    :param data: The packed pixel data, a buffer of 32 bit words below 8 bits per
+      pixel, otherwise of bytes
+    :param int bits: The number of bits per pixel
+    :param int width: The width of the Bitmap in pixels
+    :param int height: The height of the Bitmap in pixels
+    """
+    if bits < 8:
+        # each element holds a 32 bit word, first pixel in the highest bits
+        words = numpy.frombuffer(data, dtype=f"<u{data.itemsize}").reshape(height, -1)
+        per_word = 32 // bits
+        shifts = 32 - (numpy.arange(per_word, dtype=numpy.uint64) + 1) * bits
+        pixels = (words[:, :, None].astype(numpy.uint64) >> shifts) & ((1 << bits) - 1)
+        return pixels.reshape(height, -1)[:, :width].astype(numpy.uint32)
+
+    # whole bytes per pixel, stored in order along each row
+    rows = numpy.frombuffer(data, dtype=numpy.uint8).reshape(height, -1)
+    values = rows[:, : width * (bits // 8)].copy().view(f"<u{bits // 8}")
+    return values.astype(numpy.uint32)
+
+
+def palette_arrays(palette: Palette) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    The colors of a Palette as RGB888 integers and which of its indexes are opaque.
+
+    :param Palette palette: The Palette to read.
+    """
+    count = len(palette)
+    colors = numpy.fromiter((palette[i] or 0 for i in range(count)), numpy.uint32, count)
+    opaque = numpy.fromiter((not palette.is_transparent(i) for i in range(count)), bool, count)
+    return colors, opaque
+
+
+class HeadlessDisplay:
+    """
+    Stand in for a display that composites its root group into a NumPy framebuffer each
+    time `refresh` is called. Draws Groups, including their position, scale and hidden
+    state, single Palette TileGrids, such as those of `FlipDigit` and `FlipClock`, and
+    vectorio Circles. Compositing works on whole tiles at a time.
+
+    :param int width: Width of the framebuffer in pixels.
+    :param int height: Height of the framebuffer in pixels.
+    :param str color_mode: "rgb565" for a (height, width) array of 16 bit colors, or
+      "rgb888" for a (height, width, 3) array of 8 bit red, green and blue values.
+    :param int background_color: RGB888 color the framebuffer is cleared to.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        color_mode: str = "rgb565",
+        background_color: int = 0x000000,
+    ) -> None:
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"color_mode must be one of {COLOR_MODES}")
+        self.width = width
+        self.height = height
+        self.color_mode = color_mode
+        self.background_color = background_color
+        self.root_group = None
+        self.framebuffer = None
+        self.refresh_count = 0
+
+        # RGB888 colors composited before converting to the color mode
+        self._pixels = numpy.zeros((height, width), dtype=numpy.uint32)
+
+    def refresh(self) -> numpy.ndarray:
+        """
+        Composite the current state of the root group and return the framebuffer.
+        """
+        self._pixels.fill(self.background_color)
+        if self.root_group is not None and not self.root_group.hidden:
+            self._draw_group(self.root_group, 0, 0, 1)
+        self.framebuffer = self._convert(self._pixels)
+        self.refresh_count += 1
+        return self.framebuffer
+
+    def rgb888(self) -> Optional[numpy.ndarray]:
+        """
+        The last refreshed frame as a (height, width, 3) array of 8 bit red, green and
+        blue values, whatever the color mode. None before the first refresh.
+        """
+        if self.framebuffer is None:
+            return None
+        if self.color_mode == "rgb888":
+            return self.framebuffer
+        pixels = self.framebuffer.astype(numpy.uint32)
+        red = (pixels >> 11) & 0x1F
+        green = (pixels >> 5) & 0x3F
+        blue = pixels & 0x1F
+        return numpy.stack(
+            ((red << 3) | (red >> 2), (green << 2) | (green >> 4), (blue << 3) | (blue >> 2)),
+            axis=-1,
+        ).astype(numpy.uint8)
+
+    def _convert(self, pixels: numpy.ndarray) -> numpy.ndarray:
+        """
+        Convert RGB888 integer colors to the framebuffer color mode.
+
+        :param pixels: Array of RGB888 integer colors
+        """
+        red = (pixels >> 16) & 0xFF
+        green = (pixels >> 8) & 0xFF
+        blue = pixels & 0xFF
+        if self.color_mode == "rgb888":
+            return numpy.stack((red, green, blue), axis=-1).astype(numpy.uint8)
+        return ((red >> 3) << 11 | (green >> 2) << 5 | blue >> 3).astype(numpy.uint16)
+
+    def _draw_group(self, group: Group, origin_x: int, origin_y: int, scale: int) -> None:
+        """
+        Draw the visible layers of a group, first to last.
+
+        :param Group group: The group to draw
+        :param int origin_x: Screen x of the group's parent origin
+        :param int origin_y: Screen y of the group's parent origin
+        :param int scale: Combined scale of the group's parents
+        """
+        origin_x += group.x * scale
+        origin_y += group.y * scale
+        scale *= group.scale
+        for layer in group:
+            if layer.hidden:
+                continue
+            if isinstance(layer, Group):
+                self._draw_group(layer, origin_x, origin_y, scale)
+            elif isinstance(layer, TileGrid):
+                self._draw_tilegrid(layer, origin_x, origin_y, scale)
+            elif hasattr(layer, "radius"):
+                self._draw_circle(layer, origin_x, origin_y, scale)
+            else:
+                raise TypeError(f"Can't draw {type(layer).__name__} layers headless")
+
+    def _blend(
+        self,
+        colors: numpy.ndarray,
+        opaque: numpy.ndarray,
+        left: int,
+        top: int,
+    ) -> None:
+        """
+        Copy the opaque pixels of a block of colors into the framebuffer, clipping it
+        to the edges.
+
+        :param colors: Array of RGB888 integer colors
+        :param opaque: Array of the same shape, True where the color is drawn
+        :param int left: Screen x of the block's left edge
+        :param int top: Screen y of the block's top edge
+        """
+        height, width = colors.shape
+        x1, y1 = max(left, 0), max(top, 0)
+        x2, y2 = min(left + width, self.width), min(top + height, self.height)
+        if x1 >= x2 or y1 >= y2:
+            return
+        block = (slice(y1 - top, y2 - top), slice(x1 - left, x2 - left))
+        target = self._pixels[y1:y2, x1:x2]
+        numpy.copyto(target, colors[block], where=opaque[block])
+
+    def _draw_tilegrid(self, tilegrid: TileGrid, origin_x: int, origin_y: int, scale: int):
+        """
+        Draw every tile of a TileGrid through its palette.
+
+        :param TileGrid tilegrid: The TileGrid to draw
+        :param int origin_x: Screen x of the parent group origin
+        :param int origin_y: Screen y of the parent group origin
+        :param int scale: Combined scale of the parent groups
+        """
+        if not isinstance(tilegrid.pixel_shader, Palette):
+            raise TypeError("Only TileGrids with a Palette can be drawn headless")
+        colors, opaque = palette_arrays(tilegrid.pixel_shader)
+        values = bitmap_array(tilegrid.bitmap)
+        tile_width = tilegrid.tile_width
+        tile_height = tilegrid.tile_height
+        columns = tilegrid.bitmap.width // tile_width
+        left = origin_x + tilegrid.x * scale
+        top = origin_y + tilegrid.y * scale
+
+        for tile_y in range(tilegrid.height):
+            for tile_x in range(tilegrid.width):
+                index = tilegrid[tile_x, tile_y]
+                source_x = (index % columns) * tile_width
+                source_y = (index // columns) * tile_height
+                tile = values[source_y : source_y + tile_height, source_x : source_x + tile_width]
+                if tilegrid.flip_x:
+                    tile = tile[:, ::-1]
+                if tilegrid.flip_y:
+                    tile = tile[::-1, :]
+                if scale > 1:
+                    tile = tile.repeat(scale, axis=0).repeat(scale, axis=1)
+                self._blend(
+                    colors[tile],
+                    opaque[tile],
+                    left + tile_x * tile_width * scale,
+                    top + tile_y * tile_height * scale,
+                )
+
+    def _draw_circle(self, circle, origin_x: int, origin_y: int, scale: int) -> None:
+        """
+        Draw a vectorio Circle in its palette color.
+
+        :param Circle circle: The circle to draw
+        :param int origin_x: Screen x of the parent group origin
+        :param int origin_y: Screen y of the parent group origin
+        :param int scale: Combined scale of the parent groups
+        """
+        radius = circle.radius
+        colors, opaque = palette_arrays(circle.pixel_shader)
+        # shape coordinates of the circle's bounding box, scaled to screen pixels
+        offsets = numpy.arange(-radius, radius + 1).repeat(scale)
+        inside = offsets[:, None] ** 2 + offsets[None, :] ** 2 <= radius * radius
+        if not opaque[circle.color_index]:
+            return
+        block = numpy.full(inside.shape, colors[circle.color_index], dtype=numpy.uint32)
+        self._blend(
+            block,
+            inside,
+            origin_x + (circle.x - radius) * scale,
+            origin_y + (circle.y - radius) * scale,
+        )
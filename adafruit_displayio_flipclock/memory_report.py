@@ -0,0 +1,312 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.memory_report`
+================================================================================
+
+Estimates of the RAM used by flip clock widgets, for checking whether a layout will fit
+a board before building it. Sizes are worked out from the dimensions of the bitmaps,
+palettes and tables the widgets hold, using the object sizes of CircuitPython on 32 bit
+microcontrollers, so the same report comes out on the device and on CPython.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Optional
+
+    from displayio import Bitmap, Palette, TileGrid
+except ImportError:
+    pass
+
+# approximate sizes in bytes of CircuitPython objects, not counting the data they hold
+OBJECT_BYTES = 16
+ATTRIBUTE_BYTES = 8
+BITMAP_BYTES = 48
+PALETTE_BYTES = 32
+PALETTE_COLOR_BYTES = 12
+TILEGRID_BYTES = 128
+GROUP_BYTES = 48
+CIRCLE_BYTES = 64
+
+# TileGrids hold up to this many tile indexes without allocating separate memory
+INLINE_TILES = 4
+
+# categories of the report, and which of them shared and owned memory is split into
+SHARED_CATEGORIES = ("bitmaps", "palettes", "faders", "tables", "python_objects")
+OWNED_CATEGORIES = ("bitmaps", "palettes", "tilegrids", "python_objects")
+
+
+def bits_per_value(value_count: int) -> int:
+    """
+    The bits a Bitmap stores each pixel in for a number of values: the smallest of 1,
+    2, 4, 8, 16 or 32 that fits them.
+
+    :param int value_count: The number of different values the Bitmap holds
+    """
+    bits = 1
+    while (1 << bits) < value_count:
+        bits *= 2
+    return bits
+
+
+def pixel_bytes(width: int, height: int, bits: int) -> int:
+    """
+    Estimated bytes used by a Bitmap of a size, its pixel data stored in rows of 32 bit
+    words.
+
+    :param int width: Width of the Bitmap in pixels
+    :param int height: Height of the Bitmap in pixels
+    :param int bits: Bits per pixel
+    """
+    return BITMAP_BYTES + (width * bits + 31) // 32 * 4 * height
+
+
+def bitmap_bytes(bitmap: Bitmap) -> int:
+    """
+    Estimated bytes used by a Bitmap and its pixel data. Bitmaps that don't report
+    their bits per value are taken to use 8.
+
+    :param Bitmap bitmap: The Bitmap to size
+    """
+    bits = getattr(bitmap, "bits_per_value", None) or getattr(bitmap, "_bits_per_value", 8)
+    return pixel_bytes(bitmap.width, bitmap.height, bits)
+
+
+def palette_bytes(palette: Palette) -> int:
+    """
+    Estimated bytes used by a Palette and its colors.
+
+    :param Palette palette: The Palette to size
+    """
+    return PALETTE_BYTES + len(palette) * PALETTE_COLOR_BYTES
+
+
+def fader_bytes(fader) -> int:
+    """
+    Estimated bytes used by a PaletteFader: its faded copy of the palette and the list
+    of reference colors it fades from.
+
+    :param fader: The PaletteFader to size
+    """
+    colors = len(fader.palette)
+    return OBJECT_BYTES + ATTRIBUTE_BYTES * 6 + palette_bytes(fader.palette) + colors * 4
+
+
+def tilegrid_bytes(tilegrid: TileGrid) -> int:
+    """
+    Estimated bytes used by a TileGrid and its tile indexes, not counting its Bitmap.
+
+    :param TileGrid tilegrid: The TileGrid to size
+    """
+    tiles = tilegrid.width * tilegrid.height
+    return TILEGRID_BYTES + (tiles * 2 if tiles > INLINE_TILES else 0)
+
+
+def table_bytes(table) -> int:
+    """
+    Estimated bytes used by an array, bytes, bytearray or tuple of ints. Arrays that
+    don't report their item size are taken to hold 16 bit values, as the index tables do.
+
+    :param table: The table to size
+    """
+    if isinstance(table, tuple):
+        return OBJECT_BYTES + len(table) * 4
+    if isinstance(table, (bytes, bytearray)):
+        return OBJECT_BYTES + len(table)
+    return OBJECT_BYTES + len(table) * getattr(table, "itemsize", 2)
+
+
+def object_bytes(obj) -> int:
+    """
+    Estimated bytes used by a Python object for its attributes, not counting what
+    they refer to. Attributes in ``__slots__`` are counted as well, CircuitPython
+    keeps them in the instance dict like any other.
+
+    :param obj: The object to size
+    """
+    attributes = len(getattr(obj, "__dict__", None) or ())
+    for cls in getattr(type(obj), "__mro__", ()):
+        attributes += len(getattr(cls, "__slots__", ()))
+    return OBJECT_BYTES + ATTRIBUTE_BYTES * (attributes or 8)
+
+
+def spritesheet_bytes(spritesheet) -> int:
+    """
+    Estimated bytes used by a spritesheet. Frame sources and `SpritePages` size
+    themselves with their ``memory_bytes`` method, OnDiskBitmaps only hold their header
+    in RAM.
+
+    :param spritesheet: The Bitmap, OnDiskBitmap, `SpritePages` or frame source to size
+    """
+    if hasattr(spritesheet, "memory_bytes"):
+        return spritesheet.memory_bytes()
+    if type(spritesheet).__name__ == "OnDiskBitmap":
+        return BITMAP_BYTES
+    return bitmap_bytes(spritesheet)
+
+
+class _Tally:
+    """
+    Running totals of a report by category, counting each object only once.
+    """
+
+    def __init__(self, categories) -> None:
+        self.totals = dict.fromkeys(categories, 0)
+        self._seen = set()
+
+    def add(self, category: str, obj, size_function) -> None:
+        """
+        Add the size of an object to a category, unless it was already counted.
+
+        :param str category: The category to add to
+        :param obj: The object to size, None is skipped
+        :param size_function: The function returning the object's size
+        """
+        if obj is None or id(obj) in self._seen:
+            return
+        self._seen.add(id(obj))
+        self.totals[category] += size_function(obj)
+
+
+def _add_config(shared: _Tally, config) -> None:
+    """
+    Add everything a `FlipDigitConfig` holds to the shared totals.
+
+    :param _Tally shared: The shared totals
+    :param FlipDigitConfig config: The digit config to size
+    """
+    shared.add("python_objects", config, object_bytes)
+    for spritesheet in (
+        config.static_pages if config.static_pages is not None else config.static_bitmap,
+        config.top_anim_source or config.top_anim_pages or config.top_anim_bitmap,
+        config.bottom_anim_source or config.bottom_anim_pages or config.bottom_anim_bitmap,
+    ):
+        shared.add("bitmaps", spritesheet, spritesheet_bytes)
+    for palette in (
+        config.static_spritesheet_palette,
+        config.top_anim_palette,
+        config.bottom_anim_palette,
+    ):
+        shared.add("palettes", palette, palette_bytes)
+    # palettes worked out for other brightness levels
+    for palette_set in config.palette_sets[1:]:
+        for palette in palette_set.palettes:
+            shared.add("palettes", palette, palette_bytes)
+    for fader in (
+        config.static_fader,
+        config.darker_static_fader,
+        config.top_anim_fader,
+        config.bottom_anim_fader,
+    ):
+        shared.add("faders", fader, fader_bytes)
+    for table in (
+        config.top_anim_tiles,
+        config.bottom_anim_tiles,
+        config.top_static_indexes,
+        config.bottom_static_indexes,
+        config.glyph_table,
+    ):
+        shared.add("tables", table, table_bytes)
+
+
+def _add_digit(owned: _Tally, digit) -> None:
+    """
+    Add the TileGrids, frame bitmaps and Python objects of a single digit to the owned
+    totals.
+
+    :param _Tally owned: The owned totals
+    :param FlipDigit digit: The digit to size
+    """
+    owned.add("python_objects", digit, lambda group: object_bytes(group) + GROUP_BYTES)
+    for tilegrid in (
+        digit.top_static_tilegrid,
+        digit.bottom_static_tilegrid,
+        digit.top_anim_tilegrid,
+        digit.bottom_anim_tilegrid,
+    ):
+        owned.add("tilegrids", tilegrid, tilegrid_bytes)
+    # frame sources draw into a bitmap belonging to each digit
+    if digit.config.top_anim_source is not None:
+        owned.add("bitmaps", digit.top_anim_tilegrid.bitmap, bitmap_bytes)
+    if digit.config.bottom_anim_source is not None:
+        owned.add("bitmaps", digit.bottom_anim_tilegrid.bitmap, bitmap_bytes)
+
+
+def _report(shared: _Tally, owned: _Tally, digits: int, digit_count: Optional[int]) -> dict:
+    """
+    Put the totals together into a report.
+
+    :param _Tally shared: The shared totals
+    :param _Tally owned: The owned totals
+    :param int digits: The number of digits the owned totals are for
+    :param digit_count: Number of digits to estimate the total for, or None
+    """
+    shared_total = sum(shared.totals.values())
+    owned_total = sum(owned.totals.values())
+    report = {
+        "shared": shared.totals,
+        "owned": owned.totals,
+        "shared_total": shared_total,
+        "owned_total": owned_total,
+        "total": shared_total + owned_total,
+        "digits": digits,
+    }
+    if digit_count is not None:
+        report["estimated_total"] = shared_total + owned_total * digit_count // digits
+    return report
+
+
+def digit_report(digit, digit_count: Optional[int] = None) -> dict:
+    """
+    Estimate the memory used by a `FlipDigit`, see `FlipDigit.memory_report`.
+
+    :param FlipDigit digit: The digit to size
+    :param digit_count: Number of digits to estimate the total for, or None
+    """
+    shared = _Tally(SHARED_CATEGORIES)
+    owned = _Tally(OWNED_CATEGORIES)
+    _add_config(shared, digit.config)
+    _add_digit(owned, digit)
+    return _report(shared, owned, 1, digit_count)
+
+
+def clock_report(clock, digit_count: Optional[int] = None) -> dict:
+    """
+    Estimate the memory used by a `FlipClock`, see `FlipClock.memory_report`.
+
+    :param FlipClock clock: The clock to size
+    :param digit_count: Number of digits to estimate the total for, or None
+    """
+    shared = _Tally(SHARED_CATEGORIES)
+    owned = _Tally(OWNED_CATEGORIES)
+    owned.add("python_objects", clock, lambda group: object_bytes(group) + GROUP_BYTES)
+    # the colon sprite, or the colon dots and their palette
+    if clock.colon is not None:
+        owned.add("python_objects", clock.colon, object_bytes)
+        shared.add("bitmaps", clock.colon.top_tilegrid.bitmap, bitmap_bytes)
+        for tilegrid in clock.colon.tilegrids:
+            owned.add("tilegrids", tilegrid, tilegrid_bytes)
+    for layer in clock:
+        if hasattr(layer, "radius"):
+            owned.add("python_objects", layer, lambda circle: CIRCLE_BYTES)
+            owned.add("palettes", layer.pixel_shader, palette_bytes)
+    digits = (clock.digit_0, clock.digit_1, clock.digit_2, clock.digit_3)
+    for digit in digits:
+        _add_config(shared, digit.config)
+        _add_digit(owned, digit)
+    return _report(shared, owned, len(digits), digit_count)
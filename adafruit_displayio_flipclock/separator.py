@@ -0,0 +1,155 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.separator`
+================================================================================
+
+Separators such as the colon of a clock, shown as narrow sprites that fit the gap
+between digits. Blinking only switches the tile indexes of two TileGrids, so displayio
+redraws just the gap and has no shapes to rasterize.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Dict, Optional, Sequence
+
+    from displayio import Bitmap, Palette
+except ImportError:
+    pass
+
+from displayio import TileGrid
+
+
+class Separator:
+    """
+    A separator sprite made of a top and a bottom half TileGrid, like a `FlipDigit`
+    without the animations. Add both of `tilegrids` to a Group to show it. The
+    spritesheet generator makes a sheet of separator sprites and lists their indexes in
+    the manifest when run with the separators option.
+
+    :param Bitmap spritesheet: The separator spritesheet Bitmap
+    :param Palette palette: Palette to show the separator with
+    :param int tile_width: The width of the separator sprites in pixels
+    :param int tile_height: The height of a half sprite tile in pixels
+    :param dict separator_indexes: The top and bottom spritesheet tile indexes of each
+      separator, keyed by character
+    :param blank_indexes: Optional top and bottom tile indexes of a blank sprite to switch
+      to while the separator is not visible. Without them the TileGrids are hidden instead.
+    :param str character: The separator to show first. Default ":".
+    :param int x: The x position of the separator
+    :param int y: The y position of the separator
+    """
+
+    def __init__(
+        self,
+        spritesheet: Bitmap,
+        palette: Palette,
+        tile_width: int,
+        tile_height: int,
+        separator_indexes: Dict[str, Sequence[int]],
+        blank_indexes: Optional[Sequence[int]] = None,
+        character: str = ":",
+        x: int = 0,
+        y: int = 0,
+    ) -> None:
+        self.separator_indexes = separator_indexes
+        self.blank_indexes = blank_indexes
+
+        self.top_tilegrid = TileGrid(
+            spritesheet,
+            pixel_shader=palette,
+            width=1,
+            height=1,
+            tile_width=tile_width,
+            tile_height=tile_height,
+            x=x,
+            y=y,
+        )
+        self.bottom_tilegrid = TileGrid(
+            spritesheet,
+            pixel_shader=palette,
+            width=1,
+            height=1,
+            tile_width=tile_width,
+            tile_height=tile_height,
+            x=x,
+            y=y + tile_height,
+        )
+        self.tilegrids = (self.top_tilegrid, self.bottom_tilegrid)
+
+        self._visible = True
+        self._character = None
+        self.character = character
+
+    @property
+    def character(self) -> str:
+        """
+        The separator shown, one of the characters of separator_indexes.
+        """
+        return self._character
+
+    @character.setter
+    def character(self, character: str) -> None:
+        if character not in self.separator_indexes:
+            raise ValueError(f"No sprite for separator {character!r}")
+        self._character = character
+        if self._visible:
+            self._show(self.separator_indexes[character])
+
+    @property
+    def visible(self) -> bool:
+        """
+        Whether the separator is showing. Switching it off shows the blank sprite, or
+        hides the TileGrids if there is none.
+        """
+        return self._visible
+
+    @visible.setter
+    def visible(self, visible: bool) -> None:
+        if visible == self._visible:
+            return
+        self._visible = visible
+        if self.blank_indexes is None:
+            self.top_tilegrid.hidden = not visible
+            self.bottom_tilegrid.hidden = not visible
+        elif visible:
+            self._show(self.separator_indexes[self._character])
+        else:
+            self._show(self.blank_indexes)
+
+    @property
+    def pixel_shader(self) -> Palette:
+        """
+        The Palette the separator is shown with.
+        """
+        return self.top_tilegrid.pixel_shader
+
+    @pixel_shader.setter
+    def pixel_shader(self, palette: Palette) -> None:
+        self.top_tilegrid.pixel_shader = palette
+        self.bottom_tilegrid.pixel_shader = palette
+
+    def _show(self, indexes: Sequence[int]) -> None:
+        """
+        Show a top and a bottom tile, only setting those that change.
+
+        :param indexes: The top and bottom spritesheet tile indexes
+        """
+        for tilegrid, index in zip(self.tilegrids, indexes):
+            if tilegrid[0] != index:
+                tilegrid[0] = index
@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.sprite_atlas`
+================================================================================
+
+Animation frames packed tightly into a single Bitmap with their transparent
+padding trimmed away. Frames are drawn into a tile sized Bitmap at the offset
+they were trimmed from.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Sequence
+
+    from displayio import Bitmap
+except ImportError:
+    pass
+
+from array import array
+
+import bitmaptools
+
+# number of values stored for each frame: x, y, width, height, x offset, y offset
+VALUES_PER_FRAME = 6
+
+
+class SpriteAtlas:
+    """
+    Animation frames packed into an atlas Bitmap by the spritesheet generator's
+    atlas mode. `SpriteManifest` creates these for manifests that list atlas frames.
+    Can be passed to `FlipDigit` and `FlipClock` in place of an animation spritesheet,
+    each digit then draws frames into a tile sized Bitmap of its own.
+
+    :param Bitmap bitmap: The atlas image containing the trimmed frames.
+    :param frames: Flat sequence with 6 values per animation frame: the x, y, width and
+      height of the frame within the atlas, followed by the x and y offset to draw it at
+      within the tile. Frames with a width of 0 are fully transparent.
+    :param int tile_width: Width in pixels of the untrimmed animation tiles.
+    :param int tile_height: Height in pixels of the untrimmed animation tiles.
+    :param int transparent_index: Palette index used for the trimmed padding.
+    """
+
+    def __init__(
+        self,
+        bitmap: Bitmap,
+        frames: Sequence[int],
+        tile_width: int,
+        tile_height: int,
+        transparent_index: int = 0,
+    ) -> None:
+        self.bitmap = bitmap
+        self.frames = array("H", frames)
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.transparent_index = transparent_index
+
+        # index of the frame last drawn into each target bitmap
+        self._drawn = {}
+
+    @property
+    def frame_count(self) -> int:
+        """
+        The total number of animation frames in the atlas.
+        """
+        return len(self.frames) // VALUES_PER_FRAME
+
+    def memory_bytes(self) -> int:
+        """
+        Estimated bytes of RAM used by the atlas Bitmap and frame table.
+        """
+        from adafruit_displayio_flipclock.memory_report import bitmap_bytes, table_bytes
+
+        return bitmap_bytes(self.bitmap) + table_bytes(self.frames)
+
+    def draw_frame(self, bitmap: Bitmap, index: int) -> None:
+        """
+        Draw an animation frame into a tile sized Bitmap. Only the area covered by the
+        previously drawn frame is cleared, which keeps the changed area small.
+
+        :param Bitmap bitmap: The tile sized Bitmap to draw into.
+        :param int index: The index of the animation frame to draw.
+        """
+        frames = self.frames
+        previous = self._drawn.get(id(bitmap))
+        if previous is None:
+            bitmap.fill(self.transparent_index)
+        else:
+            offset = previous * VALUES_PER_FRAME
+            if frames[offset + 2]:
+                x = frames[offset + 4]
+                y = frames[offset + 5]
+                bitmaptools.fill_region(
+                    bitmap,
+                    x,
+                    y,
+                    x + frames[offset + 2],
+                    y + frames[offset + 3],
+                    self.transparent_index,
+                )
+
+        offset = index * VALUES_PER_FRAME
+        if frames[offset + 2]:
+            x = frames[offset]
+            y = frames[offset + 1]
+            bitmaptools.blit(
+                bitmap,
+                self.bitmap,
+                frames[offset + 4],
+                frames[offset + 5],
+                x1=x,
+                y1=y,
+                x2=x + frames[offset + 2],
+                y2=y + frames[offset + 3],
+            )
+        self._drawn[id(bitmap)] = index
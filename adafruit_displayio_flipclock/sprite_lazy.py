@@ -0,0 +1,178 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.sprite_lazy`
+================================================================================
+
+Animation spritesheets that are loaded the first time they are needed instead of
+at startup, so the static clock face can be shown as soon as the static
+spritesheet is loaded.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Callable, Optional, Sequence
+except ImportError:
+    pass
+
+import time
+
+import bitmaptools
+from displayio import Bitmap
+
+
+class LazySpriteSheet:
+    """
+    Wraps a loader callback for an animation spritesheet. Can be passed to `FlipDigit` and
+    `FlipClock` in place of an animation spritesheet, together with its palette which must
+    be known up front. The loader is called on the first flip at the latest, call `load`
+    or `poll` from an idle moment to have the animations ready before then. Digits switch
+    to showing the tiles of a loaded spritesheet Bitmap directly, see
+    `FlipDigitConfig.adopt_loaded_spritesheets`. After `deinit` the loader is called
+    again when the spritesheet is next needed. A spritesheet Bitmap that digits have
+    switched to stays in memory until those digits are dropped, `deinit` only releases
+    this object's reference to it.
+
+    :param loader: Function taking no arguments that loads and returns the animation
+      spritesheet Bitmap, or a frame source.
+    :param int tile_width: Width in pixels of the animation tiles.
+    :param int tile_height: Height in pixels of the animation tiles.
+    :param frame_map: Optional map from animation frame to tile index for spritesheets
+      that had duplicate frames removed.
+    :param float prefetch_after: Optional number of seconds after which `poll` loads the
+      spritesheet. None to only load it when it is first needed or `load` is called.
+    """
+
+    def __init__(
+        self,
+        loader: Callable,
+        tile_width: int,
+        tile_height: int,
+        frame_map: Optional[Sequence[int]] = None,
+        prefetch_after: Optional[float] = None,
+    ) -> None:
+        self.loader = loader
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.frame_map = frame_map
+        self.spritesheet = None
+
+        self._prefetch_at = None
+        if prefetch_after is not None:
+            self._prefetch_at = time.monotonic() + prefetch_after
+        # first frame and count of a prefetch to pass on once loaded
+        self._prefetch_frames = None
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Whether the spritesheet has been loaded.
+        """
+        return self.spritesheet is not None
+
+    def load(self) -> None:
+        """
+        Load the spritesheet now if it isn't loaded yet.
+        """
+        if self.spritesheet is None:
+            self.spritesheet = self.loader()
+
+    def poll(self) -> bool:
+        """
+        Load the spritesheet if its prefetch time has passed, once it is loaded pass the
+        poll on to frame sources that read frames ahead. Cheap to call from the main
+        loop. Returns whether the spritesheet is loaded and done reading ahead.
+        """
+        if self.spritesheet is None:
+            if self._prefetch_at is None or time.monotonic() < self._prefetch_at:
+                return False
+            self.load()
+            if self._prefetch_frames is not None:
+                self.prefetch(*self._prefetch_frames)
+            return not hasattr(self.spritesheet, "poll")
+        if hasattr(self.spritesheet, "poll"):
+            return self.spritesheet.poll()
+        return True
+
+    def prefetch(self, first_index: int, count: int = 1) -> None:
+        """
+        Have `poll` load the spritesheet if it isn't loaded yet, without loading it now.
+        The prefetch is passed on to frame sources that read frames ahead once loaded.
+
+        :param int first_index: The index of the first animation frame to read.
+        :param int count: The number of consecutive frames to read.
+        """
+        if self.spritesheet is None:
+            self._prefetch_at = time.monotonic()
+            self._prefetch_frames = (first_index, count)
+            return
+        self._prefetch_frames = None
+        if hasattr(self.spritesheet, "prefetch"):
+            self.spritesheet.prefetch(first_index, count)
+
+    def memory_bytes(self) -> int:
+        """
+        Estimated bytes of RAM used by the spritesheet, 0 while it isn't loaded.
+        """
+        from adafruit_displayio_flipclock.memory_report import spritesheet_bytes
+
+        if self.spritesheet is None:
+            return 0
+        return spritesheet_bytes(self.spritesheet)
+
+    def draw_frame(self, bitmap: Bitmap, index: int) -> None:
+        """
+        Draw an animation frame into a tile sized Bitmap, loading the spritesheet first
+        if needed.
+
+        :param Bitmap bitmap: The tile sized Bitmap to draw into.
+        :param int index: The index of the animation frame to draw.
+        """
+        self.load()
+        spritesheet = self.spritesheet
+        if hasattr(spritesheet, "draw_frame"):
+            spritesheet.draw_frame(bitmap, index)
+            return
+
+        if self.frame_map is not None:
+            index = self.frame_map[index]
+        columns = spritesheet.width // self.tile_width
+        x = (index % columns) * self.tile_width
+        y = (index // columns) * self.tile_height
+        bitmaptools.blit(
+            bitmap,
+            spritesheet,
+            0,
+            0,
+            x1=x,
+            y1=y,
+            x2=x + self.tile_width,
+            y2=y + self.tile_height,
+        )
+
+    def deinit(self) -> None:
+        """
+        Release the loaded spritesheet, deinitializing it if it is a frame source that
+        needs it. It is loaded again if it is needed afterwards. Digits that switched
+        to showing a loaded Bitmap keep it until they are dropped.
+        """
+        if hasattr(self.spritesheet, "deinit"):
+            self.spritesheet.deinit()
+        self.spritesheet = None
+        self._prefetch_at = None
+        self._prefetch_frames = None
@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.sprite_loader`
+================================================================================
+
+Loader for the raw packed spritesheet format written by the spritesheet generator.
+Its rows are laid out like displayio Bitmap rows so the pixel data is read straight
+into a Bitmap with ``bitmaptools.readinto`` instead of being parsed pixel by pixel.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import BinaryIO, Optional, Tuple
+except ImportError:
+    pass
+
+import struct
+
+import bitmaptools
+from displayio import Bitmap, Palette
+
+# file name extension of raw packed spritesheets
+RAW_SHEET_EXTENSION = ".fcb"
+
+# magic bytes and format version at the start of each file
+RAW_SHEET_MAGIC = b"FCBM"
+RAW_SHEET_VERSION = 1
+
+# magic, version, bits per pixel, color count, width, height
+_HEADER_FORMAT = "<4sBBHHH"
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+
+
+def read_header(file: BinaryIO) -> Tuple[int, int, int, int]:
+    """
+    Read and validate the header of a raw packed spritesheet. The file is left
+    positioned at the start of the palette.
+
+    :param file: The spritesheet file opened in binary mode.
+
+    :returns: Tuple of the width, height, bits per pixel and number of palette colors.
+    """
+    magic, version, bits_per_pixel, colors, width, height = struct.unpack(
+        _HEADER_FORMAT, file.read(_HEADER_SIZE)
+    )
+    if magic != RAW_SHEET_MAGIC:
+        raise ValueError("Not a raw packed spritesheet file")
+    if version != RAW_SHEET_VERSION:
+        raise ValueError(f"Unsupported raw packed spritesheet version: {version}")
+    return width, height, bits_per_pixel, colors
+
+
+def load(filename: str, bitmap: Optional[Bitmap] = None) -> Tuple[Bitmap, Palette]:
+    """
+    Load a raw packed spritesheet file.
+
+    :param str filename: The name of the file to load.
+    :param Bitmap bitmap: Optional preallocated Bitmap to fill. Must be the same size as
+      the spritesheet and able to hold all of its palette indexes. A new Bitmap is
+      created if it is not provided.
+
+    :returns: Tuple of the Bitmap and the Palette
+    """
+    with open(filename, "rb") as file:
+        width, height, bits_per_pixel, colors = read_header(file)
+
+        palette = Palette(colors)
+        palette_data = file.read(colors * 4)
+        for i in range(colors):
+            palette[i] = struct.unpack_from("<I", palette_data, i * 4)[0]
+
+        if bitmap is None:
+            bitmap = Bitmap(width, height, colors)
+        elif bitmap.width != width or bitmap.height != height:
+            raise ValueError(f"Bitmap must be {width}x{height} to load {filename}")
+
+        # rows are padded to whole 32 bit words, the same as Bitmap rows
+        bitmaptools.readinto(
+            bitmap,
+            file,
+            bits_per_pixel=bits_per_pixel,
+            element_size=4,
+            reverse_pixels_in_element=True,
+        )
+    return bitmap, palette
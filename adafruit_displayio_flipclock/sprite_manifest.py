@@ -0,0 +1,412 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.sprite_manifest`
+================================================================================
+
+Loads the manifest written by the spritesheet generator alongside the spritesheet
+images. It describes the tile size, animation frame count and index tables so that
+widgets can be created without hand tuned constants.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Optional, Tuple, Union
+
+    from displayio import Bitmap, Palette
+
+    from adafruit_displayio_flipclock.sprite_ondisk import OnDiskSpriteSheet
+    from adafruit_displayio_flipclock.sprite_rle import RLESpriteSheet
+    from adafruit_displayio_flipclock.sprite_synth import SynthesizedSpriteSheet
+except ImportError:
+    pass
+
+import json
+from array import array
+
+from adafruit_displayio_flipclock.sprite_atlas import SpriteAtlas
+
+# names of the spritesheets described in a manifest
+SHEET_NAMES = ("static", "top", "bottom")
+
+# file name extension of raw packed spritesheets, see sprite_loader
+RAW_SHEET_EXTENSION = ".fcb"
+
+# file name extension of run length encoded spritesheets, see sprite_rle
+RLE_SHEET_EXTENSION = ".fcr"
+
+
+class SpriteManifest:
+    """
+    Description of a set of spritesheets made by the spritesheet generator. Index tables
+    are stored as flat arrays. Use `SpriteManifest.load` to read a manifest file.
+
+    :param dict description: The decoded contents of the manifest.
+    :param str path: Directory prefix that the spritesheet filenames are relative to.
+    :param int on_disk_cache_size: When set, BMP animation spritesheets are read from disk
+      by an `OnDiskSpriteSheet` that keeps this many frames in memory, instead of being
+      loaded whole.
+    :param bool synthesize_frames: Whether to draw the animation frames from the static
+      spritesheet with `SynthesizedSpriteSheet` instead of loading the animation
+      spritesheets.
+    :param bool lazy: Whether to return the animation spritesheets as `LazySpriteSheet`
+      objects that are only loaded when first needed. Needs the animation palettes up
+      front, so it applies to manifests with a shared palette and to BMP spritesheets,
+      whose palette is read without loading the image.
+    :param float prefetch_after: With lazy set, the number of seconds after which
+      polling the lazy spritesheets loads them, see `LazySpriteSheet`.
+    """
+
+    def __init__(
+        self,
+        description: dict,
+        path: str = "",
+        on_disk_cache_size: Optional[int] = None,
+        synthesize_frames: bool = False,
+        lazy: bool = False,
+        prefetch_after: Optional[float] = None,
+    ) -> None:
+        self.path = path
+        self.on_disk_cache_size = on_disk_cache_size
+        self.synthesize_frames = synthesize_frames
+        self.lazy = lazy
+        self.prefetch_after = prefetch_after
+        self.tile_width = description["tile_width"]
+        self.tile_height = description["tile_height"]
+        self.frame_count = description["frame_count"]
+        self.scale = description.get("scale", 1)
+        # pixels the animation frames were widened by, None in older manifests
+        self.widen = description.get("widen")
+        self.shared_palette = description.get("shared_palette", False)
+        self.charset = description.get("charset")
+        self.top_static_indexes = array("H", description["static"]["top_indexes"])
+        self.bottom_static_indexes = array("H", description["static"]["bottom_indexes"])
+        # separator sprites and the blank sprite, when they were generated
+        self._separators = description.get("separators")
+        self.separator_indexes = None
+        self.blank_indexes = None
+        if self._separators is not None:
+            self.separator_indexes = {
+                character: tuple(indexes)
+                for character, indexes in self._separators["indexes"].items()
+            }
+            self.blank_indexes = tuple(self._separators["blank_indexes"])
+
+        self._sheets = {name: description[name] for name in SHEET_NAMES}
+        # spritesheets that have already been loaded, keyed by name
+        self._loaded = {}
+
+    @classmethod
+    def load(
+        cls,
+        filename: str,
+        on_disk_cache_size: Optional[int] = None,
+        synthesize_frames: bool = False,
+        lazy: bool = False,
+        prefetch_after: Optional[float] = None,
+    ) -> "SpriteManifest":
+        """
+        Read a manifest file. Spritesheets are loaded from the same directory.
+
+        :param str filename: The name of the manifest JSON file.
+        :param int on_disk_cache_size: Read BMP animation spritesheets from disk keeping
+          this many frames in memory, see `SpriteManifest`.
+        :param bool synthesize_frames: Draw the animation frames from the static
+          spritesheet, see `SpriteManifest`.
+        :param bool lazy: Load the animation spritesheets when first needed, see
+          `SpriteManifest`.
+        :param float prefetch_after: Seconds after which polling loads lazy spritesheets.
+        """
+        with open(filename) as manifest_file:
+            description = json.load(manifest_file)
+        path = ""
+        if "/" in filename:
+            path = filename[: filename.rindex("/") + 1]
+        return cls(description, path, on_disk_cache_size, synthesize_frames, lazy, prefetch_after)
+
+    def transparent_indexes(self, name: str) -> array:
+        """
+        The palette indexes to make transparent for a spritesheet.
+
+        :param str name: "static", "top" or "bottom"
+        """
+        return array("H", self._sheets[name]["transparent_indexes"])
+
+    def frame_map(self, name: str) -> Optional[array]:
+        """
+        The map from animation frame to tile index for an animation spritesheet that
+        had duplicate frames removed, or None.
+
+        :param str name: "top" or "bottom"
+        """
+        frame_map = self._sheets[name].get("frame_map")
+        if frame_map is None:
+            return None
+        return array("H", frame_map)
+
+    def load_sheet(
+        self, name: str
+    ) -> Tuple[
+        Union[Bitmap, SpriteAtlas, RLESpriteSheet, OnDiskSpriteSheet, SynthesizedSpriteSheet],
+        Palette,
+    ]:
+        """
+        Load a spritesheet and its palette with the transparent indexes already set.
+        Raw packed spritesheets are loaded with `sprite_loader`, run length encoded ones
+        are returned as a `RLESpriteSheet` and BMP files are loaded with
+        adafruit_imageload, or opened as an `OnDiskSpriteSheet` for animation
+        spritesheets when on_disk_cache_size is set. Atlas spritesheets are returned as a
+        `SpriteAtlas` and spritesheets split over several files are returned as
+        `SpritePages`. When the manifest describes a shared palette the static sheet's
+        palette is returned for all three sheets. With synthesize_frames set the animation
+        spritesheets are `SynthesizedSpriteSheet` objects using the static palette, and with
+        lazy set they are `LazySpriteSheet` objects that load the file when first needed.
+        Loaded spritesheets are kept, loading the same one again returns the same objects.
+
+        :param str name: "static", "top" or "bottom"
+        """
+        if name in self._loaded:
+            return self._loaded[name]
+        if self.synthesize_frames and name != "static":
+            return self._synthesize_sheet(name)
+
+        if "pages" in self._sheets[name]:
+            return self._load_pages(name)
+
+        filename = self.path + self._sheets[name]["file"]
+        if self.lazy and name != "static" and (self.shared_palette or filename.endswith(".bmp")):
+            return self._lazy_sheet(name)
+
+        bitmap, palette = self._open_sheet(name)
+        self._loaded[name] = (bitmap, self._sheet_palette(name, palette))
+        return self._loaded[name]
+
+    def load_separator_sheet(self) -> Optional[Bitmap]:
+        """
+        Load the spritesheet of separator sprites, or return None if the manifest has
+        none. Its pixels are indexes into the static spritesheet's palette.
+        """
+        if self._separators is None:
+            return None
+        if "separators" not in self._loaded:
+            filename = self.path + self._separators["file"]
+            if filename.endswith(RAW_SHEET_EXTENSION):
+                from adafruit_displayio_flipclock import sprite_loader
+
+                bitmap = sprite_loader.load(filename)[0]
+            else:
+                import adafruit_imageload
+
+                bitmap = adafruit_imageload.load(filename)[0]
+            self._loaded["separators"] = bitmap
+        return self._loaded["separators"]
+
+    def _open_sheet(self, name: str) -> Tuple[object, Palette]:
+        """
+        Load a spritesheet file with the loader that suits it. Returns the spritesheet
+        Bitmap or frame source and the palette read from the file.
+
+        :param str name: "static", "top" or "bottom"
+        """
+        sheet = self._sheets[name]
+        filename = self.path + sheet["file"]
+        if filename.endswith(RAW_SHEET_EXTENSION):
+            from adafruit_displayio_flipclock import sprite_loader
+
+            bitmap, palette = sprite_loader.load(filename)
+        elif filename.endswith(RLE_SHEET_EXTENSION):
+            from adafruit_displayio_flipclock import sprite_rle
+
+            bitmap, palette = sprite_rle.load(filename)
+        elif (
+            self.on_disk_cache_size is not None
+            and name != "static"
+            and "atlas" not in sheet
+            and filename.endswith(".bmp")
+        ):
+            from adafruit_displayio_flipclock import sprite_ondisk
+
+            bitmap, palette = sprite_ondisk.load(
+                filename,
+                self.tile_width,
+                self.tile_height,
+                self.on_disk_cache_size,
+                self.frame_map(name),
+            )
+        else:
+            import adafruit_imageload
+
+            bitmap, palette = adafruit_imageload.load(filename)
+
+        if "atlas" in sheet:
+            bitmap = SpriteAtlas(
+                bitmap,
+                sheet["atlas"]["frames"],
+                self.tile_width,
+                self.tile_height,
+                sheet["atlas"]["transparent_index"],
+            )
+        return bitmap, palette
+
+    def _load_pages(self, name: str) -> Tuple[object, Palette]:
+        """
+        Load a spritesheet split over several page files as `SpritePages`. The pages
+        share the palette of the first one.
+
+        :param str name: "static", "top" or "bottom"
+        """
+        from adafruit_displayio_flipclock.sprite_pages import SpritePages
+
+        pages = []
+        palette = None
+        for page_file in self._sheets[name]["pages"]:
+            filename = self.path + page_file
+            if filename.endswith(RAW_SHEET_EXTENSION):
+                from adafruit_displayio_flipclock import sprite_loader
+
+                bitmap, page_palette = sprite_loader.load(filename)
+            else:
+                import adafruit_imageload
+
+                bitmap, page_palette = adafruit_imageload.load(filename)
+            pages.append(bitmap)
+            if palette is None:
+                palette = page_palette
+
+        self._loaded[name] = (
+            SpritePages(pages, self.tile_width, self.tile_height),
+            self._sheet_palette(name, palette),
+        )
+        return self._loaded[name]
+
+    def _sheet_palette(self, name: str, palette: Palette) -> Palette:
+        """
+        The palette to use with a spritesheet, the static palette when the manifest
+        describes a shared palette or the spritesheet's own with its transparent
+        indexes set.
+
+        :param str name: "static", "top" or "bottom"
+        :param Palette palette: The palette read from the spritesheet file
+        """
+        if self.shared_palette and name != "static":
+            return self.load_sheet("static")[1]
+        for index in self._sheets[name]["transparent_indexes"]:
+            palette.make_transparent(index)
+        return palette
+
+    def _lazy_sheet(self, name: str) -> Tuple[object, Palette]:
+        """
+        Make the frame source that loads an animation spritesheet the first time a
+        frame is drawn from it.
+
+        :param str name: "top" or "bottom"
+        """
+        from adafruit_displayio_flipclock.sprite_lazy import LazySpriteSheet
+
+        if self.shared_palette:
+            palette = self.load_sheet("static")[1]
+        else:
+            from displayio import OnDiskBitmap
+
+            # only the header and palette are read
+            palette = self._sheet_palette(
+                name, OnDiskBitmap(self.path + self._sheets[name]["file"]).pixel_shader
+            )
+
+        frame_map = None
+        if "atlas" not in self._sheets[name]:
+            frame_map = self.frame_map(name)
+        self._loaded[name] = (
+            LazySpriteSheet(
+                lambda: self._open_sheet(name)[0],
+                self.tile_width,
+                self.tile_height,
+                frame_map,
+                self.prefetch_after,
+            ),
+            palette,
+        )
+        return self._loaded[name]
+
+    def _synthesize_sheet(self, name: str) -> Tuple[SynthesizedSpriteSheet, Palette]:
+        """
+        Make the frame source that draws an animation spritesheet's frames from the
+        static spritesheet.
+
+        :param str name: "top" or "bottom"
+        """
+        from adafruit_displayio_flipclock.sprite_synth import (
+            DEFAULT_WIDEN,
+            SynthesizedSpriteSheet,
+        )
+
+        static_spritesheet, static_palette = self.load_sheet("static")
+        if "pages" in self._sheets["static"]:
+            raise ValueError("Frames can't be synthesized from a static spritesheet in pages")
+        if name == "top":
+            static_indexes = self.top_static_indexes
+        else:
+            static_indexes = self.bottom_static_indexes
+        widen = self.widen
+        if widen is None:
+            # older generators widened by their padding scaled down to the base size
+            widen = max(DEFAULT_WIDEN // self.scale, 1)
+        self._loaded[name] = (
+            SynthesizedSpriteSheet(
+                static_spritesheet,
+                static_indexes,
+                self.tile_width,
+                self.tile_height,
+                self.frame_count,
+                bottom_half=name == "bottom",
+                transparent_index=self._sheets["static"]["transparent_indexes"][0],
+                widen=widen,
+            ),
+            static_palette,
+        )
+        return self._loaded[name]
+
+    def widget_arguments(self) -> Tuple[tuple, dict]:
+        """
+        Load the spritesheets and build the arguments shared by `FlipDigit` and
+        `FlipClock`. Returns a tuple of positional arguments and a dictionary of
+        keyword arguments.
+        """
+        static_spritesheet, static_palette = self.load_sheet("static")
+        top_spritesheet, top_palette = self.load_sheet("top")
+        bottom_spritesheet, bottom_palette = self.load_sheet("bottom")
+        args = (
+            static_spritesheet,
+            static_palette,
+            top_spritesheet,
+            top_palette,
+            bottom_spritesheet,
+            bottom_palette,
+            self.tile_width,
+            self.tile_height,
+        )
+        kwargs = {
+            "anim_frame_count": self.frame_count,
+            "top_anim_frame_map": self.frame_map("top"),
+            "bottom_anim_frame_map": self.frame_map("bottom"),
+            "top_static_indexes": self.top_static_indexes,
+            "bottom_static_indexes": self.bottom_static_indexes,
+            "scale": self.scale,
+            "charset": self.charset,
+        }
+        return args, kwargs
@@ -0,0 +1,292 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.sprite_ondisk`
+================================================================================
+
+Animation spritesheets that stay on disk. Frames are read from the BMP file when
+they are needed and the most recently used ones are kept in a small cache of
+tile sized Bitmaps.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import BinaryIO, Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+import struct
+
+import bitmaptools
+from displayio import Bitmap, Palette
+
+
+class OnDiskSpriteSheet:
+    """
+    An uncompressed, indexed BMP animation spritesheet that is read from disk one
+    frame at a time instead of being loaded into memory. Can be passed to `FlipDigit`
+    and `FlipClock` in place of an animation spritesheet. The digits call `prefetch`
+    after each flip to queue the frames of their next likely flip, which `poll` then
+    reads one per call from the main loop. Frames read ahead stay cached until they are
+    drawn, so digits sharing the spritesheet don't evict each other's. The file is opened
+    once, its palette is read from the BMP color table.
+
+    :param str filename: The name of the BMP file.
+    :param int tile_width: Width in pixels of the animation tiles. Tiles must start on
+      whole bytes in the file, so ``tile_width * bits_per_pixel`` must be a multiple of 8.
+    :param int tile_height: Height in pixels of the animation tiles.
+    :param int cache_size: The number of frames to keep in memory. At least as many as
+      the animation frame count keeps each flip from reading a frame twice, a multiple of
+      it leaves room for the frames read ahead for several digits.
+    :param frame_map: Optional map from animation frame to tile index for spritesheets
+      that had duplicate frames removed.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        tile_width: int,
+        tile_height: int,
+        cache_size: int = 10,
+        frame_map: Optional[Sequence[int]] = None,
+    ) -> None:
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.cache_size = cache_size
+        self.frame_map = frame_map
+
+        self._file = open(filename, "rb")
+        (
+            self._data_offset,
+            width,
+            self._bmp_height,
+            self._bits_per_pixel,
+        ) = OnDiskSpriteSheet._read_bmp_header(self._file)
+        self.palette = OnDiskSpriteSheet._read_bmp_palette(self._file, self._bits_per_pixel)
+        if (tile_width * self._bits_per_pixel) % 8:
+            raise ValueError("Tiles must start on whole bytes")
+
+        self._columns = width // tile_width
+        self._row_size = ((width * self._bits_per_pixel + 31) // 32) * 4
+
+        # single row used to read tile rows before copying them into a cached frame
+        self._row_bitmap = Bitmap(tile_width, 1, len(self.palette))
+
+        # cached frame bitmaps keyed by tile index, most recently used last
+        self._cache = {}
+        self._recent = []
+        # tile indexes waiting for poll to read them, and those read ahead but not drawn
+        self._queued = []
+        self._prefetched = set()
+
+    @staticmethod
+    def _read_bmp_header(file: BinaryIO) -> Tuple[int, int, int, int]:
+        """
+        Read the pixel data offset, width, height and bits per pixel of an uncompressed,
+        indexed BMP file. The height is negative for files stored top row first.
+
+        :param file: The BMP file opened in binary mode.
+        """
+        header = file.read(46)
+        if header[:2] != b"BM":
+            raise ValueError("Not a BMP file")
+        data_offset = struct.unpack_from("<I", header, 10)[0]
+        width, height = struct.unpack_from("<ii", header, 18)
+        bits_per_pixel = struct.unpack_from("<H", header, 28)[0]
+        compression = struct.unpack_from("<I", header, 30)[0]
+        if bits_per_pixel > 8 or compression:
+            raise ValueError("Only uncompressed indexed BMP files can be read from disk")
+        return data_offset, width, height, bits_per_pixel
+
+    @staticmethod
+    def _read_bmp_palette(file: BinaryIO, bits_per_pixel: int) -> Palette:
+        """
+        Read the color table of a BMP file into a Palette.
+
+        :param file: The BMP file opened in binary mode.
+        :param int bits_per_pixel: The bits per pixel of the BMP file.
+        """
+        # the color table follows the info header, which starts with its size
+        file.seek(14)
+        info_size = struct.unpack("<I", file.read(4))[0]
+        file.seek(46)
+        colors = struct.unpack("<I", file.read(4))[0] or 1 << bits_per_pixel
+        file.seek(14 + info_size)
+        table = file.read(colors * 4)
+        palette = Palette(colors)
+        for i in range(colors):
+            # stored as blue, green, red and an unused byte
+            blue, green, red = table[i * 4], table[i * 4 + 1], table[i * 4 + 2]
+            palette[i] = red << 16 | green << 8 | blue
+        return palette
+
+    def _tile_index(self, index: int) -> int:
+        """
+        The spritesheet tile of an animation frame, frames that were deduplicated share one.
+
+        :param int index: The index of the animation frame.
+        """
+        if self.frame_map is None:
+            return index
+        return self.frame_map[index]
+
+    def _evict(self) -> int:
+        """
+        Remove the least recently used tile from the recently used list and return it,
+        passing over tiles read ahead that haven't been drawn unless all of them are.
+        """
+        recent = self._recent
+        prefetched = self._prefetched
+        position = 0
+        while position < len(recent):
+            if recent[position] not in prefetched:
+                return recent.pop(position)
+            position += 1
+        tile_index = recent.pop(0)
+        prefetched.discard(tile_index)
+        return tile_index
+
+    def _read_frame(self, tile_index: int) -> Bitmap:
+        """
+        Get the Bitmap of a spritesheet tile, reading it from disk if it isn't cached.
+        The least recently used tile is replaced when the cache is full.
+
+        :param int tile_index: The index of the tile in the spritesheet.
+        """
+        recent = self._recent
+        if tile_index in self._cache:
+            if recent[-1] != tile_index:
+                recent.remove(tile_index)
+                recent.append(tile_index)
+            return self._cache[tile_index]
+
+        if len(recent) >= max(self.cache_size, 1):
+            frame_bitmap = self._cache.pop(self._evict())
+        else:
+            frame_bitmap = Bitmap(self.tile_width, self.tile_height, len(self.palette))
+
+        x = (tile_index % self._columns) * self.tile_width
+        top = (tile_index // self._columns) * self.tile_height
+        x_offset = x * self._bits_per_pixel // 8
+        row_bitmap = self._row_bitmap
+        for y in range(self.tile_height):
+            if self._bmp_height > 0:
+                # rows are stored bottom row first
+                file_row = self._bmp_height - 1 - (top + y)
+            else:
+                file_row = top + y
+            self._file.seek(self._data_offset + file_row * self._row_size + x_offset)
+            bitmaptools.readinto(
+                row_bitmap,
+                self._file,
+                bits_per_pixel=self._bits_per_pixel,
+                reverse_pixels_in_element=True,
+            )
+            bitmaptools.blit(frame_bitmap, row_bitmap, 0, y)
+
+        self._cache[tile_index] = frame_bitmap
+        recent.append(tile_index)
+        return frame_bitmap
+
+    def prefetch(self, first_index: int, count: int = 1) -> None:
+        """
+        Queue animation frames to be read into the cache by `poll` ahead of when they
+        are shown. Nothing is read from disk here, so it is cheap to call after a flip.
+        Frames already cached are kept until they are drawn.
+
+        :param int first_index: The index of the first animation frame to read.
+        :param int count: The number of consecutive frames to read.
+        """
+        queued = self._queued
+        for index in range(first_index, first_index + min(count, self.cache_size)):
+            tile_index = self._tile_index(index)
+            if tile_index in self._cache:
+                self._prefetched.add(tile_index)
+            elif tile_index not in queued:
+                queued.append(tile_index)
+        # frames queued longer ago than the cache can hold would only be evicted again
+        del queued[: max(len(queued) - self.cache_size, 0)]
+
+    def poll(self) -> bool:
+        """
+        Read one frame queued by `prefetch` into the cache. Cheap to call from the main
+        loop while nothing else is happening. Returns whether every queued frame is read.
+        """
+        queued = self._queued
+        if queued:
+            tile_index = queued.pop(0)
+            self._read_frame(tile_index)
+            self._prefetched.add(tile_index)
+        return not queued
+
+    def memory_bytes(self) -> int:
+        """
+        Estimated bytes of RAM used by the row Bitmap and a full cache of frames.
+        """
+        from adafruit_displayio_flipclock.memory_report import (
+            bitmap_bytes,
+            bits_per_value,
+            pixel_bytes,
+        )
+
+        bits = bits_per_value(len(self.palette))
+        frame_bytes = pixel_bytes(self.tile_width, self.tile_height, bits)
+        return bitmap_bytes(self._row_bitmap) + frame_bytes * max(self.cache_size, 1)
+
+    def draw_frame(self, bitmap: Bitmap, index: int) -> None:
+        """
+        Draw an animation frame into a tile sized Bitmap.
+
+        :param Bitmap bitmap: The tile sized Bitmap to draw into.
+        :param int index: The index of the animation frame to draw.
+        """
+        tile_index = self._tile_index(index)
+        self._prefetched.discard(tile_index)
+        bitmaptools.blit(bitmap, self._read_frame(tile_index), 0, 0)
+
+    def deinit(self) -> None:
+        """
+        Close the spritesheet file and release the cached frames.
+        """
+        self._file.close()
+        self._cache = {}
+        self._recent = []
+        self._queued = []
+        self._prefetched = set()
+
+
+def load(
+    filename: str,
+    tile_width: int,
+    tile_height: int,
+    cache_size: int = 10,
+    frame_map: Optional[Sequence[int]] = None,
+) -> Tuple[OnDiskSpriteSheet, Palette]:
+    """
+    Open a BMP animation spritesheet to be read from disk.
+
+    :param str filename: The name of the BMP file.
+    :param int tile_width: Width in pixels of the animation tiles.
+    :param int tile_height: Height in pixels of the animation tiles.
+    :param int cache_size: The number of frames to keep in memory.
+    :param frame_map: Optional map from animation frame to tile index.
+
+    :returns: Tuple of the OnDiskSpriteSheet and its Palette
+    """
+    sheet = OnDiskSpriteSheet(filename, tile_width, tile_height, cache_size, frame_map)
+    return sheet, sheet.palette
@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.sprite_pages`
+================================================================================
+
+Spritesheets split over several equally sized Bitmaps, for character sets with more
+sprites than fit in one Bitmap.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Sequence
+
+    from displayio import Bitmap, TileGrid
+except ImportError:
+    pass
+
+
+class SpritePages:
+    """
+    A spritesheet made of several pages. Tile indexes count through every page in order,
+    so index tables work the same as for a single Bitmap. Can be passed to `FlipDigit` and
+    `FlipClock` in place of the static or animation spritesheets, the TileGrids switch to
+    the page that holds each tile.
+
+    :param pages: The page Bitmaps, all the same size and using the same palette.
+    :param int tile_width: Width in pixels of the tiles.
+    :param int tile_height: Height in pixels of the tiles.
+    """
+
+    def __init__(self, pages: Sequence[Bitmap], tile_width: int, tile_height: int) -> None:
+        first_page = pages[0]
+        for page in pages:
+            if page.width != first_page.width or page.height != first_page.height:
+                raise ValueError("All pages must be the same size")
+        self.pages = tuple(pages)
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.tiles_per_page = (first_page.width // tile_width) * (first_page.height // tile_height)
+
+    @property
+    def width(self) -> int:
+        """
+        Width in pixels of each page.
+        """
+        return self.pages[0].width
+
+    @property
+    def height(self) -> int:
+        """
+        Height in pixels of all the pages stacked.
+        """
+        return self.pages[0].height * len(self.pages)
+
+    def memory_bytes(self) -> int:
+        """
+        Estimated bytes of RAM used by all of the pages.
+        """
+        from adafruit_displayio_flipclock.memory_report import bitmap_bytes
+
+        return sum(bitmap_bytes(page) for page in self.pages)
+
+    def show_tile(self, tilegrid: TileGrid, index: int) -> None:
+        """
+        Show a tile in a single tile TileGrid, switching it to the right page first.
+
+        :param TileGrid tilegrid: The TileGrid to show the tile in.
+        :param int index: The tile index counted through every page.
+        """
+        page, tile = divmod(index, self.tiles_per_page)
+        bitmap = self.pages[page]
+        if tilegrid.bitmap is not bitmap:
+            tilegrid.bitmap = bitmap
+        tilegrid[0] = tile
@@ -0,0 +1,153 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.sprite_rle`
+================================================================================
+
+Run length encoded animation spritesheets. The compressed frames are kept in
+memory and only the frame being shown is decoded, into the tile sized Bitmap of
+the digit that is flipping.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Sequence, Tuple
+
+    from displayio import Bitmap
+except ImportError:
+    pass
+
+import struct
+from array import array
+
+import bitmaptools
+from displayio import Palette
+
+# file name extension of run length encoded spritesheets
+RLE_SHEET_EXTENSION = ".fcr"
+
+# magic bytes and format version at the start of each file
+RLE_SHEET_MAGIC = b"FCRL"
+RLE_SHEET_VERSION = 1
+
+# magic, version, color count, tile width, tile height, frame count
+_HEADER_FORMAT = "<4sBHHHH"
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+
+# control bytes below this value start a run, the others a literal sequence
+_LITERAL_FLAG = 0x80
+
+
+class RLESpriteSheet:
+    """
+    Animation frames compressed with run length encoding by the spritesheet generator's
+    RLE mode. Can be passed to `FlipDigit` and `FlipClock` in place of an animation
+    spritesheet, each digit then decodes frames into a tile sized Bitmap of its own.
+
+    Every row of a frame is a sequence of packets. A control byte ``c`` below 128 is
+    followed by one palette index that is repeated ``c + 1`` times. Otherwise
+    ``c - 127`` palette indexes follow that are copied as they are. Packets never
+    continue onto the next row.
+
+    :param data: The encoded frames.
+    :param offsets: The offset within ``data`` of each animation frame. Identical frames
+      may share the same offset.
+    :param int tile_width: Width in pixels of the animation tiles.
+    :param int tile_height: Height in pixels of the animation tiles.
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        offsets: Sequence[int],
+        tile_width: int,
+        tile_height: int,
+    ) -> None:
+        self.data = data
+        self.offsets = array("L", offsets)
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+
+    @property
+    def frame_count(self) -> int:
+        """
+        The total number of animation frames in the spritesheet.
+        """
+        return len(self.offsets)
+
+    def memory_bytes(self) -> int:
+        """
+        Estimated bytes of RAM used by the encoded frames and their offsets.
+        """
+        from adafruit_displayio_flipclock.memory_report import table_bytes
+
+        return table_bytes(self.data) + len(self.offsets) * 4
+
+    def draw_frame(self, bitmap: Bitmap, index: int) -> None:
+        """
+        Decode an animation frame into a tile sized Bitmap.
+
+        :param Bitmap bitmap: The tile sized Bitmap to draw into.
+        :param int index: The index of the animation frame to draw.
+        """
+        data = self.data
+        position = self.offsets[index]
+        width = self.tile_width
+        fill_region = bitmaptools.fill_region
+        for y in range(self.tile_height):
+            x = 0
+            while x < width:
+                control = data[position]
+                if control < _LITERAL_FLAG:
+                    end = x + control + 1
+                    fill_region(bitmap, x, y, end, y + 1, data[position + 1])
+                    position += 2
+                    x = end
+                else:
+                    position += 1
+                    for _ in range(control - _LITERAL_FLAG + 1):
+                        bitmap[x, y] = data[position]
+                        position += 1
+                        x += 1
+
+
+def load(filename: str) -> Tuple[RLESpriteSheet, Palette]:
+    """
+    Load a run length encoded spritesheet file.
+
+    :param str filename: The name of the file to load.
+
+    :returns: Tuple of the RLESpriteSheet and the Palette
+    """
+    with open(filename, "rb") as file:
+        magic, version, colors, tile_width, tile_height, frame_count = struct.unpack(
+            _HEADER_FORMAT, file.read(_HEADER_SIZE)
+        )
+        if magic != RLE_SHEET_MAGIC:
+            raise ValueError("Not a run length encoded spritesheet file")
+        if version != RLE_SHEET_VERSION:
+            raise ValueError(f"Unsupported run length encoded spritesheet version: {version}")
+
+        palette = Palette(colors)
+        palette_data = file.read(colors * 4)
+        for i in range(colors):
+            palette[i] = struct.unpack_from("<I", palette_data, i * 4)[0]
+
+        offsets = struct.unpack(f"<{frame_count}L", file.read(frame_count * 4))
+        data = file.read()
+    return RLESpriteSheet(data, offsets, tile_width, tile_height), palette
@@ -0,0 +1,176 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_displayio_flipclock.sprite_synth`
+================================================================================
+
+Flip animation frames drawn on the device from the static spritesheet, so the
+animation spritesheets don't need to be loaded at all. Each frame is a perspective
+squash of a static digit half, drawn one row at a time with bitmaptools.
+
+
+* Author(s): Tim Cocks
+
+Implementation Notes
+--------------------
+
+**Hardware:**
+
+* `ESP32-S2 Feather TFT <https://www.adafruit.com/product/5300>`_
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+"""
+
+try:
+    from typing import Sequence
+except ImportError:
+    pass
+
+from array import array
+
+import bitmaptools
+from displayio import Bitmap
+
+# pixels the generator widens frames by when rendering at full size, its padding
+DEFAULT_WIDEN = 8
+
+
+class SynthesizedSpriteSheet:
+    """
+    Flip animation frames generated from the static spritesheet with the same perspective
+    as the spritesheet generator uses. Can be passed to `FlipDigit` and `FlipClock` in
+    place of an animation spritesheet, together with the static palette. Trades drawing
+    time during flips for not keeping an animation spritesheet in memory.
+
+    :param Bitmap static_spritesheet: Spritesheet image of static numbers sprites.
+    :param static_indexes: Static spritesheet tile index of the digit half for each value.
+    :param int tile_width: Width in pixels of the sprite tiles.
+    :param int tile_height: Height in pixels of the sprite tiles, half the full digit height.
+    :param int frame_count: The number of frames in each flip animation.
+    :param bool bottom_half: Whether to draw the bottom half unfolding instead of the top
+      half folding down.
+    :param int transparent_index: Palette index drawn where the frame is empty.
+    :param int widen: Number of pixels each side of the digit half grows by at the edge
+      that is closest to the viewer. Use the ``widen`` of the manifest to match the
+      generated animation spritesheets, the default matches full size sprites.
+    """
+
+    def __init__(
+        self,
+        static_spritesheet: Bitmap,
+        static_indexes: Sequence[int],
+        tile_width: int,
+        tile_height: int,
+        frame_count: int = 10,
+        bottom_half: bool = False,
+        transparent_index: int = 0,
+        widen: int = DEFAULT_WIDEN,
+    ) -> None:
+        self.static_spritesheet = static_spritesheet
+        self.static_indexes = static_indexes
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.frame_count = frame_count
+        self.bottom_half = bottom_half
+        self.transparent_index = transparent_index
+        self._columns = static_spritesheet.width // tile_width
+
+        # source row and horizontal scale for every row of every frame, -1 rows are empty
+        self._source_rows = array("h", [-1] * (frame_count * tile_height))
+        self._scales = array("f", [1.0] * (frame_count * tile_height))
+        angle_step = (90 // frame_count) + 1
+        for frame in range(frame_count):
+            self._plan_frame(frame, frame * angle_step + 1, widen)
+
+        # two copies of the source row, so that sampling between them is never off by
+        # one row. Holds any 8 bit palette index.
+        self._row_bitmap = Bitmap(tile_width, 2, 256)
+
+    def _plan_frame(self, frame: int, angle: int, widen: int) -> None:
+        """
+        Work out which source row is drawn into each row of a frame and how much it
+        is widened.
+
+        :param int frame: The index of the frame within the flip animation
+        :param int angle: The angle in degrees (1-91) the digit half is turned by
+        :param int widen: Pixels each side grows by at the edge closest to the viewer
+        """
+        width = self.tile_width
+        height = self.tile_height
+        fold_y = min(angle * height / 90, height - 1)
+        if self.bottom_half:
+            near_width = width + 2 * ((90 - angle) * widen / 90) + 1
+            first_y, last_y = 0, min(int(fold_y), height)
+            edge_widths = (width, near_width)
+        else:
+            near_width = width + 2 * (angle * widen / 90) + 1
+            first_y, last_y = int(fold_y), height
+            edge_widths = (near_width, width)
+
+        span = max(last_y - first_y, 1)
+        for y in range(first_y, last_y):
+            # position down the squashed half, and the matching perspective correct
+            # position down the source half
+            screen = (y + 0.5 - first_y) / span
+            row_width = (1 - screen) * edge_widths[0] + screen * edge_widths[1]
+            source = screen * edge_widths[1] / row_width
+            offset = frame * height + y
+            self._source_rows[offset] = min(int(source * height), height - 1)
+            self._scales[offset] = row_width / width
+
+    def memory_bytes(self) -> int:
+        """
+        Estimated bytes of RAM used by the frame plan and row Bitmap. The static
+        spritesheet it reads from is not counted, it belongs to the digits.
+        """
+        from adafruit_displayio_flipclock.memory_report import bitmap_bytes
+
+        # 2 bytes per source row and 4 per scale
+        return len(self._source_rows) * 6 + bitmap_bytes(self._row_bitmap)
+
+    def draw_frame(self, bitmap: Bitmap, index: int) -> None:
+        """
+        Draw an animation frame into a tile sized Bitmap.
+
+        :param Bitmap bitmap: The tile sized Bitmap to draw into.
+        :param int index: The index of the animation frame to draw.
+        """
+        value, frame = divmod(index, self.frame_count)
+        tile_index = self.static_indexes[value]
+        source_x = (tile_index % self._columns) * self.tile_width
+        source_y = (tile_index // self._columns) * self.tile_height
+        width = self.tile_width
+        row_bitmap = self._row_bitmap
+
+        bitmap.fill(self.transparent_index)
+        offset = frame * self.tile_height
+        for y in range(self.tile_height):
+            source_row = self._source_rows[offset + y]
+            if source_row < 0:
+                continue
+            for row_y in (0, 1):
+                bitmaptools.blit(
+                    row_bitmap,
+                    self.static_spritesheet,
+                    0,
+                    row_y,
+                    x1=source_x,
+                    y1=source_y + source_row,
+                    x2=source_x + width,
+                    y2=source_y + source_row + 1,
+                )
+            bitmaptools.rotozoom(
+                bitmap,
+                row_bitmap,
+                ox=width // 2,
+                oy=y,
+                dest_clip0=(0, y),
+                dest_clip1=(width, y + 1),
+                px=width // 2,
+                py=1,
+                scale=self._scales[offset + y],
+            )
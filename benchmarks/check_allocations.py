@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Check that the flip animation frame loop allocates no memory. Flips a digit with 10
+and with 20 animation frames: memory allocated by the flip itself is the same for
+both, so any difference comes from the extra frames.
+
+On CircuitPython the garbage collector is disabled around each flip and the drop in
+gc.mem_free() is measured, copy this file to the board next to the library. On
+CPython it runs against the fake displayio of fakes.py with tracemalloc measuring the
+peak memory used:
+
+    python benchmarks/check_allocations.py
+"""
+
+import gc
+import sys
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+if tracemalloc is not None:
+    import os
+
+    import fakes
+
+    fakes.install()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from displayio import Bitmap, Palette
+
+from adafruit_displayio_flipclock import flip_digit
+from adafruit_displayio_flipclock.flip_digit import FlipDigit
+
+TILE_WIDTH = 16
+TILE_HEIGHT = 16
+FLIPS = 20
+
+
+def make_digit(frame_count: int) -> FlipDigit:
+    """
+    A digit using small spritesheets with the given number of animation frames.
+
+    :param int frame_count: The number of frames in the flip animations
+    """
+    palette = Palette(2)
+    palette[1] = 0xFFFFFF
+    return FlipDigit(
+        Bitmap(TILE_WIDTH * 3, TILE_HEIGHT * 8, 2),
+        palette,
+        Bitmap(TILE_WIDTH * frame_count, TILE_HEIGHT * 10, 2),
+        palette,
+        Bitmap(TILE_WIDTH * frame_count, TILE_HEIGHT * 10, 2),
+        palette,
+        TILE_WIDTH,
+        TILE_HEIGHT,
+        anim_frame_count=frame_count,
+        anim_delay=0,
+    )
+
+
+def bytes_per_flip(frame_count: int) -> float:
+    """
+    The memory allocated flipping a digit, averaged over several flips.
+
+    :param int frame_count: The number of frames in the flip animations
+    """
+    digit = make_digit(frame_count)
+    # one flip first so that anything created on first use isn't counted
+    digit.value = 9
+    gc.collect()
+    used = 0
+    for flip in range(FLIPS):
+        if tracemalloc is not None:
+            tracemalloc.start()
+            start = tracemalloc.get_traced_memory()[0]
+            digit.value = flip % 9
+            used += tracemalloc.get_traced_memory()[1] - start
+            tracemalloc.stop()
+        else:
+            gc.disable()
+            start = gc.mem_free()
+            digit.value = flip % 9
+            used += start - gc.mem_free()
+            gc.enable()
+            gc.collect()
+    return used / FLIPS
+
+
+def main() -> None:
+    """Measure both frame counts and fail if the extra frames allocated memory."""
+    if tracemalloc is not None:
+        flip_digit.time = fakes.FakeTime(record=False)
+    short_flip = bytes_per_flip(10)
+    long_flip = bytes_per_flip(20)
+    per_frame = (long_flip - short_flip) / 20
+    print(f"10 frames: {short_flip} bytes per flip, 20 frames: {long_flip} bytes per flip")
+    print(f"{per_frame} bytes per frame")
+    if per_frame > 0:
+        print("FAIL: the animation frame loop allocates memory")
+        sys.exit(1)
+    print("OK: no memory allocated per frame")
+
+
+main()
@@ -0,0 +1,83 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Measure the time and memory taken to import the flip clock widgets, then the extra
+cost of the modules they used to import up front: the DisplayIO Layout Widget and
+vectorio.
+
+On CircuitPython memory is the drop in gc.mem_free(), copy this file to the board next
+to the library. On CPython it runs against the fake displayio of fakes.py with
+tracemalloc measuring the memory used. vectorio is faked there, so only the Layout
+Widget is compared:
+
+    python benchmarks/check_imports.py
+"""
+
+import gc
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+if tracemalloc is not None:
+    import os
+
+    import fakes
+
+    fakes.install()
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def start() -> tuple:
+    """Collect garbage and note the time and memory in use."""
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+        return time.monotonic_ns(), tracemalloc.get_traced_memory()[0]
+    return time.monotonic_ns(), gc.mem_free()
+
+
+def stop(started: tuple) -> tuple:
+    """
+    The milliseconds and bytes used since start().
+
+    :param tuple started: The time and memory returned by start()
+    """
+    elapsed_ms = (time.monotonic_ns() - started[0]) / 1000000
+    gc.collect()
+    if tracemalloc is not None:
+        used = tracemalloc.get_traced_memory()[0] - started[1]
+        tracemalloc.stop()
+    else:
+        used = started[1] - gc.mem_free()
+    return elapsed_ms, used
+
+
+def main() -> None:
+    """Import the widgets, then the modules they no longer need, and print both costs."""
+    started = start()
+    from adafruit_displayio_flipclock.flip_clock import FlipClock  # noqa: F401
+
+    widgets_ms, widgets_bytes = stop(started)
+    print(f"flip clock widgets: {widgets_ms:.1f} ms, {widgets_bytes} bytes")
+
+    started = start()
+    try:
+        import vectorio  # noqa: F401
+        from adafruit_displayio_layout.widgets.widget import Widget  # noqa: F401
+    except ImportError as error:
+        print(f"Can't compare, {error}")
+        return
+    extra_ms, extra_bytes = stop(started)
+    print(f"layout Widget and vectorio: {extra_ms:.1f} ms, {extra_bytes} bytes")
+    print(
+        f"saved {extra_ms:.1f} ms and {extra_bytes} bytes, "
+        f"{100 * extra_bytes / (widgets_bytes + extra_bytes):.0f}% of the import memory"
+    )
+
+
+main()
@@ -0,0 +1,275 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Minimal stand ins for the CircuitPython modules the flip clock widgets use, so the
+benchmarks measure the widgets themselves on CPython rather than a display driver.
+`install` must be called before anything imports displayio.
+"""
+
+import sys
+import time
+import types
+from array import array
+
+
+class Bitmap:
+    """Bitmap holding one 16 bit value per pixel."""
+
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self.value_count = value_count
+        self._data = array("H", bytes(2 * width * height))
+
+    def __getitem__(self, index):
+        x, y = index
+        return self._data[y * self.width + x]
+
+    def __setitem__(self, index, value):
+        x, y = index
+        self._data[y * self.width + x] = value
+
+    def fill(self, value):
+        for i in range(len(self._data)):
+            self._data[i] = value
+
+
+class Palette:
+    """Palette of integer colors with transparency flags."""
+
+    def __init__(self, color_count, *, dither=False):
+        self._colors = [0] * color_count
+        self._transparent = [False] * color_count
+        self.dither = dither
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        return self._colors[index]
+
+    def __setitem__(self, index, value):
+        self._colors[index] = value
+
+    def make_transparent(self, index):
+        self._transparent[index] = True
+
+    def make_opaque(self, index):
+        self._transparent[index] = False
+
+    def is_transparent(self, index):
+        return self._transparent[index]
+
+
+class OnDiskBitmap:
+    """Placeholder, the benchmarks don't read images from disk."""
+
+    def __init__(self, file):
+        raise NotImplementedError("The fake displayio can't read images")
+
+
+class TileGrid:
+    """TileGrid tracking its tile indexes, position and visibility."""
+
+    def __init__(
+        self,
+        bitmap,
+        *,
+        pixel_shader,
+        width=1,
+        height=1,
+        tile_width=None,
+        tile_height=None,
+        default_tile=0,
+        x=0,
+        y=0,
+    ):
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.width = width
+        self.height = height
+        self.tile_width = bitmap.width if tile_width is None else tile_width
+        self.tile_height = bitmap.height if tile_height is None else tile_height
+        self.x = x
+        self.y = y
+        self.hidden = False
+        self.flip_x = False
+        self.flip_y = False
+        self._tiles = [default_tile] * (width * height)
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            index = index[1] * self.width + index[0]
+        return self._tiles[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, tuple):
+            index = index[1] * self.width + index[0]
+        self._tiles[index] = value
+
+
+class Group:
+    """Group holding an ordered list of layers."""
+
+    def __init__(self, *, scale=1, x=0, y=0):
+        self.scale = scale
+        self.x = x
+        self.y = y
+        self.hidden = False
+        self._layers = []
+
+    def append(self, layer):
+        self._layers.append(layer)
+
+    def insert(self, index, layer):
+        self._layers.insert(index, layer)
+
+    def remove(self, layer):
+        self._layers.remove(layer)
+
+    def pop(self, index=-1):
+        return self._layers.pop(index)
+
+    def index(self, layer):
+        return self._layers.index(layer)
+
+    def __len__(self):
+        return len(self._layers)
+
+    def __getitem__(self, index):
+        return self._layers[index]
+
+    def __setitem__(self, index, layer):
+        self._layers[index] = layer
+
+    def __iter__(self):
+        return iter(self._layers)
+
+
+class Circle:
+    """vectorio Circle with its position and palette."""
+
+    def __init__(self, *, pixel_shader, radius, x=0, y=0, color_index=0):
+        self.pixel_shader = pixel_shader
+        self.radius = radius
+        self.x = x
+        self.y = y
+        self.color_index = color_index
+        self.hidden = False
+
+
+class PaletteFader:
+    """PaletteFader that scales each color of its source palette once."""
+
+    def __init__(self, source_palette, brightness=1.0, gamma=1.0, normalize=False):
+        self.reference_palette = source_palette
+        self.brightness = brightness
+        self.gamma = gamma
+        self.normalize = normalize
+        self.palette = Palette(len(source_palette))
+        for index in range(len(source_palette)):
+            color = source_palette[index]
+            self.palette[index] = (
+                int(((color >> 16) & 0xFF) * brightness) << 16
+                | int(((color >> 8) & 0xFF) * brightness) << 8
+                | int((color & 0xFF) * brightness)
+            )
+            if source_palette.is_transparent(index):
+                self.palette.make_transparent(index)
+
+
+def blit(dest_bitmap, source_bitmap, x, y, *, x1=0, y1=0, x2=None, y2=None, skip_index=None):
+    """bitmaptools.blit copying a region one pixel at a time."""
+    x2 = source_bitmap.width if x2 is None else x2
+    y2 = source_bitmap.height if y2 is None else y2
+    for row in range(y1, y2):
+        for column in range(x1, x2):
+            value = source_bitmap[column, row]
+            if value != skip_index:
+                dest_bitmap[x + column - x1, y + row - y1] = value
+
+
+def readinto(
+    bitmap,
+    file,
+    bits_per_pixel,
+    element_size=1,
+    reverse_pixels_in_element=False,
+    swap_bytes_in_element=False,
+    reverse_rows=False,
+):
+    """bitmaptools.readinto for up to 8 bits per pixel, reading one row at a time."""
+    if swap_bytes_in_element and element_size > 1:
+        raise NotImplementedError("The fake bitmaptools can't swap bytes")
+    element_bits = 8 * element_size
+    row_size = element_size * ((bitmap.width * bits_per_pixel + element_bits - 1) // element_bits)
+    per_byte = 8 // bits_per_pixel
+    mask = (1 << bits_per_pixel) - 1
+    for row in range(bitmap.height):
+        data = file.read(row_size)
+        y = bitmap.height - 1 - row if reverse_rows else row
+        for x in range(bitmap.width):
+            position = x % per_byte
+            if reverse_pixels_in_element:
+                position = per_byte - 1 - position
+            bitmap[x, y] = (data[x // per_byte] >> (position * bits_per_pixel)) & mask
+
+
+def fill_region(dest_bitmap, x1, y1, x2, y2, value):
+    """bitmaptools.fill_region setting one pixel at a time."""
+    for row in range(y1, y2):
+        for column in range(x1, x2):
+            dest_bitmap[column, row] = value
+
+
+class FakeTime:
+    """
+    Time source for the widgets. sleep() returns at once and advances the virtual clock.
+    When record is set the real time of every call is kept so frame timing can be
+    measured, turn it off while tracing allocations.
+    """
+
+    def __init__(self, record=True):
+        self.virtual = 0.0
+        self.record = record
+        self.sleeps = []
+
+    def monotonic(self):
+        return time.perf_counter() + self.virtual
+
+    def monotonic_ns(self):
+        return time.perf_counter_ns() + int(self.virtual * 1000000000)
+
+    def sleep(self, seconds):
+        if self.record:
+            self.sleeps.append(time.perf_counter())
+        self.virtual += seconds
+
+
+def install():
+    """Add the fake displayio, bitmaptools, vectorio and cedargrove_palettefader modules."""
+    displayio = types.ModuleType("displayio")
+    displayio.Bitmap = Bitmap
+    displayio.Palette = Palette
+    displayio.OnDiskBitmap = OnDiskBitmap
+    displayio.TileGrid = TileGrid
+    displayio.Group = Group
+    sys.modules["displayio"] = displayio
+
+    bitmaptools = types.ModuleType("bitmaptools")
+    bitmaptools.blit = blit
+    bitmaptools.fill_region = fill_region
+    bitmaptools.readinto = readinto
+    sys.modules["bitmaptools"] = bitmaptools
+
+    vectorio = types.ModuleType("vectorio")
+    vectorio.Circle = Circle
+    sys.modules["vectorio"] = vectorio
+
+    palettefader_package = types.ModuleType("cedargrove_palettefader")
+    palettefader = types.ModuleType("cedargrove_palettefader.palettefader")
+    palettefader.PaletteFader = PaletteFader
+    palettefader_package.palettefader = palettefader
+    sys.modules["cedargrove_palettefader"] = palettefader_package
+    sys.modules["cedargrove_palettefader.palettefader"] = palettefader
@@ -0,0 +1,297 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Benchmarks for the flip digit widgets on CPython, using the fake displayio and time
+source from fakes.py. Measures construction time with and without dynamic fading,
+wall time per flip with and without FlipStats attached, frame to frame timing jitter
+and memory allocated per flip, for a single digit, one clock of 4 digits and 6 clocks
+of 24 digits in total, and the memory each digit of a 50 digit wall holds.
+
+Run from the repository root and save the results to compare later runs against:
+
+    python benchmarks/run_benchmarks.py --output benchmark_results.json
+    python benchmarks/run_benchmarks.py --compare benchmark_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import fakes
+
+fakes.install()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from displayio import Bitmap, Palette
+
+from adafruit_displayio_flipclock import flip_digit
+from adafruit_displayio_flipclock.flip_assets import FlipAssets
+from adafruit_displayio_flipclock.flip_clock import FlipClock
+from adafruit_displayio_flipclock.flip_digit import FlipDigit
+from adafruit_displayio_flipclock.flip_stats import FlipStats
+
+TILE_WIDTH = 48
+TILE_HEIGHT = 50
+FRAME_COUNT = 10
+PALETTE_COLORS = 216
+
+# number of digits in each case, and the number of clocks that make them up
+CASES = {"1_digit": 0, "4_digits": 1, "24_digits": 6}
+
+# number of digits sharing one set of assets in the wall memory case
+WALL_DIGITS = 50
+
+
+def make_assets() -> FlipAssets:
+    """Spritesheets the size the spritesheet generator makes by default."""
+    palette = Palette(PALETTE_COLORS)
+    for index in range(PALETTE_COLORS):
+        palette[index] = index * 0x010101
+    palette.make_transparent(0)
+    return FlipAssets(
+        Bitmap(TILE_WIDTH * 3, TILE_HEIGHT * 8, PALETTE_COLORS),
+        palette,
+        Bitmap(TILE_WIDTH * FRAME_COUNT, TILE_HEIGHT * 10, PALETTE_COLORS),
+        palette,
+        Bitmap(TILE_WIDTH * FRAME_COUNT, TILE_HEIGHT * 10, PALETTE_COLORS),
+        palette,
+        TILE_WIDTH,
+        TILE_HEIGHT,
+        anim_frame_count=FRAME_COUNT,
+    )
+
+
+def build(case: str, dynamic_fading: bool, assets: FlipAssets = None) -> list:
+    """
+    Create the widgets of a case. Returns the digits.
+
+    :param str case: A key of CASES
+    :param bool dynamic_fading: Whether the widgets use PaletteFaders
+    :param FlipAssets assets: The assets to create them from, new ones if None
+    """
+    if assets is None:
+        assets = make_assets()
+    if CASES[case] == 0:
+        return [FlipDigit.from_assets(assets, dynamic_fading=dynamic_fading)]
+    digits = []
+    for _ in range(CASES[case]):
+        clock = FlipClock.from_assets(assets, dynamic_fading=dynamic_fading)
+        digits.extend((clock.digit_0, clock.digit_1, clock.digit_2, clock.digit_3))
+    return digits
+
+
+def flip_all(digits: list, value: int) -> None:
+    """
+    Flip every digit to a new value.
+
+    :param list digits: The digits to flip
+    :param int value: The value to show
+    """
+    for digit in digits:
+        digit.value = value
+
+
+def measure_construction(case: str, dynamic_fading: bool, repeat: int) -> dict:
+    """
+    Time creating the widgets of a case, best and median of several runs. Each run
+    starts from new assets, so PaletteFaders are created every time.
+
+    :param str case: A key of CASES
+    :param bool dynamic_fading: Whether the widgets use PaletteFaders
+    :param int repeat: The number of times to create them
+    """
+    times = []
+    for _ in range(repeat):
+        assets = make_assets()
+        start = time.perf_counter()
+        build(case, dynamic_fading, assets)
+        times.append(time.perf_counter() - start)
+    return {"best_ms": min(times) * 1000, "median_ms": statistics.median(times) * 1000}
+
+
+def measure_flips(case: str, dynamic_fading: bool, flips: int, stats: bool = False) -> dict:
+    """
+    Time flipping every digit of a case, and the real time between the animation
+    frames of each flip.
+
+    :param str case: A key of CASES
+    :param bool dynamic_fading: Whether the widgets use PaletteFaders
+    :param int flips: The number of times to flip every digit
+    :param bool stats: Whether to attach a FlipStats to every digit
+    """
+    digits = build(case, dynamic_fading)
+    if stats:
+        shared_stats = FlipStats()
+        for digit in digits:
+            digit.stats = shared_stats
+    # one untimed flip to warm up
+    flip_all(digits, 9)
+    fake_time = flip_digit.time
+    flip_times = []
+    frame_times = []
+    for flip in range(flips):
+        fake_time.sleeps.clear()
+        start = time.perf_counter()
+        flip_all(digits, flip % 10)
+        flip_times.append((time.perf_counter() - start) / len(digits))
+        # the time spent between frames, which shifts every frame after it
+        frame_times.extend(
+            later - earlier for earlier, later in zip(fake_time.sleeps, fake_time.sleeps[1:])
+        )
+    return {
+        "flip_mean_us": statistics.mean(flip_times) * 1e6,
+        "flip_median_us": statistics.median(flip_times) * 1e6,
+        "flip_max_us": max(flip_times) * 1e6,
+        "frame_mean_us": statistics.mean(frame_times) * 1e6,
+        "frame_jitter_us": statistics.pstdev(frame_times) * 1e6,
+        "frame_max_us": max(frame_times) * 1e6,
+    }
+
+
+def measure_allocations(case: str, dynamic_fading: bool, flips: int) -> dict:
+    """
+    Trace the memory allocated while flipping every digit of a case. Reports the
+    number of memory blocks still held afterwards and the peak extra memory used,
+    per digit flip.
+
+    :param str case: A key of CASES
+    :param bool dynamic_fading: Whether the widgets use PaletteFaders
+    :param int flips: The number of times to flip every digit
+    """
+    digits = build(case, dynamic_fading)
+    # one flip first so that anything created on first use isn't counted
+    flip_all(digits, 9)
+    flip_digit.time.record = False
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    start_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    blocks = 0
+    for flip in range(flips):
+        flip_all(digits, flip % 10)
+    peak = tracemalloc.get_traced_memory()[1] - start_size
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    flip_digit.time.record = True
+
+    for stat in after.compare_to(before, "filename"):
+        if "tracemalloc" not in stat.traceback[0].filename:
+            blocks += stat.count_diff
+    total_flips = flips * len(digits)
+    return {
+        "retained_blocks_per_flip": blocks / total_flips,
+        "peak_bytes_per_flip": peak / total_flips,
+    }
+
+
+def measure_wall_memory(dynamic_fading: bool) -> dict:
+    """
+    Trace the memory held by the digits of a wall of WALL_DIGITS digits created from
+    the same assets. The assets and the config the digits share are created before
+    tracing starts, so only the memory each digit owns is counted.
+
+    :param bool dynamic_fading: Whether the widgets use PaletteFaders
+    """
+    assets = make_assets()
+    # the first digit creates the shared config
+    digits = [FlipDigit.from_assets(assets, dynamic_fading=dynamic_fading)]
+    tracemalloc.start()
+    start_size = tracemalloc.get_traced_memory()[0]
+    digits.extend(
+        FlipDigit.from_assets(assets, dynamic_fading=dynamic_fading) for _ in range(WALL_DIGITS - 1)
+    )
+    held = tracemalloc.get_traced_memory()[0] - start_size
+    tracemalloc.stop()
+    return {"bytes_per_digit": held / (WALL_DIGITS - 1)}
+
+
+def run(flips: int, repeat: int) -> dict:
+    """
+    Run every benchmark and collect the results.
+
+    :param int flips: The number of times to flip every digit
+    :param int repeat: The number of times to repeat construction
+    """
+    flip_digit.time = fakes.FakeTime()
+    results = {}
+    for case in CASES:
+        results[case] = {}
+        for dynamic_fading in (False, True):
+            key = "dynamic_fading" if dynamic_fading else "static_palettes"
+            results[case][key] = {
+                "construction": measure_construction(case, dynamic_fading, repeat),
+                "flip": measure_flips(case, dynamic_fading, flips),
+                "flip_with_stats": measure_flips(case, dynamic_fading, flips, stats=True),
+                "allocations": measure_allocations(case, dynamic_fading, flips),
+            }
+    wall = f"{WALL_DIGITS}_digit_wall"
+    results[wall] = {}
+    for dynamic_fading in (False, True):
+        key = "dynamic_fading" if dynamic_fading else "static_palettes"
+        results[wall][key] = {"memory": measure_wall_memory(dynamic_fading)}
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "flips": flips,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(previous: dict, current: dict, threshold: float) -> list:
+    """
+    List the measurements that changed by more than a threshold between two reports.
+
+    :param dict previous: The results of an earlier run
+    :param dict current: The results of this run
+    :param float threshold: The relative change to report, 0.1 for 10%
+    """
+    changes = []
+    for case, modes in current["results"].items():
+        for mode, groups in modes.items():
+            for group, measurements in groups.items():
+                earlier = previous["results"].get(case, {}).get(mode, {}).get(group, {})
+                for name, value in measurements.items():
+                    old = earlier.get(name)
+                    if old and abs(value - old) / old > threshold:
+                        changes.append(
+                            f"{case} {mode} {name}: {old:.3f} -> {value:.3f} "
+                            f"({(value - old) / old:+.0%})"
+                        )
+    return changes
+
+
+def main() -> None:
+    """Parse the command line, run the benchmarks and write the JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--flips", type=int, default=20, help="flips of every digit")
+    parser.add_argument("--repeat", type=int, default=5, help="constructions to time")
+    parser.add_argument("--output", help="JSON file to write, prints to stdout if not set")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="relative change reported by --compare"
+    )
+    args = parser.parse_args()
+
+    report = run(args.flips, args.repeat)
+    if args.compare:
+        with open(args.compare) as previous_file:
+            for change in compare(json.load(previous_file), report, args.threshold):
+                print(change, file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -85,10 +85,9 @@ flip_digit = FlipDigit(
     brighter_level=BRIGHTER_LEVEL,
     darker_level=DARKER_LEVEL,
     medium_level=MEDIUM_LEVEL,
+    scale=4,
 )
 
-flip_digit.scale = 4
-
 # position it in the center of the display
 flip_digit.anchor_point = (0.5, 0.5)
 flip_digit.anchored_position = (display.width // 2, display.height // 2)
@@ -7,13 +7,28 @@ Command line script to generate flip clock spritesheet Bitmap image files.
 
 """
 
+import json
 import math
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import numpy
 import typer
 from PIL import Image, ImageDraw, ImageFont
-from PIL.Image import Palette, Resampling, Transform
+from PIL.Image import Resampling, Transform
+from sheet_formats import (
+    RAW_SHEET_EXTENSION,
+    RLE_SHEET_EXTENSION,
+    IndexedBMPWriter,
+    IndexedRawWriter,
+    bits_per_pixel_for_colors,
+    dedupe_sheet_tiles,
+    dither_rgb565,
+    pack_atlas,
+    quantize_sheet,
+    rgb565_to_rgb,
+    write_raw_sheet,
+    write_rle_sheet,
+)
 
 DEFAULT_FONT = "LeagueSpartan-Regular.ttf"
 DEFAULT_FONT_SIZE = 44
@@ -23,6 +38,27 @@ FONT_COLOR = (255, 255, 255)
 PADDING_SIZE = 8
 TRANSPARENCY_COLOR = (0, 255, 0)
 CENTER_LINE_HEIGHT = 1  # px
+TRANSPARENT_INDEX = 0  # palette index of the transparency color in shared palettes
+MANIFEST_FILENAME = "flipclock_manifest.json"
+DIGIT_CHARACTERS = "0123456789"
+# character sets that can be chosen by name, matching adafruit_displayio_flipclock.charset
+CHARSETS = {
+    "digits": DIGIT_CHARACTERS,
+    "split-flap": " ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789.,:;-+/'&!?#@",
+}
+STATIC_SHEET_COLUMNS = 3
+# width of separator sprites, the gap FlipClock leaves between the pairs (COLON_SPACE)
+SEPARATOR_WIDTH = 12
+
+
+def separator_width(base_scale: int = 1) -> int:
+    """
+    The width of separator sprites for widgets that scale the sprites up, matching
+    colon_space() of the library's flip_clock module.
+
+    :param int base_scale: The factor the sprites will be scaled up by on the display
+    """
+    return max((SEPARATOR_WIDTH + base_scale // 2) // base_scale, 1)
 
 
 def find_coeffs(pa: Tuple, pb: Tuple) -> numpy.ndarray:
@@ -46,17 +82,20 @@ def find_coeffs(pa: Tuple, pb: Tuple) -> numpy.ndarray:
     return numpy.array(res).reshape(8)
 
 
-def find_top_half_coeffs_inputs_for_angle(img: Image.Image, angle: int) -> Tuple[List]:
+def find_top_half_coeffs_inputs_for_angle(
+    img: Image.Image, angle: int, widen: int = PADDING_SIZE
+) -> Tuple[List]:
     """
     Find the coefficient inputs for the top half of the image for a given angle.
 
     :param PIL.Image img: The image object representing the top half of the digit
     :param int angle: The angle in degrees (0-90) to generate the coefficients for
+    :param int widen: The number of pixels each side grows by when fully turned
 
     :returns Tuple of Lists of input points that can be passed to the
      find_coefficient() function.
     """
-    x_val = (angle * PADDING_SIZE) / 90
+    x_val = (angle * widen) / 90
     y_val = min((angle * (img.height)) / 90, img.height - 1)
 
     first_list = [
@@ -69,14 +108,17 @@ def find_top_half_coeffs_inputs_for_angle(img: Image.Image, angle: int) -> Tuple
     return first_list, second_list
 
 
-def find_bottom_half_coeffs_inputs_for_angle(img: Image.Image, angle: int) -> Tuple[List]:
+def find_bottom_half_coeffs_inputs_for_angle(
+    img: Image.Image, angle: int, widen: int = PADDING_SIZE
+) -> Tuple[List]:
     """
     Find the coefficient inputs for the bottom half of the image for a given angle.
 
     :param PIL.Image img: The image object representing the top half of the digit
     :param int angle: The angle in degrees (0-90) to generate the coefficients for.
+    :param int widen: The number of pixels each side grows by when fully turned
     """
-    x_val = ((90 - angle) * PADDING_SIZE) / 90
+    x_val = ((90 - angle) * widen) / 90
     y_val = min((angle * (img.height)) / 90, img.height - 1)
     # print(f"(x: {x_val}, y: {y_val})")
     first_list = [
@@ -125,6 +167,7 @@ def make_sprite(
     transparency_color: Tuple[int, int, int] = TRANSPARENCY_COLOR,
     text_y_offset: int = 0,
     center_line_color: Optional[Tuple[int, int, int]] = None,
+    antialias: bool = True,
 ) -> Image.Image:
     """
     Make a PIL Image object representing a single static digit (or character).
@@ -150,7 +193,8 @@ def make_sprite(
       Tuple containing RGB color values 0-255 for each color.
     :param tuple center_line_color: The color to draw the center horizontal line.
       None for no line.
-
+    :param bool antialias: Whether to smooth the edges of the text. Sprites meant to be
+      scaled up look sharper without it.
 
     :returns Image: The PIL Image object containing a single static character sprite.
     """
@@ -168,6 +212,8 @@ def make_sprite(
     inner_img = Image.new("RGBA", inner_image_size, color=transparency_color)
 
     inner_draw = ImageDraw.Draw(inner_img)
+    if not antialias:
+        inner_draw.fontmode = "1"
 
     inner_draw.rectangle(border_shape, outline=tile_color, fill=tile_color)
 
@@ -195,6 +241,159 @@ def make_sprite(
     return inner_img
 
 
+def make_separator_sprite(
+    character: str,
+    font_size: int = 44,
+    font: str = DEFAULT_FONT,
+    width: int = SEPARATOR_WIDTH,
+    height: int = TILE_HEIGHT,
+    text_color: Tuple[int, int, int] = FONT_COLOR,
+    transparency_color: Tuple[int, int, int] = TRANSPARENCY_COLOR,
+    text_y_offset: int = 0,
+) -> Image.Image:
+    """
+    Make a PIL Image object of a separator such as ":" to show between digits. Only the
+    character is drawn, without a tile behind it, and without smoothing so that every
+    pixel around it stays transparent.
+
+    :param str character: The separator character, or "" for a blank sprite
+    :param int font_size: The size to render the font on the the sprite
+    :param str font: The filename of the font to render the character in.
+    :param int width: The width in pixels of the sprite
+    :param int height: The height in pixels of the sprite
+    :param tuple text_color: The color of the separator.
+      Tuple containing RGB color values 0-255 for each color.
+    :param tuple transparency_color: The color to use for transparency.
+    :param int text_y_offset: Amount to shift the text placement verticaly.
+
+    :returns Image: The PIL Image object containing the separator sprite.
+    """
+    img = Image.new("RGBA", (width, height), color=transparency_color)
+    if character:
+        fnt = ImageFont.truetype(font, font_size)
+        draw = ImageDraw.Draw(img)
+        draw.fontmode = "1"
+        bbox = draw.textbbox((0, 0), character, font=fnt)
+        w, h = bbox[2], bbox[3]
+        draw.text(
+            (((width - w) // 2) + 1, ((height - h) // 2) + 1 + text_y_offset),
+            character,
+            fill=text_color,
+            font=fnt,
+        )
+    return img
+
+
+def make_separator_sheet(
+    separators: str,
+    static_indexed: Image.Image,
+    font_size: int = DEFAULT_FONT_SIZE,
+    font: str = DEFAULT_FONT,
+    width: int = SEPARATOR_WIDTH,
+    height: int = TILE_HEIGHT,
+    text_color: Tuple[int, int, int] = FONT_COLOR,
+    transparency_color: Tuple[int, int, int] = TRANSPARENCY_COLOR,
+    text_y_offset: int = 0,
+    palette_mode: str = "web",
+    raw_output: bool = False,
+    minimal_depth: bool = False,
+) -> dict:
+    """
+    Generate the sheet of separator sprites, each width pixels wide so it fits the gap
+    between the pairs of a clock, followed by a blank sprite that blinking separators
+    switch to. The sprites sit side by side, so the first row of tiles holds their top
+    halves and the second row their bottom halves. The sheet is mapped onto the static
+    sheet's palette so separators are shown with the static palette. Outputs the sheet
+    as "separator_sheet.bmp".
+
+    :param str separators: The separator characters, such as ":."
+    :param Image static_indexed: The converted static sheet, whose palette is used
+    :param int font_size: The size to render the font on the the sprites
+    :param str font: The filename of the font to render the characters in.
+    :param int width: The width in pixels of each sprite, see separator_width()
+    :param int height: The height in pixels of each sprite
+    :param tuple text_color: The color of the separators.
+    :param tuple transparency_color: The color to use for transparency.
+    :param int text_y_offset: Amount to shift the text placement verticaly.
+    :param str palette_mode: "web", "adaptive" or "rgb565", see quantize_sheet()
+    :param bool raw_output: Whether to save the sheet in the raw packed format.
+    :param bool minimal_depth: See save_sheet()
+
+    :returns dict: The manifest entry of the sheet
+    """
+    columns = len(separators) + 1
+    sheet_img = Image.new("RGBA", (width * columns, height), color=transparency_color)
+    for i, character in enumerate(list(separators) + [""]):
+        img = make_separator_sprite(
+            character,
+            font_size=font_size,
+            font=font,
+            width=width,
+            height=height,
+            text_color=text_color,
+            transparency_color=transparency_color,
+            text_y_offset=text_y_offset,
+        )
+        sheet_img.paste(img, (i * width, 0))
+
+    filename = sheet_filename("separator_sheet", raw_output)
+    indexed = quantize_sheet(sheet_img, palette_mode, palette_image=static_indexed)
+    save_sheet(indexed, filename, minimal_depth=minimal_depth)
+    return {
+        "file": filename,
+        "tile_width": width,
+        # top and bottom tile indexes of each separator, and of the blank sprite
+        "indexes": {character: [i, columns + i] for i, character in enumerate(separators)},
+        "blank_indexes": [columns - 1, 2 * columns - 1],
+    }
+
+
+def iter_angled_sprites(
+    img: Image.Image,
+    count: int = 10,
+    bottom_skew: bool = False,
+    widen: int = PADDING_SIZE,
+    resample: Resampling = Resampling.BICUBIC,
+):
+    """
+    Generate angled sprites from a static sprite image one at a time. Each frame is
+    yielded as soon as it has been warped so that callers can paste it into place
+    without holding the whole set in memory.
+
+    :param Image img: input static image
+    :param int count: number of animation frames to generate (default 10)
+    :param bool bottom_skew: Whether to render the bottom angle or top angled sprites
+    :param int widen: The number of pixels each side grows by when fully turned
+    :param Resampling resample: The PIL resampling filter used for warping
+
+    :returns Iterator[Image]: An iterator of Image objects containing the angled sprites.
+    """
+    angle_count_by = (90 // count) + 1
+    for _angle in range(0, 91, angle_count_by):
+        if bottom_skew:
+            coeffs = find_coeffs(*find_bottom_half_coeffs_inputs_for_angle(img, _angle + 1, widen))
+        else:  # top skew:
+            coeffs = find_coeffs(*find_top_half_coeffs_inputs_for_angle(img, _angle + 1, widen))
+
+        yield img.transform((img.width, img.height), Transform.PERSPECTIVE, coeffs, resample)
+
+
+def warp_options(base_scale: int = 1) -> dict:
+    """
+    The iter_angled_sprites() options for sprites rendered at a base size. Sprites widen by
+    the padding, those meant to be scaled up by an integer factor are warped without
+    smoothing and widen by a matching fraction of it. The widen value is recorded in the
+    manifest so frames synthesized on the device match.
+
+    :param int base_scale: The factor the sprites will be scaled up by on the display
+
+    :returns dict: Keyword arguments for iter_angled_sprites()
+    """
+    if base_scale == 1:
+        return {"widen": PADDING_SIZE}
+    return {"widen": max(PADDING_SIZE // base_scale, 1), "resample": Resampling.NEAREST}
+
+
 def make_angles_sprite_set(
     img: Image.Image, count: int = 10, bottom_skew: bool = False
 ) -> List[Image.Image]:
@@ -207,30 +406,188 @@ def make_angles_sprite_set(
 
     :returns List[Image]: A List of Image objects containing the angled sprites.
     """
-    angled_sprites = []
-    # test_sheet = Image.new('RGBA', (img.width * 5, img.height * 2), color=(0, 255, 0))
-    # test_sheet.save("before_anything.png")
+    return list(iter_angled_sprites(img, count, bottom_skew=bottom_skew))
 
-    angle_count_by = (90 // count) + 1
-    for _, _angle in enumerate(range(0, 91, angle_count_by)):
-        # print(f"angle: {_angle}")
-        if bottom_skew:
-            coeffs = find_coeffs(*find_bottom_half_coeffs_inputs_for_angle(img, _angle + 1))
-        else:  # top skew:
-            coeffs = find_coeffs(*find_top_half_coeffs_inputs_for_angle(img, _angle + 1))
 
-        this_angle_img = img.transform(
-            (img.width, img.height), Transform.PERSPECTIVE, coeffs, Resampling.BICUBIC
+def make_shared_palette(
+    static_sheet: Image.Image,
+    width: int = TILE_WIDTH,
+    height: int = TILE_HEIGHT,
+    animation_frames: int = 10,
+    palette_mode: str = "web",
+    max_colors: int = 16,
+    transparency_color: Tuple[int, int, int] = TRANSPARENCY_COLOR,
+    base_scale: int = 1,
+    sample_glyph: int = 8,
+    glyph_count: int = 10,
+) -> Image.Image:
+    """
+    Choose one palette to use for the static and both animation sprite sheets. The colors
+    are sampled from the static sheet and from the animation frames of a single digit,
+    which are warped from the same static sprites. In "rgb565" mode the palette is instead
+    the union of the colors every sheet is dithered to, see rgb565_sheet_colors(), so the
+    sheets keep exactly their dithered colors. Only the colors in use are kept, and the
+    transparency color is always placed at TRANSPARENT_INDEX so that a single
+    make_transparent() call covers every sheet.
+
+    :param Image static_sheet: RGBA Image object of the full static sprite sheet
+    :param int width: The width in pixels of each tile
+    :param int height: The height in pixels of each tile
+    :param int animation_frames: The number of frames to sample from the flip animations.
+    :param str palette_mode: "web", "adaptive" or "rgb565", see quantize_sheet()
+    :param int max_colors: The largest number of colors allowed in an adaptive palette.
+    :param tuple transparency_color: The color to use for transparency.
+      Tuple containing RGB color values 0-255 for each color.
+    :param int base_scale: The factor the sprites will be scaled up by, see warp_options()
+    :param int sample_glyph: The position in the static sheet of the sprite whose animation
+      frames are sampled.
+    :param int glyph_count: The number of sprites in the static sheet, all of their
+      animation frames are dithered in "rgb565" mode.
+
+    :returns Image: A palette ("P" mode) Image object to pass as palette_image
+    """
+    if palette_mode == "rgb565":
+        colors = [
+            rgb565_to_rgb(value)
+            for value in sorted(
+                rgb565_sheet_colors(
+                    static_sheet,
+                    width,
+                    height,
+                    animation_frames,
+                    transparency_color,
+                    base_scale,
+                    glyph_count,
+                )
+            )
+        ]
+        if len(colors) > 256:
+            raise ValueError(f"{len(colors)} RGB565 colors will not fit in a shared palette")
+    else:
+        colors = sample_palette_colors(
+            static_sheet,
+            width,
+            height,
+            animation_frames,
+            palette_mode,
+            max_colors,
+            transparency_color,
+            base_scale,
+            sample_glyph,
         )
 
-        # this_angle_img.save(f"test_out/top_half_inner_{_angle + 1}.png")
+    # move the color closest to the transparency color to the front
+    transparent = min(
+        colors, key=lambda color: sum((a - b) ** 2 for a, b in zip(color, transparency_color))
+    )
+    colors.remove(transparent)
+    colors.insert(TRANSPARENT_INDEX, tuple(transparency_color))
+
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette([value for color in colors for value in color])
+    return palette_image
+
+
+def sample_palette_colors(
+    static_sheet: Image.Image,
+    width: int,
+    height: int,
+    animation_frames: int,
+    palette_mode: str,
+    max_colors: int,
+    transparency_color: Tuple[int, int, int],
+    base_scale: int,
+    sample_glyph: int,
+) -> List[Tuple[int, int, int]]:
+    """
+    The colors of a palette chosen for the static sheet together with the animation frames
+    of one of its sprites. See make_shared_palette() for the parameters.
+
+    :returns List[Tuple[int, int, int]]: The RGB colors in use
+    """
+    column, row = sample_glyph % STATIC_SHEET_COLUMNS, sample_glyph // STATIC_SHEET_COLUMNS
+    sample_sprite = static_sheet.crop(
+        (column * width, row * height, (column + 1) * width, (row + 1) * height)
+    )
+    frames = list(
+        iter_angled_sprites(
+            get_top_half(sample_sprite), animation_frames, **warp_options(base_scale)
+        )
+    )
+    frames.extend(
+        iter_angled_sprites(
+            get_bottom_half(sample_sprite),
+            animation_frames,
+            bottom_skew=True,
+            **warp_options(base_scale),
+        )
+    )
+
+    sample = Image.new(
+        "RGBA",
+        (max(static_sheet.width, width * len(frames)), static_sheet.height + height // 2),
+        color=transparency_color,
+    )
+    sample.paste(static_sheet, (0, 0))
+    for i, frame in enumerate(frames):
+        sample.paste(frame, (i * width, static_sheet.height), frame)
+
+    indexed = quantize_sheet(sample, palette_mode, max_colors)
+    palette = indexed.getpalette()
+    return [tuple(palette[i * 3 : i * 3 + 3]) for _, i in indexed.getcolors()]
 
-        # coords = (((_ % 5) * img.width), ((_ // 5) * img.height))
-        # print(coords)
 
-        angled_sprites.append(this_angle_img)
+def rgb565_sheet_colors(
+    static_sheet: Image.Image,
+    width: int,
+    height: int,
+    animation_frames: int,
+    transparency_color: Tuple[int, int, int],
+    base_scale: int,
+    glyph_count: int,
+) -> Set[int]:
+    """
+    The RGB565 colors the static sheet and both animation sheets are dithered to. The
+    animation frames of every sprite are warped and dithered one row of the sheet at a
+    time, at the row they have in the sheet, so the colors are exactly those of the saved
+    sheets. See make_shared_palette() for the parameters.
+
+    :returns Set[int]: The RGB565 values in use
+    """
+    half_height = height // 2
+    colors = set(numpy.unique(dither_rgb565(static_sheet)).tolist())
+    for glyph in range(glyph_count):
+        column, row = glyph % STATIC_SHEET_COLUMNS, glyph // STATIC_SHEET_COLUMNS
+        sprite = static_sheet.crop(
+            (column * width, row * height, (column + 1) * width, (row + 1) * height)
+        )
+        for half, bottom_skew in ((get_top_half(sprite), False), (get_bottom_half(sprite), True)):
+            strip = Image.new(
+                "RGBA", (width * animation_frames, half_height), color=transparency_color
+            )
+            for frame, angled in enumerate(
+                iter_angled_sprites(
+                    half, animation_frames, bottom_skew=bottom_skew, **warp_options(base_scale)
+                )
+            ):
+                paste_sprite_to_sheet(strip, angled, frame, animation_frames, tile_width=width)
+            colors.update(numpy.unique(dither_rgb565(strip, glyph * half_height)).tolist())
+    return colors
+
+
+def whole_pages(rows: int, page_rows: Optional[int] = None) -> int:
+    """
+    The number of sprite rows in a sheet, rounded up to whole pages when it is split into
+    pages.
 
-    return angled_sprites
+    :param int rows: The number of rows of sprites
+    :param int page_rows: The number of rows on each page, or None for a single sheet
+
+    :returns int: The number of rows to make the sheet
+    """
+    if page_rows is None:
+        return rows
+    return math.ceil(rows / page_rows) * page_rows
 
 
 def make_static_sheet(
@@ -244,7 +601,17 @@ def make_static_sheet(
     transparency_color: Tuple[int, int, int] = TRANSPARENCY_COLOR,
     text_y_offset: int = 0,
     center_line_color: Optional[Tuple[int, int, int]] = None,
-) -> None:
+    palette_mode: str = "web",
+    max_colors: int = 16,
+    shared_palette: bool = False,
+    animation_frames: int = 10,
+    manifest: Optional[dict] = None,
+    raw_output: bool = False,
+    base_scale: int = 1,
+    characters: str = DIGIT_CHARACTERS,
+    page_glyphs: Optional[int] = None,
+    separators: str = "",
+) -> Optional[Image.Image]:
     """
     Generate the spritesheet of static digit images. Outputs static sprite sheet
     file as "static_sheet.bmp"
@@ -267,13 +634,41 @@ def make_static_sheet(
       Tuple containing RGB color values 0-255 for each color.
     :param int text_y_offset: Amount to shift the text placement verticaly.
       Positive numbers move it down, negative move it up.
-
+    :param str palette_mode: "web" to convert with the 216 color web palette, "adaptive"
+      to choose a palette from the colors used, or "rgb565" to dither to the colors an RGB565
+      display shows. Other than "web" the sheet is saved with the smallest bit depth that fits.
+    :param int max_colors: The largest number of colors allowed in an adaptive palette.
+    :param bool shared_palette: Whether to choose one palette that also covers the animation
+      sheets, with the transparency color at TRANSPARENT_INDEX. The static sheet is saved with
+      it and it is returned to be passed along to make_animations_sheets().
+    :param int animation_frames: The number of animation frames sampled when choosing a
+      shared palette.
+    :param dict manifest: Optional dictionary to fill in with the description of the sheet
+      for write_manifest().
+    :param bool raw_output: Whether to save the sheet in the raw packed format as
+      "static_sheet.fcb" instead of as a BMP file.
+    :param int base_scale: The integer factor the widgets will scale the sprites up by.
+      Above 1 the text is drawn without smoothing so it stays sharp when scaled, and the
+      factor is added to the manifest. The sizes passed in are the base sizes.
+    :param str characters: The characters to make sprites of, in order.
+    :param int page_glyphs: None to save a single sheet. Otherwise the sheet is split into
+      pages of at least this many sprites, rounded up to whole rows, saved as numbered files.
+    :param str separators: Characters such as ":" to show between digits. They are
+      saved in a separate sheet of narrow sprites, see make_separator_sheet().
+
+    :returns Optional[Image]: The shared palette Image object if shared_palette is True.
     """
-    full_sheet_img = Image.new("RGBA", (width * 3, height * 4), color=transparency_color)
+    page_rows = None
+    if page_glyphs is not None:
+        page_rows = math.ceil(page_glyphs / STATIC_SHEET_COLUMNS)
+    rows = whole_pages(math.ceil(len(characters) / STATIC_SHEET_COLUMNS), page_rows)
+    full_sheet_img = Image.new(
+        "RGBA", (width * STATIC_SHEET_COLUMNS, height * rows), color=transparency_color
+    )
 
-    for i in range(10):
+    for i, character in enumerate(characters):
         img = make_sprite(
-            f"{i}",
+            character,
             font_size=font_size,
             font=font,
             padding=padding,
@@ -283,18 +678,108 @@ def make_static_sheet(
             tile_color=tile_color,
             text_y_offset=text_y_offset,
             center_line_color=center_line_color,
+            antialias=base_scale == 1,
         )
         # img.save(f'char_sprites/pil_text_{i}.png')
-        coords = (((i % 3) * width), ((i // 3) * height))
+        coords = (((i % STATIC_SHEET_COLUMNS) * width), ((i // STATIC_SHEET_COLUMNS) * height))
         # print(coords)
         full_sheet_img.paste(img, coords)
 
-    # img = make_sprite(":", font_size=font_size)
-    # coords = (((10 % 3) * TILE_WIDTH), ((10 // 3) * TILE_HEIGHT))
-    # full_sheet_img.paste(img, coords)
+    palette_image = None
+    if shared_palette:
+        palette_image = make_shared_palette(
+            full_sheet_img,
+            width,
+            height,
+            animation_frames=animation_frames,
+            palette_mode=palette_mode,
+            max_colors=max_colors,
+            transparency_color=transparency_color,
+            base_scale=base_scale,
+            sample_glyph=min(8, len(characters) - 1),
+            glyph_count=len(characters),
+        )
+
+    filename = sheet_filename("static_sheet", raw_output)
+    indexed = quantize_sheet(full_sheet_img, palette_mode, max_colors, palette_image)
+    minimal_depth = palette_mode != "web" or shared_palette
+    if page_glyphs is None:
+        save_sheet(indexed, filename, minimal_depth=minimal_depth)
+        files = {"file": filename}
+    else:
+        files = {
+            "pages": save_sheet_pages(
+                indexed, "static_sheet", page_rows * height, raw_output, minimal_depth
+            )
+        }
+
+    separator_sheet = None
+    if separators:
+        separator_sheet = make_separator_sheet(
+            separators,
+            indexed,
+            font_size=font_size,
+            font=font,
+            width=separator_width(base_scale),
+            height=height,
+            text_color=text_color,
+            transparency_color=transparency_color,
+            text_y_offset=text_y_offset,
+            palette_mode=palette_mode,
+            raw_output=raw_output,
+            minimal_depth=minimal_depth,
+        )
+
+    if manifest is not None:
+        if separator_sheet is not None:
+            manifest["separators"] = separator_sheet
+        # each sprite is split into a top and a bottom half tile, so a row of sprites
+        # holds a row of top half tiles followed by a row of bottom half tiles
+        manifest["tile_width"] = width
+        manifest["tile_height"] = height // 2
+        manifest["scale"] = base_scale
+        manifest["shared_palette"] = shared_palette
+        manifest["static"] = {
+            **files,
+            "transparent_indexes": find_transparent_indexes(
+                indexed,
+                transparency_color,
+                opaque_sprite_colors(tile_color, text_color, center_line_color),
+            ),
+            "top_indexes": [
+                (i // STATIC_SHEET_COLUMNS) * 2 * STATIC_SHEET_COLUMNS + i % STATIC_SHEET_COLUMNS
+                for i in range(len(characters))
+            ],
+            "bottom_indexes": [
+                (i // STATIC_SHEET_COLUMNS) * 2 * STATIC_SHEET_COLUMNS
+                + i % STATIC_SHEET_COLUMNS
+                + STATIC_SHEET_COLUMNS
+                for i in range(len(characters))
+            ],
+        }
+        if characters != DIGIT_CHARACTERS:
+            manifest["charset"] = characters
+    return palette_image
+
+
+def paste_sprite_to_sheet(
+    sheet: Image.Image,
+    image: Image.Image,
+    index: int,
+    width: int,
+    tile_width: int = TILE_WIDTH,
+) -> None:
+    """
+    Paste a single sprite into its slot within an already allocated sprite sheet.
 
-    full_sheet_img = full_sheet_img.convert(mode="P", palette=Palette.WEB)
-    full_sheet_img.save("static_sheet.bmp")
+    :param Image sheet: The sprite sheet Image object to paste into
+    :param Image image: The sprite Image object to paste
+    :param int index: The sprite index within the sheet, counting left to right, top to bottom
+    :param int width: The number of sprites in each row
+    :param int tile_width: The width in pixels of each tile that will be in the sheet.
+    """
+    coords = (((index % width) * tile_width), ((index // width) * image.height))
+    sheet.paste(image, coords, image)
 
 
 def pack_images_to_sheet(
@@ -320,20 +805,214 @@ def pack_images_to_sheet(
 
     _img_width = images[0].width
     _img_height = images[0].height
-    # print(f"len: {len(images)} width:{width} img_w:{_img_width} img_h:{_img_height}")
     _sheet_img = Image.new(
         "RGBA", (_img_width * width, _img_height * row_count), color=transparency_color
     )
-    # _sheet_img.save("before_things.bmp")
     for i, image in enumerate(images):
-        coords = (((i % width) * tile_width), ((i // width) * image.height))
-        # print(coords)
-        _sheet_img.paste(image, coords, image)
-        # image.save(f"test_out/img_{i}.png")
+        paste_sprite_to_sheet(_sheet_img, image, i, width, tile_width=tile_width)
 
     return _sheet_img
 
 
+def sheet_filename(name: str, raw_output: bool = False, rle: bool = False) -> str:
+    """
+    Add the file name extension for the chosen output format to a sheet name.
+
+    :param str name: The name of the sheet without an extension
+    :param bool raw_output: Whether the sheet is saved in the raw packed format
+    :param bool rle: Whether the sheet is saved run length encoded
+    """
+    if rle:
+        return name + RLE_SHEET_EXTENSION
+    if raw_output:
+        return name + RAW_SHEET_EXTENSION
+    return name + ".bmp"
+
+
+def save_sheet(indexed: Image.Image, filename: str, minimal_depth: bool = False) -> None:
+    """
+    Save a converted sprite sheet as a BMP file, or in the raw packed format if the
+    filename ends with RAW_SHEET_EXTENSION.
+
+    :param Image indexed: The palette ("P" mode) Image object to save
+    :param str filename: The name of the file to create
+    :param bool minimal_depth: Whether to write the file with the smallest bit depth that can
+      hold the palette. Used for adaptive and shared palettes. Raw files always are.
+    """
+    if filename.endswith(RAW_SHEET_EXTENSION):
+        write_raw_sheet(indexed, filename)
+    elif minimal_depth:
+        palette = indexed.getpalette()
+        bits_per_pixel = bits_per_pixel_for_colors(len(palette) // 3)
+        with IndexedBMPWriter(
+            filename, indexed.width, indexed.height, palette, bits_per_pixel
+        ) as writer:
+            writer.write_strip(indexed, 0)
+        print(f"{filename}: {len(palette) // 3} colors, {bits_per_pixel} bits per pixel")
+    else:
+        indexed.save(filename)
+
+
+def save_sheet_pages(
+    indexed: Image.Image,
+    name: str,
+    page_height: int,
+    raw_output: bool = False,
+    minimal_depth: bool = False,
+) -> List[str]:
+    """
+    Split a converted sprite sheet into pages of equal height and save each one with
+    save_sheet(). All the pages keep the palette of the full sheet.
+
+    :param Image indexed: The palette ("P" mode) Image object to split, a whole number of
+      pages high
+    :param str name: The sheet name, the files are named with the page number added
+    :param int page_height: The height in pixels of each page
+    :param bool raw_output: Whether to save the pages in the raw packed format
+    :param bool minimal_depth: See save_sheet()
+
+    :returns List[str]: The names of the page files in order
+    """
+    filenames = []
+    for page, top in enumerate(range(0, indexed.height, page_height)):
+        filename = sheet_filename(f"{name}_{page}", raw_output)
+        save_sheet(
+            indexed.crop((0, top, indexed.width, top + page_height)), filename, minimal_depth
+        )
+        filenames.append(filename)
+    print(f"{name}: {len(filenames)} pages")
+    return filenames
+
+
+def stream_sheet_row(
+    writers: Dict[str, Tuple[IndexedBMPWriter, Image.Image]],
+    filename: str,
+    row: Image.Image,
+    y: int,
+    sheet_size: Tuple[int, int],
+    palette_mode: str = "web",
+    max_colors: int = 16,
+    palette_image: Optional[Image.Image] = None,
+) -> None:
+    """
+    Convert one RGBA row of sprites and write it into its place in a streamed sheet file.
+    The first row written to each file chooses the palette for the whole sheet, later rows
+    are mapped onto it, unless a palette_image is given to use for every row. Every row is
+    mapped the same way, so in "web" mode the rows are not dithered: the dithering of a
+    full sheet carries over from row to row, which a row on its own can't. Streamed web
+    sheets therefore differ from full ones in the antialiased pixels, the other modes
+    don't dither and give the same sheets.
+
+    :param dict writers: Open writers and their palette Image objects, keyed by filename.
+      New writers are added to it as needed.
+    :param str filename: The name of the file the row belongs to, a BMP file or a raw
+      packed one if it ends with RAW_SHEET_EXTENSION
+    :param Image row: RGBA Image object the full width of the sheet
+    :param int y: The row in the sheet where the top of this row of sprites goes
+    :param tuple sheet_size: The full width and height of the sheet in pixels
+    :param str palette_mode: "web", "adaptive" or "rgb565", see quantize_sheet()
+    :param int max_colors: The largest number of colors allowed in an adaptive palette.
+    :param Image palette_image: A shared palette Image object to map every row onto.
+    """
+    entry = writers.get(filename)
+    if entry is None:
+        raw_output = filename.endswith(RAW_SHEET_EXTENSION)
+        minimal_depth = palette_mode != "web" or palette_image is not None or raw_output
+        if palette_mode == "web" and palette_image is None:
+            # only take the web palette from the first row, it is mapped like the others
+            palette_image = quantize_sheet(row, palette_mode)
+        indexed = quantize_sheet(row, palette_mode, max_colors, palette_image, y)
+        palette = indexed.getpalette()
+        bits_per_pixel = 8
+        if minimal_depth:
+            bits_per_pixel = bits_per_pixel_for_colors(len(palette) // 3)
+        writer_class = IndexedRawWriter if raw_output else IndexedBMPWriter
+        writer = writer_class(filename, *sheet_size, palette=palette, bits_per_pixel=bits_per_pixel)
+        writers[filename] = (writer, indexed)
+    else:
+        writer, palette_image = entry
+        indexed = quantize_sheet(row, palette_mode, palette_image=palette_image, origin_y=y)
+    writer.write_strip(indexed, y)
+
+
+def find_transparent_index(
+    indexed: Image.Image, transparency_color: Tuple[int, int, int] = TRANSPARENCY_COLOR
+) -> int:
+    """
+    Find the palette index closest to the transparency color in a converted image.
+
+    :param Image indexed: The palette ("P" mode) Image object
+    :param tuple transparency_color: The color used for transparency.
+      Tuple containing RGB color values 0-255 for each color.
+
+    :returns int: The palette index of the transparency color
+    """
+    palette = indexed.getpalette()
+    return min(
+        range(len(palette) // 3),
+        key=lambda i: sum(
+            (a - b) ** 2 for a, b in zip(palette[i * 3 : i * 3 + 3], transparency_color)
+        ),
+    )
+
+
+def opaque_sprite_colors(
+    tile_color: Tuple[int, int, int] = TILE_COLOR,
+    text_color: Tuple[int, int, int] = FONT_COLOR,
+    center_line_color: Optional[Tuple[int, int, int]] = None,
+) -> Tuple[Tuple[int, int, int], ...]:
+    """
+    Collect the colors drawn on the sprites, leaving out the center line if it is disabled.
+
+    :param tuple tile_color: The color of the tile the digit is on.
+    :param tuple text_color: The color of the digit text in each tile.
+    :param tuple center_line_color: The color of the center horizontal line, or None.
+
+    :returns tuple: The opaque colors
+    """
+    return tuple(
+        color
+        for color in (tile_color, text_color, center_line_color)
+        if color and None not in color
+    )
+
+
+def find_transparent_indexes(
+    indexed: Image.Image,
+    transparency_color: Tuple[int, int, int] = TRANSPARENCY_COLOR,
+    opaque_colors: Tuple[Tuple[int, int, int], ...] = (TILE_COLOR, FONT_COLOR),
+) -> List[int]:
+    """
+    Find every palette index that should be made transparent. Besides the transparency
+    color itself this includes the blended edge colors that are closer to it than to any
+    of the opaque sprite colors.
+
+    :param Image indexed: The palette ("P" mode) Image object
+    :param tuple transparency_color: The color used for transparency.
+      Tuple containing RGB color values 0-255 for each color.
+    :param tuple opaque_colors: The colors drawn on the sprites.
+
+    :returns List[int]: The palette indexes to make transparent
+    """
+    palette = numpy.array(indexed.getpalette(), dtype=int).reshape(-1, 3)
+    targets = numpy.array([transparency_color, *opaque_colors], dtype=int)
+    distances = ((palette[:, numpy.newaxis, :] - targets[numpy.newaxis, :, :]) ** 2).sum(axis=2)
+    return [int(i) for i in numpy.flatnonzero(distances.argmin(axis=1) == 0)]
+
+
+def write_manifest(manifest: dict, filename: str = MANIFEST_FILENAME) -> None:
+    """
+    Write the manifest describing the generated sprite sheets. FlipDigit.from_manifest() and
+    FlipClock.from_manifest() load it along with the sheets it lists.
+
+    :param dict manifest: The manifest filled in by make_static_sheet() and
+      make_animations_sheets()
+    :param str filename: The name of the JSON file to create
+    """
+    with open(filename, "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+
+
 def make_animations_sheets(
     font_size: int = DEFAULT_FONT_SIZE,
     font: str = DEFAULT_FONT,
@@ -346,6 +1025,18 @@ def make_animations_sheets(
     animation_frames: int = 10,
     text_y_offset: int = 0,
     center_line_color: Optional[Tuple[int, int, int]] = None,
+    stream_rows: bool = False,
+    palette_mode: str = "web",
+    max_colors: int = 16,
+    palette_image: Optional[Image.Image] = None,
+    dedupe_tolerance: Optional[int] = None,
+    atlas: bool = False,
+    manifest: Optional[dict] = None,
+    raw_output: bool = False,
+    rle: bool = False,
+    base_scale: int = 1,
+    characters: str = DIGIT_CHARACTERS,
+    page_glyphs: Optional[int] = None,
 ) -> None:
     """
     Generate and save the top and bottom animation sprite sheets for the digits 0-9.
@@ -370,13 +1061,61 @@ def make_animations_sheets(
     :param animation_frames: The number of frames to use for the flip animations.
     :param int text_y_offset: Amount to shift the text placement verticaly.
       Positive numbers move it down, negative move it up.
+    :param bool stream_rows: Whether to write the sheets to disk one row of sprites at a time
+      instead of assembling the full sheets in memory first. Lowers peak memory use for large
+      tiles and high frame counts. The palette for streamed sheets is chosen from the first
+      row and later rows are mapped onto it, web palette sheets are not dithered. See
+      stream_sheet_row().
+    :param str palette_mode: "web" to convert with the 216 color web palette, "adaptive"
+      to choose a palette from the colors used, or "rgb565" to dither to the colors an RGB565
+      display shows. Other than "web" the sheet is saved with the smallest bit depth that fits.
+    :param int max_colors: The largest number of colors allowed in an adaptive palette.
+    :param Image palette_image: A shared palette Image object, as returned by
+      make_static_sheet(), to convert both sheets with instead of choosing their own.
+    :param int dedupe_tolerance: None to keep every frame. Otherwise duplicate frames are
+      removed from the sheets and the number of pixels that may differ between frames that
+      are merged. The maps from frame index to tile index are added to the manifest.
+      Not supported together with stream_rows.
+    :param bool atlas: Whether to trim the transparent padding from every frame and pack the
+      frames tightly instead of in a grid of tiles. The position, size and offset of each
+      frame are added to the manifest. Not supported together with stream_rows.
+    :param dict manifest: Optional dictionary to fill in with the description of the sheets
+      for write_manifest().
+    :param bool raw_output: Whether to save the sheets in the raw packed format.
+    :param bool rle: Whether to save the sheets run length encoded. Frames are then decoded
+      one at a time on the device instead of keeping the full sheets in memory. Not supported
+      together with stream_rows or atlas.
+    :param int base_scale: The integer factor the widgets will scale the sprites up by, see
+      make_static_sheet() and warp_options().
+    :param str characters: The characters to make animations of, in order. Each one takes
+      a row of the sheets.
+    :param int page_glyphs: None to save single sheets. Otherwise the sheets are split into
+      pages holding the animations of this many characters, saved as numbered files. Not
+      supported together with stream_rows, dedupe_tolerance, atlas or rle.
     """
-    bottom_sprites = []
-    top_sprites = []
+    if manifest is None:
+        manifest = {}
+    if stream_rows and (dedupe_tolerance is not None or atlas or rle):
+        raise ValueError(
+            "Deduplicating frames, atlases and RLE are not supported when streaming rows"
+        )
+    if rle and atlas:
+        raise ValueError("RLE sheets can't also be atlases")
+    if page_glyphs is not None and (stream_rows or dedupe_tolerance is not None or atlas or rle):
+        raise ValueError("Pages are only supported for plain tiled sheets")
 
-    for i in range(10):
+    half_height = height // 2
+    sheet_size = (width * animation_frames, half_height * whole_pages(len(characters), page_glyphs))
+
+    if stream_rows:
+        writers = {}
+    else:
+        bottom_sheet = Image.new("RGBA", sheet_size, color=transparency_color)
+        top_sheet = Image.new("RGBA", sheet_size, color=transparency_color)
+
+    for i, character in enumerate(characters):
         img = make_sprite(
-            f"{i}",
+            character,
             font_size=font_size,
             font=font,
             padding=padding,
@@ -386,38 +1125,129 @@ def make_animations_sheets(
             tile_color=tile_color,
             text_y_offset=text_y_offset,
             center_line_color=center_line_color,
+            antialias=base_scale == 1,
         )
 
         top_half = get_top_half(img)
         bottom_half = get_bottom_half(img)
 
-        bottom_angled_sprites = make_angles_sprite_set(
-            bottom_half, animation_frames, bottom_skew=True
-        )
-        top_angled_sprites = make_angles_sprite_set(top_half, animation_frames, bottom_skew=False)
-
-        bottom_sprites.extend(bottom_angled_sprites)
-        top_sprites.extend(top_angled_sprites)
-
-    bottom_sheet = pack_images_to_sheet(
-        images=bottom_sprites,
-        width=animation_frames,
-        transparency_color=transparency_color,
-        tile_width=width,
-    )
-    # bottom_sheet.save("test_bottom_sheet.png")
-
-    bottom_sheet = bottom_sheet.convert(mode="P", palette=Palette.WEB)
-    bottom_sheet.save("bottom_animation_sheet.bmp")
-
-    top_sheet = pack_images_to_sheet(
-        images=top_sprites,
-        width=animation_frames,
-        tile_width=width,
-        transparency_color=transparency_color,
-    )
-    top_sheet = top_sheet.convert(mode="P", palette=Palette.WEB)
-    top_sheet.save("top_animation_sheet.bmp")
+        if stream_rows:
+            # only a single row of the sheets is held in memory at a time
+            bottom_row = Image.new("RGBA", (sheet_size[0], half_height), color=transparency_color)
+            top_row = Image.new("RGBA", (sheet_size[0], half_height), color=transparency_color)
+            first_index = 0
+        else:
+            bottom_row = bottom_sheet
+            top_row = top_sheet
+            first_index = i * animation_frames
+
+        for frame, sprite in enumerate(
+            iter_angled_sprites(
+                bottom_half, animation_frames, bottom_skew=True, **warp_options(base_scale)
+            )
+        ):
+            paste_sprite_to_sheet(
+                bottom_row, sprite, first_index + frame, animation_frames, tile_width=width
+            )
+        for frame, sprite in enumerate(
+            iter_angled_sprites(
+                top_half, animation_frames, bottom_skew=False, **warp_options(base_scale)
+            )
+        ):
+            paste_sprite_to_sheet(
+                top_row, sprite, first_index + frame, animation_frames, tile_width=width
+            )
+
+        if stream_rows:
+            stream_sheet_row(
+                writers,
+                sheet_filename("bottom_animation_sheet", raw_output),
+                bottom_row,
+                i * half_height,
+                sheet_size,
+                palette_mode,
+                max_colors,
+                palette_image,
+            )
+            stream_sheet_row(
+                writers,
+                sheet_filename("top_animation_sheet", raw_output),
+                top_row,
+                i * half_height,
+                sheet_size,
+                palette_mode,
+                max_colors,
+                palette_image,
+            )
+
+    manifest["frame_count"] = animation_frames
+    manifest["widen"] = warp_options(base_scale)["widen"]
+
+    if stream_rows:
+        for filename, (writer, row_palette_image) in writers.items():
+            writer.close()
+            manifest[filename.split("_", 1)[0]] = {
+                "file": filename,
+                "transparent_indexes": find_transparent_indexes(
+                    row_palette_image,
+                    transparency_color,
+                    opaque_sprite_colors(tile_color, text_color, center_line_color),
+                ),
+            }
+        return
+
+    minimal_depth = palette_mode != "web" or palette_image is not None
+
+    for name, sheet in (("bottom", bottom_sheet), ("top", top_sheet)):
+        indexed = quantize_sheet(sheet, palette_mode, max_colors, palette_image)
+        entry = manifest[name] = {
+            "file": sheet_filename(f"{name}_animation_sheet", raw_output, rle),
+            "transparent_indexes": find_transparent_indexes(
+                indexed,
+                transparency_color,
+                opaque_sprite_colors(tile_color, text_color, center_line_color),
+            ),
+        }
+        if dedupe_tolerance is not None:
+            indexed, entry["frame_map"] = dedupe_sheet_tiles(
+                indexed, width, half_height, animation_frames, dedupe_tolerance
+            )
+            print(f"{name} animation sheet: {len(set(entry['frame_map']))} unique frames")
+        if atlas:
+            # atlas frames are listed per animation frame, so no frame map is needed
+            entry["atlas"] = {
+                "transparent_index": find_transparent_index(indexed, transparency_color)
+            }
+            indexed, entry["atlas"]["frames"] = pack_atlas(
+                indexed,
+                width,
+                half_height,
+                animation_frames,
+                entry["atlas"]["transparent_index"],
+                entry.pop("frame_map", None),
+            )
+            print(f"{name} animation atlas: {indexed.width}x{indexed.height} pixels")
+        if rle:
+            # RLE frames are listed per animation frame, so no frame map is needed
+            write_rle_sheet(
+                indexed,
+                entry["file"],
+                width,
+                half_height,
+                animation_frames,
+                entry.pop("frame_map", None),
+            )
+        elif page_glyphs is not None:
+            entry["pages"] = save_sheet_pages(
+                indexed,
+                f"{name}_animation_sheet",
+                page_glyphs * half_height,
+                raw_output,
+                minimal_depth,
+            )
+            del entry["file"]
+        else:
+            save_sheet(indexed, entry["file"], minimal_depth)
 
 
 def main(
@@ -432,9 +1262,32 @@ def main(
     animation_frames: int = 10,
     text_y_offset: int = 0,
     center_line_color: Optional[Tuple[int, int, int]] = typer.Option((None, None, None)),
+    stream_rows: bool = False,
+    palette_mode: str = "web",
+    max_colors: int = 16,
+    shared_palette: bool = False,
+    dedupe_tolerance: Optional[int] = None,
+    atlas: bool = False,
+    raw_output: bool = False,
+    rle: bool = False,
+    base_scale: int = 1,
+    charset: str = "digits",
+    page_glyphs: Optional[int] = None,
+    separators: str = "",
 ) -> None:
     # print(center_line_color)
-    make_static_sheet(
+    # a character set name from CHARSETS, or the characters themselves
+    characters = CHARSETS.get(charset, charset)
+    if base_scale > 1:
+        # render at the base size, the widgets scale it back up to the requested size
+        width //= base_scale
+        height = height // base_scale // 2 * 2
+        padding = max(padding // base_scale, 1)
+        font_size //= base_scale
+        text_y_offset //= base_scale
+        print(f"Base size {width}x{height}, scale by {base_scale} on the display")
+    manifest = {}
+    palette_image = make_static_sheet(
         font_size=font_size,
         font=font,
         padding=padding,
@@ -445,6 +1298,16 @@ def main(
         transparency_color=transparent_color,
         text_y_offset=text_y_offset,
         center_line_color=center_line_color,
+        palette_mode=palette_mode,
+        max_colors=max_colors,
+        shared_palette=shared_palette,
+        animation_frames=animation_frames,
+        manifest=manifest,
+        raw_output=raw_output,
+        base_scale=base_scale,
+        characters=characters,
+        page_glyphs=page_glyphs,
+        separators=separators,
     )
 
     make_animations_sheets(
@@ -459,7 +1322,23 @@ def main(
         animation_frames=animation_frames,
         text_y_offset=text_y_offset,
         center_line_color=center_line_color,
+        stream_rows=stream_rows,
+        palette_mode=palette_mode,
+        max_colors=max_colors,
+        palette_image=palette_image,
+        dedupe_tolerance=dedupe_tolerance,
+        atlas=atlas,
+        manifest=manifest,
+        raw_output=raw_output,
+        rle=rle,
+        base_scale=base_scale,
+        characters=characters,
+        page_glyphs=page_glyphs,
     )
+    write_manifest(manifest)
+
+    if palette_image is not None:
+        print(f"All sheets share one palette, transparent index: {TRANSPARENT_INDEX}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,627 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Sheet file formats written by make_sprites_flip_animations.py: palette conversion and
+dithering, indexed BMP and raw packed writers, run length encoding and atlas packing.
+Kept apart from the command line script so they can be imported and tested on their own.
+"""
+
+import math
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy
+from PIL import Image
+from PIL.Image import Dither, Palette
+
+PALETTE_MODES = ("web", "adaptive", "rgb565")
+BITS_PER_PIXEL_OPTIONS = (1, 2, 4, 8)
+RAW_SHEET_EXTENSION = ".fcb"
+RAW_SHEET_MAGIC = b"FCBM"
+RAW_SHEET_VERSION = 1
+RLE_SHEET_EXTENSION = ".fcr"
+RLE_SHEET_MAGIC = b"FCRL"
+RLE_SHEET_VERSION = 1
+RLE_MAX_PACKET = 128  # longest run or literal sequence in one packet
+ATLAS_VALUES_PER_FRAME = 6  # x, y, width, height, x offset, y offset
+RGB565_LEVELS = (31, 63, 31)  # highest red, green and blue value in RGB565
+# 4x4 ordered dithering thresholds
+BAYER_MATRIX = numpy.array([[0, 8, 2, 10], [12, 4, 14, 6], [3, 11, 1, 9], [15, 7, 13, 5]])
+
+
+def bits_per_pixel_for_colors(colors: int) -> int:
+    """
+    Find the smallest bit depth supported by displayio Bitmaps that can hold
+    the given number of palette colors.
+
+    :param int colors: The number of colors in the palette
+
+    :returns int: The number of bits per pixel, one of 1, 2, 4, or 8
+    """
+    for bits in BITS_PER_PIXEL_OPTIONS:
+        if colors <= 1 << bits:
+            return bits
+    raise ValueError(f"{colors} colors will not fit in an indexed BMP")
+
+
+def dither_rgb565(img: Image.Image, origin_y: int = 0) -> numpy.ndarray:
+    """
+    Reduce an image to the colors an RGB565 display can show, using ordered dithering for
+    colors in between. Colors the display can already show exactly are left as they are,
+    so flat areas such as the transparency color are never dithered.
+
+    :param Image img: The RGBA or RGB Image object to reduce
+    :param int origin_y: The row of the full sheet that the top of img is at, so strips of
+      a sheet are dithered exactly as the whole sheet would be
+
+    :returns numpy.ndarray: Array of RGB565 values, one per pixel
+    """
+    pixels = numpy.asarray(img.convert(mode="RGB"), dtype=numpy.float64)
+    height, width = pixels.shape[:2]
+    thresholds = (BAYER_MATRIX + 0.5) / 16
+    first_row = origin_y % 4
+    thresholds = numpy.tile(thresholds, (height // 4 + 2, width // 4 + 1))[
+        first_row : first_row + height, :width
+    ]
+
+    packed = numpy.zeros((height, width), dtype=numpy.uint16)
+    for channel, levels in enumerate(RGB565_LEVELS):
+        scaled = pixels[:, :, channel] * levels / 255
+        nearest = numpy.rint(scaled)
+        exact = numpy.rint(nearest * 255 / levels) == pixels[:, :, channel]
+        dithered = numpy.clip(numpy.floor(scaled + thresholds), 0, levels)
+        value = numpy.where(exact, nearest, dithered).astype(numpy.uint16)
+        packed = (packed << (6 if levels == 63 else 5)) | value
+    return packed
+
+
+def rgb565_to_rgb(value: int) -> Tuple[int, int, int]:
+    """
+    Expand an RGB565 value into the 8 bit per channel color that displayio converts back
+    to exactly the same RGB565 value.
+
+    :param int value: The RGB565 color
+
+    :returns tuple: Tuple containing RGB color values 0-255 for each color.
+    """
+    red = (value >> 11) & 0x1F
+    green = (value >> 5) & 0x3F
+    blue = value & 0x1F
+    return (round(red * 255 / 31), round(green * 255 / 63), round(blue * 255 / 31))
+
+
+def index_rgb565(packed: numpy.ndarray) -> Image.Image:
+    """
+    Make a palette ("P" mode) image whose palette holds exactly the RGB565 colors used.
+
+    :param numpy.ndarray packed: Array of RGB565 values as returned by dither_rgb565()
+
+    :returns Image: The converted palette Image object
+    """
+    colors, indexes = numpy.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        raise ValueError(f"{len(colors)} RGB565 colors will not fit in an indexed BMP")
+    indexed = Image.fromarray(indexes.reshape(packed.shape).astype(numpy.uint8), mode="P")
+    indexed.putpalette([value for color in colors for value in rgb565_to_rgb(int(color))])
+    return indexed
+
+
+def map_rgb565(packed: numpy.ndarray, palette_image: Image.Image) -> Image.Image:
+    """
+    Map RGB565 values onto the palette of a shared palette image. Colors in the palette are
+    matched exactly, others get the nearest color. Pillow's own palette mapping looks
+    colors up at reduced precision and can pick a neighbouring RGB565 color instead.
+
+    :param numpy.ndarray packed: Array of RGB565 values as returned by dither_rgb565()
+    :param Image palette_image: The palette ("P" mode) Image object to map onto
+
+    :returns Image: The converted palette Image object
+    """
+    palette = palette_image.getpalette()
+    palette_colors = numpy.array(palette, dtype=numpy.int32).reshape(-1, 3)
+    values, indexes = numpy.unique(packed, return_inverse=True)
+    value_colors = numpy.array([rgb565_to_rgb(int(value)) for value in values], dtype=numpy.int32)
+    distances = ((value_colors[:, None, :] - palette_colors[None, :, :]) ** 2).sum(axis=2)
+    nearest = distances.argmin(axis=1).astype(numpy.uint8)
+    indexed = Image.fromarray(nearest[indexes].reshape(packed.shape), mode="P")
+    indexed.putpalette(palette)
+    return indexed
+
+
+def quantize_sheet(
+    img: Image.Image,
+    palette_mode: str = "web",
+    max_colors: int = 16,
+    palette_image: Optional[Image.Image] = None,
+    origin_y: int = 0,
+) -> Image.Image:
+    """
+    Convert an RGBA sprite sheet, or a strip of one, into a palette ("P" mode) image.
+
+    :param Image img: The RGBA Image object to convert
+    :param str palette_mode: "web" to use the 216 color web palette, "adaptive" to pick
+      a palette of at most max_colors from the colors actually used in the image, or
+      "rgb565" to dither to the colors an RGB565 display shows and use exactly those.
+    :param int max_colors: The largest number of colors allowed in an adaptive palette.
+    :param Image palette_image: An already converted Image object. If provided its palette
+      is used as-is and img is mapped onto it.
+    :param int origin_y: For strips, the row of the sheet the strip starts at, see
+      dither_rgb565()
+
+    :returns Image: The converted palette Image object
+    """
+    if palette_image is not None:
+        if palette_mode == "rgb565":
+            return map_rgb565(dither_rgb565(img, origin_y), palette_image)
+        return img.convert(mode="RGB").quantize(palette=palette_image, dither=Dither.NONE)
+    if palette_mode == "rgb565":
+        return index_rgb565(dither_rgb565(img, origin_y))
+    if palette_mode == "adaptive":
+        return img.convert(mode="RGB").quantize(colors=max_colors, dither=Dither.NONE)
+    if palette_mode == "web":
+        return img.convert(mode="P", palette=Palette.WEB)
+    raise ValueError(f"Unknown palette mode: {palette_mode}. Must be one of {PALETTE_MODES}")
+
+
+def pack_indexed_rows(indexed: Image.Image, bits_per_pixel: int, row_size: int) -> numpy.ndarray:
+    """
+    Pack the palette indexes of an image into BMP row data, most significant bits
+    first, with each row padded out to row_size bytes.
+
+    :param Image indexed: The palette ("P" mode) Image object to pack
+    :param int bits_per_pixel: The number of bits to store each pixel in. 1, 2, 4 or 8.
+    :param int row_size: The number of bytes in each padded output row
+
+    :returns numpy.ndarray: Array of bytes with one row per image row
+    """
+    pixels = numpy.asarray(indexed, dtype=numpy.uint8)
+    pixels_per_byte = 8 // bits_per_pixel
+    height, width = pixels.shape
+
+    padded = numpy.zeros((height, row_size * pixels_per_byte), dtype=numpy.uint8)
+    padded[:, :width] = pixels
+    groups = padded.reshape(height, row_size, pixels_per_byte)
+
+    packed = numpy.zeros((height, row_size), dtype=numpy.uint8)
+    for i in range(pixels_per_byte):
+        packed |= groups[:, :, i] << (8 - bits_per_pixel * (i + 1))
+    return packed
+
+
+class IndexedBMPWriter:
+    """
+    Writes an indexed BMP file in horizontal strips. The file is allocated at its full
+    size up front and each strip of palette indexes is written straight into its rows,
+    so the full sheet never has to exist in memory.
+
+    :param str filename: The name of the BMP file to create
+    :param int width: The width in pixels of the full image
+    :param int height: The height in pixels of the full image
+    :param List[int] palette: Flat list of RGB values for each color in the palette
+    :param int bits_per_pixel: The number of bits to store each pixel in. 1, 2, 4 or 8.
+      adafruit_imageload creates a Bitmap of matching depth when loading the file.
+    """
+
+    FILE_HEADER_SIZE = 14
+    INFO_HEADER_SIZE = 40
+
+    def __init__(
+        self,
+        filename: str,
+        width: int,
+        height: int,
+        palette: List[int],
+        bits_per_pixel: int = 8,
+    ) -> None:
+        if bits_per_pixel not in BITS_PER_PIXEL_OPTIONS:
+            raise ValueError(f"bits_per_pixel must be one of {BITS_PER_PIXEL_OPTIONS}")
+        self.width = width
+        self.height = height
+        self.bits_per_pixel = bits_per_pixel
+        self.colors = len(palette) // 3
+        if self.colors > 1 << bits_per_pixel:
+            raise ValueError(f"{self.colors} colors will not fit in {bits_per_pixel} bits")
+        self.row_size = ((width * bits_per_pixel + 31) // 32) * 4
+        self.data_start = self.FILE_HEADER_SIZE + self.INFO_HEADER_SIZE + self.colors * 4
+        self._file = open(filename, "w+b")
+        self._file.truncate(self.data_start + self.row_size * height)
+        self._write_headers(palette)
+
+    def _write_headers(self, palette: List[int]) -> None:
+        file_size = self.data_start + self.row_size * self.height
+        self._file.seek(0)
+        self._file.write(b"BM")
+        self._file.write(struct.pack("<IHHI", file_size, 0, 0, self.data_start))
+        self._file.write(
+            struct.pack(
+                "<IiiHHIIiiII",
+                self.INFO_HEADER_SIZE,
+                self.width,
+                self.height,
+                1,
+                self.bits_per_pixel,
+                0,
+                self.row_size * self.height,
+                2835,
+                2835,
+                self.colors,
+                0,
+            )
+        )
+        for i in range(self.colors):
+            red, green, blue = palette[i * 3 : i * 3 + 3]
+            self._file.write(bytes((blue, green, red, 0)))
+
+    def write_strip(self, indexed: Image.Image, y: int) -> None:
+        """
+        Write a full width strip of palette indexes at the given row.
+
+        :param Image indexed: palette ("P" mode) Image object the full width of the output
+        :param int y: The row in the output image where the top of the strip goes
+        """
+        rows = pack_indexed_rows(indexed, self.bits_per_pixel, self.row_size)
+        for row in range(indexed.height):
+            self._file.seek(self._row_start(y + row))
+            self._file.write(rows[row].tobytes())
+
+    def _row_start(self, y: int) -> int:
+        """
+        The file position of an image row. BMP rows are stored bottom to top.
+
+        :param int y: The row in the output image
+        """
+        return self.data_start + (self.height - 1 - y) * self.row_size
+
+    def close(self) -> None:
+        """
+        Close the output file.
+        """
+        self._file.close()
+
+    def __enter__(self) -> "IndexedBMPWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class IndexedRawWriter(IndexedBMPWriter):
+    """
+    Writes a sheet in the raw packed format of write_raw_sheet() in horizontal strips,
+    the same way as IndexedBMPWriter. bits_per_pixel must be the smallest depth that
+    holds the palette, as sprite_loader expects.
+    """
+
+    FILE_HEADER_SIZE = 12
+    INFO_HEADER_SIZE = 0
+
+    def _write_headers(self, palette: List[int]) -> None:
+        self._file.seek(0)
+        self._file.write(
+            struct.pack(
+                "<4sBBHHH",
+                RAW_SHEET_MAGIC,
+                RAW_SHEET_VERSION,
+                self.bits_per_pixel,
+                self.colors,
+                self.width,
+                self.height,
+            )
+        )
+        for i in range(self.colors):
+            red, green, blue = palette[i * 3 : i * 3 + 3]
+            self._file.write(struct.pack("<I", red << 16 | green << 8 | blue))
+
+    def _row_start(self, y: int) -> int:
+        """
+        The file position of an image row. Raw rows are stored top to bottom.
+
+        :param int y: The row in the output image
+        """
+        return self.data_start + y * self.row_size
+
+
+def write_raw_sheet(indexed: Image.Image, filename: str) -> None:
+    """
+    Save a converted sprite sheet in the raw packed format read by
+    adafruit_displayio_flipclock.sprite_loader. The layout is a 12 byte header (magic,
+    version, bits per pixel, color count, width, height), the palette as one little endian
+    0xRRGGBB value per color, then the rows top to bottom. Rows are packed most significant
+    bits first and padded to a multiple of 4 bytes, the same as displayio Bitmap rows, so
+    they can be read straight into a Bitmap with bitmaptools.readinto().
+
+    :param Image indexed: The palette ("P" mode) Image object to save
+    :param str filename: The name of the file to create
+    """
+    palette = indexed.getpalette()
+    colors = len(palette) // 3
+    bits_per_pixel = bits_per_pixel_for_colors(colors)
+    row_size = ((indexed.width * bits_per_pixel + 31) // 32) * 4
+
+    with open(filename, "wb") as raw_file:
+        raw_file.write(
+            struct.pack(
+                "<4sBBHHH",
+                RAW_SHEET_MAGIC,
+                RAW_SHEET_VERSION,
+                bits_per_pixel,
+                colors,
+                indexed.width,
+                indexed.height,
+            )
+        )
+        for i in range(colors):
+            red, green, blue = palette[i * 3 : i * 3 + 3]
+            raw_file.write(struct.pack("<I", red << 16 | green << 8 | blue))
+        raw_file.write(pack_indexed_rows(indexed, bits_per_pixel, row_size).tobytes())
+    print(f"{filename}: {colors} colors, {bits_per_pixel} bits per pixel")
+
+
+def encode_rle_row(row: numpy.ndarray) -> bytearray:
+    """
+    Run length encode one row of palette indexes. A control byte below 128 is followed by
+    one index that is repeated control + 1 times. Otherwise control - 127 indexes follow
+    that are copied as they are.
+
+    :param numpy.ndarray row: The palette indexes of the row
+
+    :returns bytearray: The encoded packets
+    """
+    encoded = bytearray()
+    literal = bytearray()
+
+    def flush_literal():
+        if literal:
+            encoded.append(0x80 + len(literal) - 1)
+            encoded.extend(literal)
+            literal.clear()
+
+    i = 0
+    while i < len(row):
+        run = 1
+        while i + run < len(row) and run < RLE_MAX_PACKET and row[i + run] == row[i]:
+            run += 1
+        # a run of 2 only saves a byte when it doesn't interrupt a literal sequence
+        if run >= 3 or (run == 2 and not literal):
+            flush_literal()
+            encoded.append(run - 1)
+            encoded.append(row[i])
+            i += run
+        else:
+            literal.append(row[i])
+            if len(literal) == RLE_MAX_PACKET:
+                flush_literal()
+            i += 1
+    flush_literal()
+    return encoded
+
+
+def write_rle_sheet(
+    indexed: Image.Image,
+    filename: str,
+    tile_width: int,
+    tile_height: int,
+    width: int,
+    frame_map: Optional[List[int]] = None,
+) -> None:
+    """
+    Save a converted animation sprite sheet in the run length encoded format read by
+    adafruit_displayio_flipclock.sprite_rle. The layout is a 13 byte header (magic, version,
+    color count, tile width, tile height, frame count), the palette as one little endian
+    0xRRGGBB value per color, one 32 bit offset per frame, then the encoded frames.
+    Identical frames are only stored once.
+
+    :param Image indexed: The palette ("P" mode) sprite sheet Image object to save
+    :param str filename: The name of the file to create
+    :param int tile_width: The width in pixels of each tile in the sheet
+    :param int tile_height: The height in pixels of each tile in the sheet
+    :param int width: The number of sprites in each row
+    :param list frame_map: Optional map from animation frame to tile index, as returned by
+      dedupe_sheet_tiles(). Every tile is its own frame if it is not provided.
+    """
+    palette = indexed.getpalette()
+    colors = len(palette) // 3
+    pixels = numpy.asarray(indexed)
+    if frame_map is None:
+        frame_map = range((indexed.width // tile_width) * (indexed.height // tile_height))
+
+    data = bytearray()
+    encoded_offsets = {}
+    offsets = []
+    for tile_index in frame_map:
+        x = (tile_index % width) * tile_width
+        y = (tile_index // width) * tile_height
+        encoded = bytearray()
+        for row in pixels[y : y + tile_height, x : x + tile_width]:
+            encoded.extend(encode_rle_row(row))
+        encoded = bytes(encoded)
+        if encoded not in encoded_offsets:
+            encoded_offsets[encoded] = len(data)
+            data.extend(encoded)
+        offsets.append(encoded_offsets[encoded])
+
+    with open(filename, "wb") as rle_file:
+        rle_file.write(
+            struct.pack(
+                "<4sBHHHH",
+                RLE_SHEET_MAGIC,
+                RLE_SHEET_VERSION,
+                colors,
+                tile_width,
+                tile_height,
+                len(offsets),
+            )
+        )
+        for i in range(colors):
+            red, green, blue = palette[i * 3 : i * 3 + 3]
+            rle_file.write(struct.pack("<I", red << 16 | green << 8 | blue))
+        rle_file.write(struct.pack(f"<{len(offsets)}L", *offsets))
+        rle_file.write(data)
+    print(
+        f"{filename}: {len(encoded_offsets)} unique frames, {len(data)} bytes "
+        f"encoded from {indexed.width * indexed.height} pixels"
+    )
+
+
+def dedupe_sheet_tiles(
+    indexed: Image.Image,
+    tile_width: int,
+    tile_height: int,
+    width: int,
+    tolerance: int = 0,
+) -> Tuple[Image.Image, List[int]]:
+    """
+    Remove duplicate tiles from a converted sprite sheet. Tiles are compared by their
+    palette indexes, so frames that only differed before conversion are merged too.
+
+    :param Image indexed: The palette ("P" mode) sprite sheet Image object
+    :param int tile_width: The width in pixels of each tile in the sheet
+    :param int tile_height: The height in pixels of each tile in the sheet
+    :param int width: The number of sprites in each row
+    :param int tolerance: The number of pixels that may differ between two tiles
+      for them to still be considered the same. 0 keeps only exact duplicates out.
+
+    :returns Tuple[Image, List[int]]: The sheet containing only the unique tiles, and
+      a list mapping each original tile index to its index in the new sheet.
+    """
+    pixels = numpy.asarray(indexed)
+    tile_count = (indexed.width // tile_width) * (indexed.height // tile_height)
+
+    exact_matches = {}
+    unique_tiles = []
+    frame_map = []
+    for i in range(tile_count):
+        x = (i % width) * tile_width
+        y = (i // width) * tile_height
+        tile = pixels[y : y + tile_height, x : x + tile_width]
+
+        key = tile.tobytes()
+        if key not in exact_matches:
+            exact_matches[key] = len(unique_tiles)
+            if tolerance:
+                for unique_index, unique_tile in enumerate(unique_tiles):
+                    if numpy.count_nonzero(tile != unique_tile) <= tolerance:
+                        exact_matches[key] = unique_index
+                        break
+            if exact_matches[key] == len(unique_tiles):
+                unique_tiles.append(tile)
+        frame_map.append(exact_matches[key])
+
+    row_count = math.ceil(len(unique_tiles) / width)
+    deduped = numpy.zeros((row_count * tile_height, width * tile_width), dtype=numpy.uint8)
+    for i, tile in enumerate(unique_tiles):
+        x = (i % width) * tile_width
+        y = (i // width) * tile_height
+        deduped[y : y + tile_height, x : x + tile_width] = tile
+
+    deduped_img = Image.fromarray(deduped, mode="P")
+    deduped_img.putpalette(indexed.getpalette())
+    return deduped_img, frame_map
+
+
+def trim_tile(tile: numpy.ndarray, transparent_index: int) -> Tuple[numpy.ndarray, int, int]:
+    """
+    Trim the transparent padding from around a tile of palette indexes.
+
+    :param numpy.ndarray tile: 2D array of the palette indexes in the tile
+    :param int transparent_index: The palette index of the transparency color
+
+    :returns Tuple: The trimmed array, or None if the tile is fully transparent, and
+      the x and y offset of the trimmed area within the tile.
+    """
+    opaque = tile != transparent_index
+    rows = numpy.flatnonzero(opaque.any(axis=1))
+    cols = numpy.flatnonzero(opaque.any(axis=0))
+    if len(rows) == 0:
+        return None, 0, 0
+    return tile[rows[0] : rows[-1] + 1, cols[0] : cols[-1] + 1], int(cols[0]), int(rows[0])
+
+
+def shelf_pack(
+    crops: List[numpy.ndarray], atlas_width: int
+) -> Tuple[Dict[Tuple, Tuple[int, int]], int]:
+    """
+    Find positions for trimmed frames in an atlas, placing them left to right
+    in shelves of decreasing height. Identical frames share a position.
+
+    :param List[numpy.ndarray] crops: The trimmed frames to place
+    :param int atlas_width: The width in pixels of the atlas
+
+    :returns Tuple: Dictionary of x, y positions keyed by the shape and bytes of each
+      trimmed frame, and the height in pixels needed for the atlas.
+    """
+    placements = {}
+    shelf_x = shelf_y = shelf_height = 0
+    for crop in sorted(crops, key=lambda crop: -crop.shape[0]):
+        key = (crop.shape, crop.tobytes())
+        if key in placements:
+            continue
+        if shelf_x + crop.shape[1] > atlas_width:
+            shelf_y += shelf_height
+            shelf_x = shelf_height = 0
+        placements[key] = (shelf_x, shelf_y)
+        shelf_x += crop.shape[1]
+        shelf_height = max(shelf_height, crop.shape[0])
+    return placements, shelf_y + shelf_height
+
+
+def pack_atlas(
+    indexed: Image.Image,
+    tile_width: int,
+    tile_height: int,
+    width: int,
+    transparent_index: int,
+    frame_map: Optional[List[int]] = None,
+) -> Tuple[Image.Image, List[int]]:
+    """
+    Trim the transparent padding from every tile in a converted sprite sheet and pack
+    the trimmed frames tightly into an atlas image.
+
+    :param Image indexed: The palette ("P" mode) sprite sheet Image object
+    :param int tile_width: The width in pixels of each tile in the sheet
+    :param int tile_height: The height in pixels of each tile in the sheet
+    :param int width: The number of sprites in each row of the sheet. Also sets the
+      width of the atlas.
+    :param int transparent_index: The palette index of the transparency color
+    :param List[int] frame_map: Optional map from each animation frame to its tile
+      in the sheet, as returned by dedupe_sheet_tiles().
+
+    :returns Tuple[Image, List[int]]: The atlas Image object, and a flat list of
+      x, y, width, height, x offset and y offset for each animation frame.
+    """
+    pixels = numpy.asarray(indexed)
+    tile_count = (indexed.width // tile_width) * (indexed.height // tile_height)
+    if frame_map is None:
+        frame_map = list(range(tile_count))
+
+    trimmed = [
+        trim_tile(
+            pixels[
+                (i // width) * tile_height : (i // width + 1) * tile_height,
+                (i % width) * tile_width : (i % width + 1) * tile_width,
+            ],
+            transparent_index,
+        )
+        for i in range(tile_count)
+    ]
+    placements, atlas_height = shelf_pack(
+        [crop for crop, _, _ in trimmed if crop is not None], width * tile_width
+    )
+
+    atlas = numpy.full(
+        (max(atlas_height, 1), width * tile_width), transparent_index, dtype=numpy.uint8
+    )
+    frames = []
+    for tile_index in frame_map:
+        crop, offset_x, offset_y = trimmed[tile_index]
+        if crop is None:
+            frames.extend((0, 0, 0, 0, 0, 0))
+            continue
+        x, y = placements[(crop.shape, crop.tobytes())]
+        atlas[y : y + crop.shape[0], x : x + crop.shape[1]] = crop
+        frames.extend((x, y, crop.shape[1], crop.shape[0], offset_x, offset_y))
+
+    atlas_img = Image.fromarray(atlas, mode="P")
+    atlas_img.putpalette(indexed.getpalette())
+    return atlas_img, frames
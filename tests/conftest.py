@@ -0,0 +1,30 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+The tests run the widgets on CPython against the fake displayio, bitmaptools, vectorio
+and PaletteFader modules of benchmarks/fakes.py, installed before anything imports them.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+
+import fakes
+
+fakes.install()
+
+import pytest
+
+from adafruit_displayio_flipclock import flip_digit
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch):
+    """Time source that returns from sleep() at once, without recording each call."""
+    fake = fakes.FakeTime(record=False)
+    monkeypatch.setattr(flip_digit, "time", fake)
+    return fake
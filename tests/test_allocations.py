@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+The animation frame loop of plain spritesheets must not allocate memory, see
+benchmarks/check_allocations.py for the same check on a board.
+"""
+
+import gc
+import tracemalloc
+
+from displayio import Bitmap, Palette
+
+from adafruit_displayio_flipclock.flip_digit import FlipDigit
+
+TILE_WIDTH = 16
+TILE_HEIGHT = 16
+
+
+def make_digit(frame_count: int) -> FlipDigit:
+    """
+    A digit using small spritesheets with the given number of animation frames.
+
+    :param int frame_count: The number of frames in the flip animations
+    """
+    palette = Palette(2)
+    palette[1] = 0xFFFFFF
+    return FlipDigit(
+        Bitmap(TILE_WIDTH * 3, TILE_HEIGHT * 8, 2),
+        palette,
+        Bitmap(TILE_WIDTH * frame_count, TILE_HEIGHT * 10, 2),
+        palette,
+        Bitmap(TILE_WIDTH * frame_count, TILE_HEIGHT * 10, 2),
+        palette,
+        TILE_WIDTH,
+        TILE_HEIGHT,
+        anim_frame_count=frame_count,
+        anim_delay=0,
+        dynamic_fading=False,
+    )
+
+
+def animate_peak_bytes(digit: FlipDigit, value: int) -> int:
+    """
+    The peak memory allocated by one run of the frame loop for a value.
+
+    :param FlipDigit digit: The digit to animate
+    :param int value: The glyph index to animate
+    """
+    config = digit.config
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        digit._animate_tiles(digit.top_anim_tilegrid, config.top_anim_tiles, value)
+        return tracemalloc.get_traced_memory()[1] - start
+    finally:
+        tracemalloc.stop()
+
+
+def test_animate_tiles_allocates_nothing_per_frame():
+    short_digit = make_digit(10)
+    long_digit = make_digit(20)
+    # one run first so that anything created on first use isn't counted
+    for digit in (short_digit, long_digit):
+        digit._animate_tiles(digit.top_anim_tilegrid, digit.config.top_anim_tiles, 9)
+
+    for value in range(10):
+        short_peak = animate_peak_bytes(short_digit, value)
+        long_peak = animate_peak_bytes(long_digit, value)
+        assert (long_peak - short_peak) / 10 == 0
+
+
+def test_animate_tiles_shows_every_frame_tile():
+    digit = make_digit(10)
+    shown = []
+    tiles = digit.config.top_anim_tiles
+
+    class RecordingTileGrid:
+        def __setitem__(self, index, tile):
+            shown.append(tile)
+
+    digit._animate_tiles(RecordingTileGrid(), tiles, 3)
+    assert shown == list(range(30, 40))
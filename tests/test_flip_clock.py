@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Layout of the FlipClock widget.
+"""
+
+import pytest
+from displayio import Bitmap, Palette
+
+from adafruit_displayio_flipclock.flip_clock import COLON_RADIUS, COLON_SPACE, FlipClock
+
+TILE_WIDTH = 24
+TILE_HEIGHT = 20
+
+
+def make_clock(tile_width: int, tile_height: int, scale: int) -> FlipClock:
+    """
+    A clock drawn from blank spritesheets.
+
+    :param int tile_width: The width of the sprites
+    :param int tile_height: The height of the half sprite tiles
+    :param int scale: The scale of the clock
+    """
+    palette = Palette(2)
+    return FlipClock(
+        Bitmap(tile_width * 3, tile_height * 8, 2),
+        palette,
+        Bitmap(tile_width * 10, tile_height * 10, 2),
+        palette,
+        Bitmap(tile_width * 10, tile_height * 10, 2),
+        palette,
+        tile_width,
+        tile_height,
+        dynamic_fading=False,
+        scale=scale,
+    )
+
+
+@pytest.mark.parametrize("scale", [2, 3, 4])
+def test_scaled_clock_matches_full_size_layout(scale):
+    full_size = make_clock(TILE_WIDTH * scale, TILE_HEIGHT * scale, 1)
+    scaled = make_clock(TILE_WIDTH, TILE_HEIGHT, scale)
+    assert full_size.width == TILE_WIDTH * scale * 4 + COLON_SPACE
+    # the gap is rounded to whole sprite pixels
+    assert abs(scaled.width - full_size.width) <= scale // 2
+    assert scaled.height == full_size.height
+
+
+@pytest.mark.parametrize("scale", [1, 2, 3, 4])
+def test_scaled_colon_circles_keep_their_size(scale):
+    clock = make_clock(TILE_WIDTH, TILE_HEIGHT, scale)
+    top_circle = clock[len(clock) - 2]
+    assert abs(top_circle.radius * scale - COLON_RADIUS) <= scale // 2
+    # centered in the gap between the pairs
+    gap_left = clock.digit_1.x + TILE_WIDTH
+    assert gap_left < top_circle.x < clock.digit_2.x
@@ -0,0 +1,67 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Events FlipDigit records in a FlipTrace.
+"""
+
+from displayio import Bitmap, Palette
+
+from adafruit_displayio_flipclock.flip_digit import FlipDigit
+from adafruit_displayio_flipclock.flip_trace import BOTTOM_ANIM, TILE, TOP_ANIM, FlipTrace
+
+TILE_SIZE = 8
+FRAME_COUNT = 4
+
+
+def test_tile_events_record_the_tiles_shown():
+    palette = Palette(2)
+    frames = 10 * FRAME_COUNT
+    # deduplicated sheets map the frames onto fewer tiles, backwards here
+    top_map = [(frames - 1 - frame) // 2 for frame in range(frames)]
+    bottom_map = [frame // 2 for frame in range(frames)]
+    digit = FlipDigit(
+        Bitmap(TILE_SIZE * 3, TILE_SIZE * 8, 2),
+        palette,
+        Bitmap(TILE_SIZE * FRAME_COUNT, TILE_SIZE * 10, 2),
+        palette,
+        Bitmap(TILE_SIZE * FRAME_COUNT, TILE_SIZE * 10, 2),
+        palette,
+        TILE_SIZE,
+        TILE_SIZE,
+        anim_frame_count=FRAME_COUNT,
+        dynamic_fading=False,
+        top_anim_frame_map=top_map,
+        bottom_anim_frame_map=bottom_map,
+    )
+    shown = {TOP_ANIM: [], BOTTOM_ANIM: []}
+
+    class RecordingTileGrid:
+        """Wraps an animation tilegrid to record the tiles set in it."""
+
+        def __init__(self, tilegrid, layer):
+            self.tilegrid = tilegrid
+            self.layer = layer
+
+        def __setitem__(self, index, tile):
+            shown[self.layer].append(tile)
+            self.tilegrid[index] = tile
+
+        def __getattr__(self, name):
+            return getattr(self.tilegrid, name)
+
+    digit.top_anim_tilegrid = RecordingTileGrid(digit.top_anim_tilegrid, TOP_ANIM)
+    digit.bottom_anim_tilegrid = RecordingTileGrid(digit.bottom_anim_tilegrid, BOTTOM_ANIM)
+    digit.trace = FlipTrace()
+    digit.value = 3
+
+    traced = {TOP_ANIM: [], BOTTOM_ANIM: []}
+    for event in digit.trace.events():
+        kind, layer, arg = event[1], event[3], event[4]
+        if kind == TILE and layer in traced:
+            traced[layer].append(arg)
+    # the first frame of each half is traced when it is shown and as the first frame
+    assert traced[TOP_ANIM] == shown[TOP_ANIM]
+    assert traced[BOTTOM_ANIM] == shown[BOTTOM_ANIM]
+    assert shown[TOP_ANIM][1:] == top_map[:FRAME_COUNT]
+    assert shown[BOTTOM_ANIM][1:] == bottom_map[3 * FRAME_COUNT : 4 * FRAME_COUNT]
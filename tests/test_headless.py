@@ -0,0 +1,159 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Golden frame tests: a FlipClock with small generated spritesheets is rendered headless
+after every animation frame of a series of flips, and the frames are compared with
+those stored in golden/. After an intended change to how the widgets draw, rewrite them
+with:
+
+    FLIPCLOCK_UPDATE_GOLDEN=1 python -m pytest tests/test_headless.py
+"""
+
+import os
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from displayio import Bitmap, Palette
+
+from adafruit_displayio_flipclock.flip_clock import FlipClock
+from adafruit_displayio_flipclock.headless import HeadlessDisplay, bitmap_array
+
+GOLDEN_FRAMES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "flips.npz")
+
+TILE_WIDTH = 12
+TILE_HEIGHT = 10
+FRAME_COUNT = 4
+COLORS = (0x000000, 0xFF0000, 0x00FF00, 0x0000FF, 0xFFFF00, 0x00FFFF, 0xFFFFFF)
+
+# the clock values shown one after another from 00:00, every digit flips to each value
+SEQUENCE = ("11", "22", "33", "44", "55", "66", "77", "88", "99", "00")
+
+
+def make_palette(transparent: bool) -> Palette:
+    """
+    A palette of COLORS.
+
+    :param bool transparent: Whether index 0 is transparent
+    """
+    palette = Palette(len(COLORS))
+    for index, color in enumerate(COLORS):
+        palette[index] = color
+    if transparent:
+        palette.make_transparent(0)
+    return palette
+
+
+def make_static_sheet() -> Bitmap:
+    """A 3 tile wide static sheet with stripes that differ from tile to tile."""
+    bitmap = Bitmap(TILE_WIDTH * 3, TILE_HEIGHT * 8, len(COLORS))
+    for y in range(bitmap.height):
+        for x in range(bitmap.width):
+            tile = (y // TILE_HEIGHT) * 3 + x // TILE_WIDTH
+            bitmap[x, y] = 1 + (tile + y % TILE_HEIGHT // 2) % (len(COLORS) - 1)
+    return bitmap
+
+
+def make_anim_sheet(top: bool) -> Bitmap:
+    """
+    An animation sheet whose frames cover less of the tile as the flip goes on, in a
+    color for each value.
+
+    :param bool top: Whether the flap is drawn from the top of the tile
+    """
+    bitmap = Bitmap(TILE_WIDTH * FRAME_COUNT, TILE_HEIGHT * 10, len(COLORS))
+    for y in range(bitmap.height):
+        for x in range(bitmap.width):
+            value, row = divmod(y, TILE_HEIGHT)
+            frame = x // TILE_WIDTH
+            covered = TILE_HEIGHT - frame * TILE_HEIGHT // FRAME_COUNT
+            inside = row < covered if top else row >= TILE_HEIGHT - covered
+            if inside:
+                bitmap[x, y] = 1 + (value + x % 3) % (len(COLORS) - 1)
+    return bitmap
+
+
+def render_flips(fake_time, scale: int = 1) -> numpy.ndarray:
+    """
+    Render the clock after every animation frame of every flip in SEQUENCE.
+
+    :param fake_time: The time source of the digits, whose sleep draws a frame
+    :param int scale: The scale of the clock
+    """
+    clock = FlipClock(
+        make_static_sheet(),
+        make_palette(False),
+        make_anim_sheet(True),
+        make_palette(True),
+        make_anim_sheet(False),
+        make_palette(True),
+        TILE_WIDTH,
+        TILE_HEIGHT,
+        anim_frame_count=FRAME_COUNT,
+        anim_delay=0,
+        colon_color=0xFF00FF,
+        scale=scale,
+    )
+    display = HeadlessDisplay(clock.width, clock.height)
+    display.root_group = clock
+    frames = [display.refresh().copy()]
+
+    def sleep(seconds):
+        frames.append(display.refresh().copy())
+
+    fake_time.sleep = sleep
+    for pair in SEQUENCE:
+        clock.first_pair = pair
+        clock.second_pair = pair
+        frames.append(display.refresh().copy())
+    return numpy.stack(frames)
+
+
+def test_flip_frames_match_golden(fake_time):
+    frames = render_flips(fake_time)
+    if os.environ.get("FLIPCLOCK_UPDATE_GOLDEN"):
+        os.makedirs(os.path.dirname(GOLDEN_FRAMES), exist_ok=True)
+        numpy.savez_compressed(GOLDEN_FRAMES, frames=frames)
+    golden = numpy.load(GOLDEN_FRAMES)["frames"]
+    assert frames.shape == golden.shape
+    for index, (frame, expected) in enumerate(zip(frames, golden)):
+        assert numpy.array_equal(frame, expected), f"frame {index} differs"
+
+
+def test_flip_frames_cover_every_flip(fake_time):
+    frames = render_flips(fake_time)
+    # every digit flips to each new value, drawing both halves of its animation
+    flips = 4 * len(SEQUENCE)
+    assert len(frames) == 1 + flips * 2 * FRAME_COUNT + len(SEQUENCE)
+    # the first frame of the first flip covers the top half of the first digit
+    assert not numpy.array_equal(frames[0], frames[1])
+    # back to the same values at the end
+    assert numpy.array_equal(frames[0], frames[-1])
+
+
+def test_bitmap_array_reads_public_pixels():
+    bitmap = Bitmap(5, 3, 4)
+    for y in range(3):
+        for x in range(5):
+            bitmap[x, y] = (x + y) % 4
+    expected = numpy.array([[(x + y) % 4 for x in range(5)] for y in range(3)])
+    assert numpy.array_equal(bitmap_array(bitmap), expected)
+
+
+class MisleadingBitmap:
+    """A Bitmap whose private data looks like Blinka's but doesn't hold its pixels."""
+
+    width = 5
+    height = 3
+    _bits_per_value = 8
+    _data = bytearray(5 * 3)
+
+    def __getitem__(self, index):
+        x, y = index
+        return 3 if (x, y) == (4, 2) else 0
+
+
+def test_bitmap_array_checks_private_pixel_data():
+    assert bitmap_array(MisleadingBitmap())[2, 4] == 3
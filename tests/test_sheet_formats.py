@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Sheets written by the spritesheet generator's format writers, read back by the
+library's loaders.
+"""
+
+import os
+import sys
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "examples", "spritesheet_generator"),
+)
+
+import sheet_formats
+from displayio import Bitmap
+
+from adafruit_displayio_flipclock import sprite_loader, sprite_rle
+from adafruit_displayio_flipclock.sprite_atlas import SpriteAtlas
+from adafruit_displayio_flipclock.sprite_ondisk import OnDiskSpriteSheet
+
+TILE_WIDTH = 8  # tiles start on whole bytes at every depth, as OnDiskSpriteSheet needs
+TILE_HEIGHT = 5
+COLUMNS = 3
+ROWS = 2
+
+
+def indexed_sheet(colors, seed=0):
+    """A sheet of random palette indexes with a palette of distinct colors."""
+    rng = numpy.random.default_rng(seed)
+    pixels = rng.integers(0, colors, (ROWS * TILE_HEIGHT, COLUMNS * TILE_WIDTH), dtype=numpy.uint8)
+    indexed = Image.fromarray(pixels, mode="P")
+    indexed.putpalette([value for i in range(colors) for value in (i, 255 - i, i * 7 % 256)])
+    return indexed
+
+
+def palette_colors(indexed):
+    """The palette of an image as 0xRRGGBB values."""
+    palette = indexed.getpalette()
+    return [
+        palette[i] << 16 | palette[i + 1] << 8 | palette[i + 2] for i in range(0, len(palette), 3)
+    ]
+
+
+def bitmap_pixels(bitmap):
+    """The palette indexes of a Bitmap as an array."""
+    return numpy.array(
+        [[bitmap[x, y] for x in range(bitmap.width)] for y in range(bitmap.height)],
+        dtype=numpy.uint8,
+    )
+
+
+def tile(pixels, index):
+    """The palette indexes of a tile of the sheet."""
+    x = (index % COLUMNS) * TILE_WIDTH
+    y = (index // COLUMNS) * TILE_HEIGHT
+    return pixels[y : y + TILE_HEIGHT, x : x + TILE_WIDTH]
+
+
+@pytest.mark.parametrize("colors", [2, 3, 16, 200])
+def test_raw_sheet_round_trip(tmp_path, colors):
+    indexed = indexed_sheet(colors)
+    filename = str(tmp_path / "sheet.fcb")
+    sheet_formats.write_raw_sheet(indexed, filename)
+
+    bitmap, palette = sprite_loader.load(filename)
+    assert (bitmap_pixels(bitmap) == numpy.asarray(indexed)).all()
+    assert [palette[i] for i in range(len(palette))] == palette_colors(indexed)
+
+
+def test_streamed_raw_sheet_matches_whole_sheet(tmp_path):
+    indexed = indexed_sheet(16)
+    whole = str(tmp_path / "whole.fcb")
+    streamed = str(tmp_path / "streamed.fcb")
+    sheet_formats.write_raw_sheet(indexed, whole)
+    with sheet_formats.IndexedRawWriter(
+        streamed, indexed.width, indexed.height, indexed.getpalette(), bits_per_pixel=4
+    ) as writer:
+        for y in range(0, indexed.height, TILE_HEIGHT):
+            writer.write_strip(indexed.crop((0, y, indexed.width, y + TILE_HEIGHT)), y)
+
+    with open(whole, "rb") as whole_file, open(streamed, "rb") as streamed_file:
+        assert whole_file.read() == streamed_file.read()
+
+
+@pytest.mark.parametrize("bits_per_pixel", [1, 2, 4, 8])
+def test_bmp_sheet_round_trip(tmp_path, bits_per_pixel):
+    indexed = indexed_sheet(min(1 << bits_per_pixel, 200))
+    filename = str(tmp_path / "sheet.bmp")
+    with sheet_formats.IndexedBMPWriter(
+        filename, indexed.width, indexed.height, indexed.getpalette(), bits_per_pixel
+    ) as writer:
+        writer.write_strip(indexed, 0)
+
+    sheet = OnDiskSpriteSheet(filename, TILE_WIDTH, TILE_HEIGHT)
+    assert [sheet.palette[i] for i in range(len(sheet.palette))] == palette_colors(indexed)
+    bitmap = Bitmap(TILE_WIDTH, TILE_HEIGHT, len(sheet.palette))
+    pixels = numpy.asarray(indexed)
+    for index in range(COLUMNS * ROWS):
+        sheet.draw_frame(bitmap, index)
+        assert (bitmap_pixels(bitmap) == tile(pixels, index)).all()
+    sheet.deinit()
+
+
+def test_rle_sheet_round_trip(tmp_path):
+    indexed = indexed_sheet(4)
+    # a run and a literal sequence too long for one packet, with repeated frames
+    tile_width = 150
+    pixels = numpy.zeros((TILE_HEIGHT, tile_width * 2), dtype=numpy.uint8)
+    pixels[:, : tile_width - 10] = 3
+    pixels[:, tile_width - 10 : tile_width] = numpy.asarray(indexed)[:TILE_HEIGHT, :10]
+    pixels[:, tile_width:] = numpy.arange(tile_width) % 4
+    sheet = Image.fromarray(pixels, mode="P")
+    sheet.putpalette(indexed.getpalette())
+    frame_map = [0, 1, 1, 0]
+    filename = str(tmp_path / "sheet.fcr")
+    sheet_formats.write_rle_sheet(sheet, filename, tile_width, TILE_HEIGHT, 2, frame_map)
+
+    rle_sheet, palette = sprite_rle.load(filename)
+    assert [palette[i] for i in range(len(palette))] == palette_colors(indexed)
+    assert rle_sheet.frame_count == len(frame_map)
+    assert len(set(rle_sheet.offsets)) == 2
+    bitmap = Bitmap(tile_width, TILE_HEIGHT, 4)
+    for frame, tile_index in enumerate(frame_map):
+        rle_sheet.draw_frame(bitmap, frame)
+        x = tile_index * tile_width
+        assert (bitmap_pixels(bitmap) == pixels[:, x : x + tile_width]).all()
+
+
+def test_deduped_atlas_round_trip():
+    indexed = indexed_sheet(4)
+    pixels = numpy.array(indexed)
+    # pad the tiles with transparency and repeat one of them
+    pixels[:, ::TILE_WIDTH] = 0
+    pixels[TILE_HEIGHT:, TILE_WIDTH : TILE_WIDTH * 2] = pixels[:TILE_HEIGHT, :TILE_WIDTH]
+    pixels[:TILE_HEIGHT, TILE_WIDTH * 2 :] = 0
+    sheet = Image.fromarray(pixels, mode="P")
+    sheet.putpalette(indexed.getpalette())
+
+    deduped, frame_map = sheet_formats.dedupe_sheet_tiles(sheet, TILE_WIDTH, TILE_HEIGHT, COLUMNS)
+    assert frame_map[COLUMNS + 1] == frame_map[0]
+    atlas_img, frames = sheet_formats.pack_atlas(
+        deduped, TILE_WIDTH, TILE_HEIGHT, COLUMNS, 0, frame_map
+    )
+
+    atlas_pixels = numpy.asarray(atlas_img)
+    atlas_bitmap = Bitmap(atlas_img.width, atlas_img.height, 4)
+    for y, row in enumerate(atlas_pixels):
+        for x, value in enumerate(row):
+            atlas_bitmap[x, y] = int(value)
+    atlas = SpriteAtlas(atlas_bitmap, frames, TILE_WIDTH, TILE_HEIGHT)
+    assert atlas.frame_count == COLUMNS * ROWS
+    bitmap = Bitmap(TILE_WIDTH, TILE_HEIGHT, 4)
+    for index in range(COLUMNS * ROWS):
+        atlas.draw_frame(bitmap, index)
+        assert (bitmap_pixels(bitmap) == tile(pixels, index)).all()
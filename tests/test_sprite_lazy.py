@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Loading of LazySpriteSheet.
+"""
+
+from adafruit_displayio_flipclock.sprite_lazy import LazySpriteSheet
+
+
+class FrameSource:
+    """Frame source recording the frames it is asked to prefetch."""
+
+    def __init__(self):
+        self.prefetched = []
+        self.deinitialized = False
+
+    def draw_frame(self, bitmap, index):
+        pass
+
+    def prefetch(self, first_index, count=1):
+        self.prefetched.append((first_index, count))
+
+    def poll(self):
+        return True
+
+    def deinit(self):
+        self.deinitialized = True
+
+
+def make_lazy():
+    """A LazySpriteSheet and the list of frame sources its loader returned."""
+    loaded = []
+
+    def loader():
+        loaded.append(FrameSource())
+        return loaded[-1]
+
+    return LazySpriteSheet(loader, 8, 8), loaded
+
+
+def test_prefetch_leaves_loading_to_poll():
+    lazy, loaded = make_lazy()
+    assert lazy.poll() is False
+    lazy.prefetch(20, 10)
+    assert not loaded
+    assert not lazy.loaded
+
+    lazy.poll()
+    assert lazy.loaded
+    assert loaded[0].prefetched == [(20, 10)]
+
+
+def test_prefetch_passes_on_once_loaded():
+    lazy, loaded = make_lazy()
+    lazy.load()
+    lazy.prefetch(30, 10)
+    assert loaded[0].prefetched == [(30, 10)]
+
+
+def test_deinit_waits_until_needed_to_load_again():
+    lazy, loaded = make_lazy()
+    lazy.prefetch(0, 10)
+    lazy.poll()
+    lazy.deinit()
+    assert loaded[0].deinitialized
+    lazy.poll()
+    assert not lazy.loaded
+
+    lazy.draw_frame(None, 0)
+    assert len(loaded) == 2
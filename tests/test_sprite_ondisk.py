@@ -0,0 +1,121 @@
+# SPDX-FileCopyrightText: Copyright (c) 2022 Tim Cocks for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+Reading animation frames from BMP files with OnDiskSpriteSheet.
+"""
+
+import struct
+
+from displayio import Bitmap
+
+from adafruit_displayio_flipclock import sprite_ondisk
+from adafruit_displayio_flipclock.sprite_ondisk import OnDiskSpriteSheet
+
+TILE_WIDTH = 4
+TILE_HEIGHT = 3
+COLORS = [0x000000, 0xFF0000, 0x00FF00, 0x0000FF, 0x123456]
+
+
+def write_bmp(path, pixels, bits_per_pixel=4, colors_used=0):
+    """
+    Write rows of palette indexes as a bottom up, uncompressed indexed BMP file.
+
+    :param path: The file to write
+    :param list pixels: The rows of palette indexes, top row first
+    :param int bits_per_pixel: 4 or 8
+    :param int colors_used: The color count to store, 0 for a full color table
+    """
+    width = len(pixels[0])
+    height = len(pixels)
+    table_colors = colors_used or 1 << bits_per_pixel
+    table = b"".join(
+        struct.pack("<BBBB", color & 0xFF, (color >> 8) & 0xFF, color >> 16, 0)
+        for color in (COLORS + [0] * table_colors)[:table_colors]
+    )
+    row_size = (width * bits_per_pixel + 31) // 32 * 4
+    data = b""
+    for row in reversed(pixels):
+        packed = bytearray(row_size)
+        for x, value in enumerate(row):
+            if bits_per_pixel == 8:
+                packed[x] = value
+            else:
+                packed[x // 2] |= value << (4 if x % 2 == 0 else 0)
+        data += packed
+    offset = 14 + 40 + len(table)
+    with open(path, "wb") as file:
+        file.write(struct.pack("<2sIHHI", b"BM", offset + len(data), 0, 0, offset))
+        file.write(
+            struct.pack(
+                "<IiiHHIIiiII",
+                40,
+                width,
+                height,
+                1,
+                bits_per_pixel,
+                0,
+                len(data),
+                0,
+                0,
+                colors_used,
+                0,
+            )
+        )
+        file.write(table)
+        file.write(data)
+
+
+def sheet_pixels(columns, rows):
+    """A sheet of tiles whose pixels are their tile index plus x, modulo the colors."""
+    return [
+        [
+            ((y // TILE_HEIGHT) * columns + x // TILE_WIDTH + x) % len(COLORS)
+            for x in range(columns * TILE_WIDTH)
+        ]
+        for y in range(rows * TILE_HEIGHT)
+    ]
+
+
+def frame_pixels(bitmap):
+    """The rows of a Bitmap's pixels."""
+    return [[bitmap[x, y] for x in range(bitmap.width)] for y in range(bitmap.height)]
+
+
+def test_reads_palette_and_frames(tmp_path):
+    for bits_per_pixel, colors_used in ((4, 0), (8, len(COLORS))):
+        path = str(tmp_path / f"sheet{bits_per_pixel}.bmp")
+        pixels = sheet_pixels(3, 2)
+        write_bmp(path, pixels, bits_per_pixel, colors_used)
+        sheet = OnDiskSpriteSheet(path, TILE_WIDTH, TILE_HEIGHT)
+        assert [sheet.palette[i] for i in range(len(COLORS))] == COLORS
+        assert len(sheet.palette) == (colors_used or 16)
+
+        bitmap = Bitmap(TILE_WIDTH, TILE_HEIGHT, len(sheet.palette))
+        for index in range(6):
+            sheet.draw_frame(bitmap, index)
+            left = (index % 3) * TILE_WIDTH
+            top = (index // 3) * TILE_HEIGHT
+            expected = [row[left : left + TILE_WIDTH] for row in pixels[top : top + TILE_HEIGHT]]
+            assert frame_pixels(bitmap) == expected
+        sheet.deinit()
+
+
+def test_opens_the_file_once(tmp_path, monkeypatch):
+    path = str(tmp_path / "sheet.bmp")
+    write_bmp(path, sheet_pixels(2, 2))
+    opened = []
+
+    def counting_open(*args, **kwargs):
+        opened.append(args[0])
+        return open(*args, **kwargs)
+
+    monkeypatch.setattr(sprite_ondisk, "open", counting_open, raising=False)
+    sheet = OnDiskSpriteSheet(path, TILE_WIDTH, TILE_HEIGHT, frame_map=[3, 3, 0, 1])
+    bitmap = Bitmap(TILE_WIDTH, TILE_HEIGHT, len(sheet.palette))
+    sheet.prefetch(0, 4)
+    while not sheet.poll():
+        pass
+    sheet.draw_frame(bitmap, 1)
+    assert opened == [path]
+    sheet.deinit()